@@ -13,6 +13,7 @@ from SourceIO.blender_bindings.material_loader.shaders.goldsrc_shaders.goldsrc_s
 from SourceIO.blender_bindings.utils.bpy_utils import (add_material, get_or_create_collection,
                                                        get_or_create_material, is_blender_4_3)
 from SourceIO.blender_bindings.utils.fast_mesh import FastMesh
+from SourceIO.library.global_config import GoldSrcConfig
 from SourceIO.library.goldsrc.bsp.bsp_file import BspFile
 from SourceIO.library.goldsrc.bsp.lump import LumpType
 from SourceIO.library.goldsrc.bsp.lumps.edge_lump import EdgeLump
@@ -59,6 +60,7 @@ class BSP:
 
         self.bsp_collection = bpy.data.collections.new(self.bsp_name)
         self.entry_cache = {}
+        self._loaded_materials: set[str] = set()
 
         self.bsp_lump_entities = cast(EntityLump, self.bsp_file.get_lump(LumpType.LUMP_ENTITIES))
         self.bsp_lump_textures_data = cast(TextureDataLump, self.bsp_file.get_lump(LumpType.LUMP_TEXTURES_DATA))
@@ -79,28 +81,26 @@ class BSP:
             return get_or_create_collection(entity_class, self.bsp_collection)
 
     @staticmethod
-    def gather_model_data(model, faces, surf_edges, edges):
-        vertex_ids = np.zeros((0, 1), dtype=np.uint32)
-        vertex_offset = 0
-        material_indices = []
-        for map_face in faces[model.first_face:model.first_face + model.faces]:
-            first_edge = map_face.first_edge
-            edge_count = map_face.edges
-            material_indices.append(map_face.texture_info)
-
-            used_surf_edges = surf_edges[first_edge:first_edge + edge_count]
-            reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
-            used_edges = edges[np.abs(used_surf_edges)]
-            tmp = np.arange(len(used_edges))
-            face_vertex_ids = used_edges[tmp, reverse]
-            vertex_ids = np.insert(vertex_ids, vertex_offset, face_vertex_ids)
-            vertex_offset += edge_count
-
-        return vertex_ids, material_indices
+    def gather_model_data(faces: np.ndarray, surf_edges: np.ndarray, edges: np.ndarray):
+        """Corner vertex ids of every face in a face record array, each face's winding reversed for Blender.
+
+        Returns the vertex ids and, for each corner, the index of the face it belongs to.
+        """
+        counts = faces["edges"].astype(np.int64)
+        face_ends = np.cumsum(counts)
+        corner_faces = np.repeat(np.arange(len(faces)), counts)
+        # Corner k of a face with n corners takes surface edge n - 1 - k
+        corner_edges = np.repeat(faces["first_edge"].astype(np.int64) + face_ends - 1, counts) - np.arange(counts.sum())
+        used_surf_edges = surf_edges[corner_edges]
+        vertex_ids = edges[np.abs(used_surf_edges), (used_surf_edges <= 0).astype(np.intp)]
+        return vertex_ids, corner_faces
 
     def load_map(self):
         bpy.context.scene.collection.children.link(self.bsp_collection)
 
+        self.load_wads()
+        config = GoldSrcConfig()
+        self.bsp_lump_textures_data.load_contents(self.bsp_file, config.texture_mip, config.texture_decode_workers)
         self.load_entities()
         self.load_bmodel(0, f'{self.bsp_name}_world_geometry')
         self.load_materials()
@@ -110,14 +110,18 @@ class BSP:
         if material_name in materials_dict:
             texture_data = materials_dict[material_name]
             texture_info: TextureInfo = self.bsp_lump_textures_info.values[texture_data.info_id]
-            studio_texture = StudioTexture(material_name, texture_info.flags, texture_data.width, texture_data.height,
-                                           texture_data.get_contents(self.bsp_file))
+            contents = texture_data.get_contents(self.bsp_file, GoldSrcConfig().texture_mip)
+            studio_texture = StudioTexture(material_name, texture_info.flags, contents.shape[1], contents.shape[0],
+                                           contents)
             return studio_texture
         return
 
     def load_material(self, material_name):
+        if material_name in self._loaded_materials:
+            return
         materials_dict = self.bsp_lump_textures_data.key_values
         if material_name in materials_dict:
+            self._loaded_materials.add(material_name)
             studio_texture = self._texture_info_to_studio_texture(material_name)
             if material_name in self.rad_data:
                 rad_data = self.rad_data[material_name]
@@ -140,7 +144,7 @@ class BSP:
         entity_model = self.bsp_lump_models.values[model_index]
         if not entity_model.faces:
             return
-        model_mesh = bpy.data.meshes.new(f'{model_name}_mesh')
+        model_mesh = FastMesh.new(f'{model_name}_mesh')
         model_object = bpy.data.objects.new(model_name, model_mesh)
 
         if parent_collection is not None:
@@ -148,75 +152,45 @@ class BSP:
         else:
             self.bsp_collection.objects.link(model_object)
 
-        bsp_faces = self.bsp_lump_faces.values
+        bsp_faces = self.bsp_lump_faces.records
         bsp_surfedges = self.bsp_lump_surface_edges.values
         bsp_edges = self.bsp_lump_edges.values
         bsp_vertices = self.bsp_lump_vertices.values
-
-        vertex_ids, used_materials = self.gather_model_data(entity_model, bsp_faces, bsp_surfedges, bsp_edges)
-        unique_vertex_ids = np.unique(vertex_ids)
-        material_lookup_table = {}
-
-        remapped = {}
-        for vertex_id in vertex_ids:
-            new_id = np.where(unique_vertex_ids == vertex_id)[0][0]
-            remapped[vertex_id] = new_id
-
-        for texture_info_index in used_materials:
-            face_texture_info = self.bsp_lump_textures_info.values[texture_info_index]
+        bsp_textures_info = self.bsp_lump_textures_info.values
+
+        faces = bsp_faces[entity_model.first_face:entity_model.first_face + entity_model.faces]
+        faces = faces[faces["edges"] >= 3]
+        texture_info_ids = faces["texture_info"].astype(np.int64)
+
+        # Texture projection and material slot of every texture info used by the model, materials once per texture
+        texture_vectors = np.zeros((len(bsp_textures_info), 2, 4), np.float32)
+        texture_sizes = np.ones((len(bsp_textures_info), 2), np.float32)
+        material_indices = np.zeros(len(bsp_textures_info), np.int32)
+        for texture_info_index in np.unique(texture_info_ids).tolist():
+            face_texture_info = bsp_textures_info[texture_info_index]
             face_texture_data = self.bsp_lump_textures_data.values[face_texture_info.texture]
             face_texture_name = face_texture_data.name
+            texture_vectors[texture_info_index] = face_texture_info.s, face_texture_info.t
+            texture_sizes[texture_info_index] = face_texture_data.width or 1, face_texture_data.height or 1
             material = get_or_create_material(face_texture_name, face_texture_name)
-            material_lookup_table[texture_info_index] = add_material(material, model_object)
+            material_indices[texture_info_index] = add_material(material, model_object)
             self.load_material(face_texture_name)
 
-        uvs_per_face = []
-        faces = []
-        material_indices = []
-        for map_face in bsp_faces[entity_model.first_face:entity_model.first_face + entity_model.faces]:
-            uvs = {}
-            face = []
+        vertex_ids, corner_faces = self.gather_model_data(faces, bsp_surfedges, bsp_edges)
+        points = bsp_vertices[vertex_ids]
+        corner_texture_infos = texture_info_ids[corner_faces]
+        corner_vectors = texture_vectors[corner_texture_infos]
+        corner_sizes = texture_sizes[corner_texture_infos]
+        u = (np.einsum("ij,ij->i", points, corner_vectors[:, 0, :3]) + corner_vectors[:, 0, 3]) / corner_sizes[:, 0]
+        v = 1 - (np.einsum("ij,ij->i", points, corner_vectors[:, 1, :3]) + corner_vectors[:, 1, 3]) / corner_sizes[:, 1]
 
-            first_edge = map_face.first_edge
-            edge_count = map_face.edges
-
-            used_surf_edges = bsp_surfedges[first_edge:first_edge + edge_count]
-            reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
-            used_edges = bsp_edges[np.abs(used_surf_edges)]
-            face_vertex_ids = [u[r] for (u, r) in zip(used_edges, reverse)]
-
-            uv_vertices = bsp_vertices[face_vertex_ids]
-
-            material_indices.append(material_lookup_table[map_face.texture_info])
-
-            face_texture_info = self.bsp_lump_textures_info.values[map_face.texture_info]
-            face_texture_data = self.bsp_lump_textures_data.values[face_texture_info.texture]
-
-            tv1 = face_texture_info.s
-            tv2 = face_texture_info.t
-
-            u = (np.dot(uv_vertices, tv1[:3]) + tv1[3]) / face_texture_data.width
-            v = 1 - ((np.dot(uv_vertices, tv2[:3]) + tv2[3]) / face_texture_data.height)
-
-            v_uvs = np.dstack([u, v]).reshape((-1, 2))
-
-            for vertex_id, uv in zip(face_vertex_ids, v_uvs):
-                new_vertex_id = remapped[vertex_id]
-                face.append(new_vertex_id)
-                uvs[new_vertex_id] = uv
-            uvs_per_face.append(uvs)
-            faces.append(face[::-1])
-
-        model_mesh.from_pydata(bsp_vertices[unique_vertex_ids] * self.scale, [], faces)
-        model_mesh.polygons.foreach_set('material_index', material_indices)
-        model_mesh.update()
+        unique_vertex_ids = np.unique(vertex_ids)
+        loop_vertices = np.searchsorted(unique_vertex_ids, vertex_ids)
 
-        model_mesh.uv_layers.new()
-        model_mesh_uv = model_mesh.uv_layers[0].data
-        for poly in model_mesh.polygons:
-            for loop_index in range(poly.loop_start, poly.loop_start + poly.loop_total):
-                model_mesh_uv[loop_index].uv = uvs_per_face[poly.index][
-                    model_mesh.loops[loop_index].vertex_index]
+        model_mesh.from_polygons(bsp_vertices[unique_vertex_ids] * self.scale, loop_vertices,
+                                 faces["edges"].astype(np.int32))
+        model_mesh.polygons.foreach_set('material_index', material_indices[texture_info_ids])
+        model_mesh.uv_layers.new().data.foreach_set("uv", np.column_stack((u, v)).astype(np.float32).ravel())
         model_mesh.validate()
         return model_object
 
@@ -228,6 +202,18 @@ class BSP:
             if target_name == entry.get('target', ''):
                 return entry
 
+    def load_wads(self):
+        for entity in self.bsp_lump_entities.values:
+            if entity.get('classname') != 'worldspawn':
+                continue
+            for game_wad_path in entity.get('wad', '').split(';'):
+                if len(game_wad_path) == 0:
+                    continue
+                game_wad_path = backwalk_file_resolver(self.map_path.parent, TinyPath(game_wad_path).lstrip('/'))
+                if game_wad_path is not None and game_wad_path.exists():
+                    wad_file = self.bsp_file.wad_library.add_wad(game_wad_path)
+                    self.bsp_file.manager.add_child(GoldSrcWADContentProvider(game_wad_path, wad_file=wad_file))
+
     def load_entities(self):
         self.entry_cache = {k['targetname']: k for k in self.bsp_lump_entities.values if 'targetname' in k}
         for entity in self.bsp_lump_entities.values:
@@ -241,12 +227,8 @@ class BSP:
                                               self._single_collection)
             else:
                 if entity_class == 'worldspawn':
-                    for game_wad_path in entity.get('wad', '').split(';'):
-                        if len(game_wad_path) == 0:
-                            continue
-                        game_wad_path = backwalk_file_resolver(self.map_path.parent, TinyPath(game_wad_path).lstrip('/'))
-                        if game_wad_path is not None and game_wad_path.exists():
-                            self.bsp_file.manager.add_child(GoldSrcWADContentProvider(game_wad_path))
+                    # Nothing to build, its WADs were mounted by load_wads
+                    continue
                 elif entity_class.startswith('monster_') and 'model' in entity:
                     from .entity_handlers import handle_generic_model_prop
                     entity_collection = self.get_collection(entity_class)
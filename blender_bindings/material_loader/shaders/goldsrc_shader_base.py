@@ -1,6 +1,7 @@
 from typing import Optional, Any
 
 import bpy
+import numpy as np
 
 from SourceIO.blender_bindings.material_loader.shader_base import Nodes, ShaderBase, ExtraMaterialParameters
 from SourceIO.blender_bindings.utils.bpy_utils import is_blender_4_3, is_blender_5
@@ -64,7 +65,11 @@ class GoldSrcShaderBase(ShaderBase):
                 alpha=True
             )
 
-            model_texture.pixels.foreach_set(model_texture_info.data.ravel())
+            pixels = model_texture_info.data
+            if pixels.dtype == np.uint8:
+                # Textures are kept as uint8 RGBA, Blender takes floats
+                pixels = pixels.astype(np.float32) / 255
+            model_texture.pixels.foreach_set(pixels.ravel())
 
             model_texture.pack()
         return model_texture
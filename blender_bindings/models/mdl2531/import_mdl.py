@@ -273,15 +273,17 @@ def create_attachments(mdl: MdlV36, armature: bpy.types.Object, scale):
 
 
 def import_materials(content_manager: ContentManager, mdl, use_bvlg=False):
-    for material in mdl.materials:
-        material_path = None
+    candidates = [[TinyPath(mat_path) / material.name for mat_path in mdl.materials_paths]
+                  for material in mdl.materials]
+    owners = content_manager.find_owners(TinyPath("materials") / (path + ".vmt")
+                                         for options in candidates for path in options)
+    for material, options in zip(mdl.materials, candidates):
+        material_path = next((path for path in options
+                              if owners[TinyPath("materials") / (path + ".vmt")] is not None), None)
         material_file = None
-        for mat_path in mdl.materials_paths:
-            material_file = content_manager.find_file(TinyPath("materials") / mat_path / (material.name + ".vmt"))
-            if material_file:
-                material_path = TinyPath(mat_path) / material.name
-                break
-        if material_path is None:
+        if material_path is not None:
+            material_file = content_manager.find_file(TinyPath("materials") / (material_path + ".vmt"))
+        if material_path is None or material_file is None:
             logger.info(f'Material {material.name} not found')
             continue
         mat = get_or_create_material(material.name, material_path.as_posix())
@@ -248,19 +248,19 @@ def create_attachments(mdl: MdlV36, armature: bpy.types.Object, scale):
 
 
 def import_materials(content_manager: ContentManager, mdl, use_bvlg=False):
+    candidates = []
     for material in mdl.materials:
-        material_path = None
-        material_file = content_manager.find_file(TinyPath("materials") / (material.name + ".vmt"))
-        if '/' in material.name: # good chance the material name has the full path
-            material_file = content_manager.find_file(TinyPath("materials") / (material.name + ".vmt"))
-        if material_file:
-            material_path = TinyPath(material.name)
-        else:
-            for mat_path in mdl.materials_paths:
-                material_file = content_manager.find_file(TinyPath("materials") / mat_path / (material.name + ".vmt"))
-                if material_file:
-                    material_path = TinyPath(mat_path) / material.name
-                    break
+        options = [TinyPath(material.name)]
+        options.extend(TinyPath(mat_path) / material.name for mat_path in mdl.materials_paths)
+        candidates.append(options)
+    owners = content_manager.find_owners(TinyPath("materials") / (path + ".vmt")
+                                         for options in candidates for path in options)
+    for material, options in zip(mdl.materials, candidates):
+        material_path = next((path for path in options
+                              if owners[TinyPath("materials") / (path + ".vmt")] is not None), None)
+        material_file = None
+        if material_path is not None:
+            material_file = content_manager.find_file(TinyPath("materials") / (material_path + ".vmt"))
         if material_path is None or material_file is None:
             logger.info(f'Material {material.name} not found')
             continue
@@ -31,29 +31,33 @@ logger = log_manager.get_logger('MDL loader')
 @register_model_importer(b"IDST", 44)
 def import_mdl44(model_path: TinyPath, buffer: Buffer,
                  content_manager: ContentManager, options: ModelOptions) -> ModelContainer | None:
-    mdl = MdlV44.from_buffer(buffer)
-    vtx_buffer = find_vtx_cm(model_path, content_manager)
-    vvd_buffer = content_manager.find_file(model_path.with_suffix(".vvd"))
-    if vtx_buffer is None or vvd_buffer is None:
-        logger.error(f"Could not find VTX and/or VVD file for {model_path}")
-        raise RequiredFileNotFound(f"Could not find VTX and/or VVD file for {model_path}")
-    vtx = open_vtx(vtx_buffer)
-    vvd = Vvd.from_buffer(vvd_buffer)
-    if options.import_textures:
-        try:
-            import_materials(content_manager, mdl, use_bvlg=options.use_bvlg)
-        except Exception as t_ex:
-            logger.error(f'Failed to import materials, caused by {t_ex}')
-            import traceback
-            traceback.print_exc()
-    container = import_model(content_manager, mdl, vtx, vvd, options.scale, options.create_flex_drivers)
-    if options.import_physics:
-        phy_buffer = content_manager.find_file(model_path.with_suffix(".phy"))
-        if phy_buffer is None:
-            logger.error(f"Could not find PHY file for {model_path}")
-        else:
-            phy = Phy.from_buffer(phy_buffer)
-            import_physics(phy, phy_buffer, mdl, container, options.scale)
-    
-
-    return container
+    # Vertex and physics data are read in the background while the MDL itself is parsed
+    suffixes = [".vvd", ".phy"] if options.import_physics else [".vvd"]
+    prefetch = content_manager.prefetch(model_path.with_suffix(suffix) for suffix in suffixes)
+    try:
+        mdl = MdlV44.from_buffer(buffer)
+        vtx_buffer = find_vtx_cm(model_path, content_manager)
+        vvd_buffer = content_manager.find_file(model_path.with_suffix(".vvd"))
+        if vtx_buffer is None or vvd_buffer is None:
+            logger.error(f"Could not find VTX and/or VVD file for {model_path}")
+            raise RequiredFileNotFound(f"Could not find VTX and/or VVD file for {model_path}")
+        vtx = open_vtx(vtx_buffer)
+        vvd = Vvd.from_buffer(vvd_buffer)
+        if options.import_textures:
+            try:
+                import_materials(content_manager, mdl, use_bvlg=options.use_bvlg)
+            except Exception as t_ex:
+                logger.error(f'Failed to import materials, caused by {t_ex}')
+                import traceback
+                traceback.print_exc()
+        container = import_model(content_manager, mdl, vtx, vvd, options.scale, options.create_flex_drivers)
+        if options.import_physics:
+            phy_buffer = content_manager.find_file(model_path.with_suffix(".phy"))
+            if phy_buffer is None:
+                logger.error(f"Could not find PHY file for {model_path}")
+            else:
+                phy = Phy.from_buffer(phy_buffer)
+                import_physics(phy, phy_buffer, mdl, container, options.scale)
+        return container
+    finally:
+        prefetch.cancel()
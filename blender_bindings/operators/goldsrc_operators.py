@@ -1,6 +1,6 @@
 import bpy
 from bpy.props import (BoolProperty, CollectionProperty, FloatProperty,
-                       StringProperty)
+                       IntProperty, StringProperty)
 
 from SourceIO.blender_bindings.goldsrc.bsp.import_bsp import BSP
 from SourceIO.library.global_config import GoldSrcConfig
@@ -26,6 +26,8 @@ class SOURCEIO_OT_GBSPImport(bpy.types.Operator):
     use_hd: BoolProperty(name="Load HD models", default=False, subtype='UNSIGNED')
     single_collection: BoolProperty(name="Load everything into 1 collection", default=False, subtype='UNSIGNED')
     fix_rotation: BoolProperty(name="Fix rotations. Some games require it", default=True, subtype='UNSIGNED')
+    texture_mip: IntProperty(name="Texture mip level", description="Smaller textures for quick previews",
+                             default=0, min=0, max=3)
 
     def execute(self, context):
 
@@ -39,6 +41,7 @@ class SOURCEIO_OT_GBSPImport(bpy.types.Operator):
             logger.info(f"Loading {n}/{len(self.files)}")
             config = GoldSrcConfig()
             config.use_hd = self.use_hd
+            config.texture_mip = self.texture_mip
             bsp = BSP(content_provider, directory / file.name, scale=self.scale,
                       single_collection=self.single_collection,
                       fix_rotation=self.fix_rotation)
@@ -1,4 +1,4 @@
-from bpy.props import BoolProperty, FloatProperty
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, FloatVectorProperty
 
 from ...library.utils.math_utilities import SOURCE1_HAMMER_UNIT_TO_METERS
 
@@ -29,6 +29,21 @@ class GoldSrcBspSettings(BSPOptions):
 
 class Source1BSPSettings(GoldSrcBspSettings, Source1SharedSettings):
     import_cubemaps: BoolProperty(name="Import cubemaps", default=False, subtype='UNSIGNED')
+    import_lightmaps: BoolProperty(name="Import lightmaps", default=True, subtype='UNSIGNED')
+    import_overlays: BoolProperty(name="Import overlays", default=True, subtype='UNSIGNED')
+    load_detail_props: BoolProperty(name="Load detail props", default=False, subtype='UNSIGNED')
+    instance_static_props: BoolProperty(name="Import static prop models as instances", default=False,
+                                        subtype='UNSIGNED')
+    merge_displacements: EnumProperty(name="Merge displacements",
+                                      items=(("NONE", "Don't merge", "One object per displacement"),
+                                             ("MATERIAL", "Per material", "One object per displacement material"),
+                                             ("MAP", "Whole map", "All displacements in one object")),
+                                      default="MATERIAL")
+    import_region: BoolProperty(name="Import only a region", default=False, subtype='UNSIGNED')
+    region_min: FloatVectorProperty(name="Region min", description="Region corner in map (hammer) units",
+                                    default=(-1024.0, -1024.0, -1024.0), size=3)
+    region_max: FloatVectorProperty(name="Region max", description="Region corner in map (hammer) units",
+                                    default=(1024.0, 1024.0, 1024.0), size=3)
 
 
 class ModelOptions(SharedOptions, Source1SharedSettings):
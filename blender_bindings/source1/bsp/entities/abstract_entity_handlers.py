@@ -1,4 +1,3 @@
-from array import array
 import math
 import re
 from pprint import pformat
@@ -11,10 +10,11 @@ from SourceIO.blender_bindings.source1.bsp.entities.base_entity_classes import *
 from SourceIO.blender_bindings.source1.vtf import import_texture
 from SourceIO.blender_bindings.operators.import_settings_base import Source1BSPSettings
 from SourceIO.blender_bindings.utils.bpy_utils import add_material, get_or_create_collection, get_or_create_material
+from SourceIO.blender_bindings.utils.fast_mesh import FastMesh
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.source1.bsp.bsp_file import BSPFile
-from SourceIO.library.source1.bsp.datatypes.face import Face
-from SourceIO.library.source1.bsp.datatypes.model import Model
+from SourceIO.library.source1.bsp.lightmap_atlas import LightmapAtlas, load_lightmap_atlas
+from SourceIO.library.source1.bsp.spatial_query import BSPRegion
 from SourceIO.library.source1.bsp.datatypes.texture_data import TextureData
 from SourceIO.library.source1.bsp.datatypes.texture_info import TextureInfo
 from SourceIO.library.source1.vmt import VMT
@@ -27,80 +27,43 @@ strip_patch_coordinates = re.compile(r"_-?\d+_-?\d+_-?\d+.*$")
 log_manager = SourceLogMan()
 
 
-def gather_vertex_ids(model: Model, faces: list[Face], surf_edges: np.ndarray, edges: np.ndarray):
-    vertex_offset = 0
-    material_ids = []
-    vertex_count = 0
-    for map_face in faces[model.first_face:model.first_face + model.face_count]:
-        vertex_count += map_face.edge_count
-    vertex_ids = np.zeros(vertex_count, dtype=np.uint32)
-    for map_face in faces[model.first_face:model.first_face + model.face_count]:
-        if map_face.disp_info_id != -1:
-            continue
-        first_edge = map_face.first_edge
-        edge_count = map_face.edge_count
-        material_ids.append(map_face.tex_info_id)
+def gather_face_corners(faces: np.ndarray, surf_edges: np.ndarray, edges: np.ndarray):
+    """Corner vertex ids of every face in a face record array, in winding order.
 
-        used_surf_edges = surf_edges[first_edge:first_edge + edge_count]
-        reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
-        used_edges = edges[np.abs(used_surf_edges)]
-        tmp = np.arange(len(used_edges))
-        face_vertex_ids = used_edges[tmp, reverse]
-        vertex_ids[vertex_offset:vertex_offset + edge_count] = face_vertex_ids
-        vertex_offset += edge_count
-
-    return vertex_ids, material_ids
-
-
-def _set_uv(mesh_data, uv_data, uvs_per_face):
-    loop_count = len(mesh_data.loops)
-    flat_uvs = np.empty((loop_count, 2), dtype=np.float32)
-
-    for poly in mesh_data.polygons:
-        face_uvs = np.asarray(uvs_per_face[poly.index], dtype=np.float32)
-
-        if len(face_uvs) != poly.loop_total:
-            raise ValueError(f"UV size mismatch for polygon {poly.index}: {len(face_uvs)} UVs, {poly.loop_total} loops")
-
-        start = poly.loop_start
-        end = start + poly.loop_total
-        flat_uvs[start:end] = face_uvs
-
-    uv_data.foreach_set("uv", flat_uvs.ravel())
-
-
-def corner_hash(vertex_id, uv, luv, ndigits=6):
-    return hash((
-        int(vertex_id),
-        tuple(round(x, ndigits) for x in uv),
-        tuple(round(x, ndigits) for x in luv),
-    ))
-
-
-def remove_dupe_face_vertices(face_vertex_ids, face_uvs, face_luvs):
-    cleaned_ids = array("I")
-    cleaned_uvs = array("f")
-    cleaned_luvs = array("f")
-    seen_hashes = set()
-
-    for vertex_id, uv, luv in zip(face_vertex_ids, face_uvs, face_luvs):
-        key = corner_hash(vertex_id, uv, luv)
+    Returns the vertex ids and, for each corner, the index of the face it belongs to.
+    """
+    counts = faces["edge_count"].astype(np.int64)
+    face_offsets = np.cumsum(counts) - counts
+    corner_faces = np.repeat(np.arange(len(faces)), counts)
+    corner_edges = np.repeat(faces["first_edge"].astype(np.int64) - face_offsets, counts) + np.arange(counts.sum())
+    used_surf_edges = surf_edges[corner_edges]
+    vertex_ids = edges[np.abs(used_surf_edges), (used_surf_edges < 0).astype(np.intp)]
+    return vertex_ids, corner_faces
 
-        if key in seen_hashes:
-            continue
 
-        seen_hashes.add(key)
+def remove_dupe_face_corners(corner_faces: np.ndarray, vertex_ids: np.ndarray,
+                             uvs: np.ndarray, luvs: np.ndarray, ndigits=6) -> np.ndarray:
+    """Mask keeping the first of the corners of a face sharing vertex, UV and lightmap UV."""
+    keys = np.column_stack((corner_faces, vertex_ids, np.round(uvs, ndigits) + 0.0, np.round(luvs, ndigits) + 0.0))
+    _, first = np.unique(keys, axis=0, return_index=True)
+    keep = np.zeros(len(keys), dtype=bool)
+    keep[first] = True
+    return keep
 
-        cleaned_ids.append(int(vertex_id))
 
-        cleaned_uvs.extend((float(uv[0]), float(uv[1])))
-        cleaned_luvs.extend((float(luv[0]), float(luv[1])))
+def reverse_face_winding(corner_faces: np.ndarray, face_count: int) -> np.ndarray:
+    """Permutation reversing the corner order of every face, corners have to be grouped by face."""
+    counts = np.bincount(corner_faces, minlength=face_count)
+    starts = np.cumsum(counts) - counts
+    position = np.arange(len(corner_faces)) - starts[corner_faces]
+    return starts[corner_faces] + counts[corner_faces] - 1 - position
 
-    ids = np.frombuffer(cleaned_ids, dtype=np.uint32).copy()
-    uvs = np.frombuffer(cleaned_uvs, dtype=np.float32).reshape((-1, 2)).copy()
-    luvs = np.frombuffer(cleaned_luvs, dtype=np.float32).reshape((-1, 2)).copy()
 
-    return ids, uvs, luvs
+def project_uvs(points: np.ndarray, vectors: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Project points with per point (2, 4) texture vectors, V is flipped for Blender."""
+    u = (np.einsum("ij,ij->i", points, vectors[:, 0, :3]) + vectors[:, 0, 3]) / sizes[:, 0]
+    v = 1.0 - (np.einsum("ij,ij->i", points, vectors[:, 1, :3]) + vectors[:, 1, 3]) / sizes[:, 1]
+    return np.column_stack((u, v))
 
 
 def register_entity_handlers(handler_class):
@@ -196,6 +159,9 @@ class AbstractEntityHandler:
         self._entity_by_name_cache = {}
         self._world_geometry_name = ""
         self.settings: Source1BSPSettings | None = None
+        self._lightmap_atlas: LightmapAtlas | None | bool = False
+        # Only world faces and entities inside this region are imported
+        self.region: BSPRegion | None = None
 
     def load_entities(self, settings: Source1BSPSettings):
         self.settings = settings
@@ -216,6 +182,8 @@ class AbstractEntityHandler:
                 continue
             elif entity_class.endswith("rope") and not settings.load_ropes:
                 continue
+            if self.region is not None and not self._entity_in_region(entity_data):
+                continue
             if not self.handle_entity(entity_data):
                 self.logger.warn(pformat(entity_data))
         bpy.context.view_layer.update()
@@ -249,31 +217,59 @@ class AbstractEntityHandler:
         entity_obj = entity_class(entity)
         return entity_obj, entity
 
+    def _entity_in_region(self, entity_data: dict) -> bool:
+        origin = np.array(parse_float_vector(entity_data.get('origin', '0 0 0')), np.float32)
+        model = entity_data.get('model', '')
+        if isinstance(model, str) and model.startswith('*'):
+            model_id = int(model[1:])
+            # The world is clipped face by face
+            return model_id == 0 or self.region.overlaps_model(model_id, origin)
+        if 'origin' not in entity_data:
+            return True
+        return bool(self.region.contains(origin)[0])
+
+    def _get_lightmap_atlas(self) -> LightmapAtlas | None:
+        """Lightmap atlas of the map, its pages are created as images on first use."""
+        if self._lightmap_atlas is False:
+            self._lightmap_atlas = None
+            if self.settings is not None and getattr(self.settings, "import_lightmaps", False):
+                self._lightmap_atlas = load_lightmap_atlas(self._bsp)
+            if self._lightmap_atlas is not None:
+                for page_id, pixels in enumerate(self._lightmap_atlas.pages):
+                    name = f"{self._bsp.filepath.stem}_lightmap_{page_id}"
+                    image = bpy.data.images.get(name) or bpy.data.images.new(name, pixels.shape[1], pixels.shape[0],
+                                                                             alpha=True, float_buffer=True)
+                    image.pixels.foreach_set(pixels.ravel())
+                    image.pack()
+        return self._lightmap_atlas
+
     def _load_brush_model(self, model_id, model_name):
         def _get_string(string_id: int) -> str:
             strings: list[str] = self._bsp.get_lump('LUMP_TEXDATA_STRING_TABLE').strings
             return strings[string_id] or "NO_NAME"
 
         model = self._bsp.get_lump("LUMP_MODELS").models[model_id]
-        mesh_data = bpy.data.meshes.new(f"{model_name}_MESH")
+        mesh_data = FastMesh.new(f"{model_name}_MESH")
         mesh_obj = bpy.data.objects.new(model_name, mesh_data)
 
         bsp_surf_edges: np.ndarray = self._bsp.get_lump('LUMP_SURFEDGES').surf_edges
         bsp_vertices: np.ndarray = self._bsp.get_lump('LUMP_VERTICES').vertices
         bsp_edges: np.ndarray = self._bsp.get_lump('LUMP_EDGES').edges
-        bsp_faces: list[Face] = self._bsp.get_lump('LUMP_FACES').faces
+        bsp_faces: np.ndarray = self._bsp.get_lump('LUMP_FACES').records
         bsp_textures_info: list[TextureInfo] = self._bsp.get_lump('LUMP_TEXINFO').texture_info
         bsp_textures_data: list[TextureData] = self._bsp.get_lump('LUMP_TEXDATA').texture_data
 
-        vertex_ids, material_ids = gather_vertex_ids(model, bsp_faces, bsp_surf_edges, bsp_edges)
-        unique_vertex_ids = np.unique(vertex_ids)
-
-        tmp2 = np.searchsorted(unique_vertex_ids, vertex_ids)
-        remapped = dict(zip(vertex_ids, tmp2))
+        if self.region is not None and model_id == 0:
+            face_ids = self.region.face_ids(model_id)
+        else:
+            face_ids = np.arange(model.first_face, model.first_face + model.face_count)
+        face_ids = face_ids[bsp_faces["disp_info_id"][face_ids].astype(np.int32) == -1]
+        faces = bsp_faces[face_ids]
 
         material_lookup_table = {}
+        texture_info_materials = {}
         skippable_materials = set()
-        for texture_info_id in sorted(set(material_ids)):
+        for texture_info_id in np.unique(faces["tex_info_id"]).tolist():
             texture_info = bsp_textures_info[texture_info_id]
             texture_data = bsp_textures_data[texture_info.texture_data_id]
             material_name = _get_string(texture_data.name_id)
@@ -295,95 +291,60 @@ class AbstractEntityHandler:
                             skippable_materials.add(texture_info_id)
             material = get_or_create_material(path_stem(material_name), material_name)
             material_lookup_table[texture_data.name_id] = add_material(material, mesh_obj)
-
-        faces = []
-        uvs_per_face = []
-        luvs_per_face = []
-        material_indices = []
-
-        for map_face in bsp_faces[model.first_face:model.first_face + model.face_count]:
-            if map_face.disp_info_id != -1:
-                continue
-
-            if map_face.tex_info_id in skippable_materials:
-                continue
-
-            used_surf_edges = bsp_surf_edges[map_face.first_edge:map_face.first_edge + map_face.edge_count]
-
-            used_edges = bsp_edges[np.abs(used_surf_edges)]
-            reverse = (used_surf_edges < 0).astype(np.uint8)
-
-            face_vertex_ids = used_edges[np.arange(len(used_edges)), reverse]
-
-            if len(face_vertex_ids) < 3:
-                continue
-
-            uv_vertices = bsp_vertices[face_vertex_ids]
-
-            texture_info = bsp_textures_info[map_face.tex_info_id]
+            texture_info_materials[texture_info_id] = material_lookup_table[texture_data.name_id]
+
+        if skippable_materials:
+            face_ids = face_ids[~np.isin(faces["tex_info_id"], list(skippable_materials))]
+            faces = bsp_faces[face_ids]
+
+        texture_info_ids = faces["tex_info_id"].astype(np.int64)
+        texture_vectors = np.zeros((len(bsp_textures_info), 2, 4), dtype=np.float32)
+        lightmap_vectors = np.zeros((len(bsp_textures_info), 2, 4), dtype=np.float32)
+        texture_sizes = np.ones((len(bsp_textures_info), 2), dtype=np.float32)
+        material_indices = np.zeros(len(bsp_textures_info), dtype=np.int32)
+        for texture_info_id in np.unique(texture_info_ids).tolist():
+            texture_info = bsp_textures_info[texture_info_id]
             texture_data = bsp_textures_data[texture_info.texture_data_id]
-
-            tv1, tv2 = texture_info.texture_vectors
-            lv1, lv2 = texture_info.lightmap_vectors
-
-            tex_w = texture_data.width or 512
-            tex_h = texture_data.height or 512
-
-            u = (np.dot(uv_vertices, tv1[:3]) + tv1[3]) / tex_w
-            v = 1.0 - ((np.dot(uv_vertices, tv2[:3]) + tv2[3]) / tex_h)
-
-            lu = (np.dot(uv_vertices, lv1[:3]) + lv1[3]) / tex_w
-            lv = 1.0 - ((np.dot(uv_vertices, lv2[:3]) + lv2[3]) / tex_h)
-
-            face_uvs = np.stack([u, v], axis=1)
-            face_luvs = np.stack([lu, lv], axis=1)
-
-            face_vertex_ids, face_uvs, face_luvs = remove_dupe_face_vertices(
-                face_vertex_ids,
-                face_uvs,
-                face_luvs,
-            )
-
-            if len(face_vertex_ids) < 3:
-                continue
-
-            face = []
-            remapped_face_uvs = []
-            remapped_face_luvs = []
-
-            for vertex_id, uv, luv in zip(face_vertex_ids, face_uvs, face_luvs):
-                new_vertex_id = remapped[int(vertex_id)]
-
-                face.append(new_vertex_id)
-                remapped_face_uvs.append(uv)
-                remapped_face_luvs.append(luv)
-
-            face = face[::-1]
-            remapped_face_uvs = remapped_face_uvs[::-1]
-            remapped_face_luvs = remapped_face_luvs[::-1]
-
-            if len(face) < 3:
-                print("Got invalid face len < 3")
-                continue
-
-            material_index = material_lookup_table[texture_data.name_id]
-
-            faces.append(face)
-            uvs_per_face.append(remapped_face_uvs)
-            luvs_per_face.append(remapped_face_luvs)
-            material_indices.append(material_index)
-
-        mesh_data.from_pydata(bsp_vertices[unique_vertex_ids] * self.scale, [], faces)
-        mesh_data.update()
-        mesh_data.polygons.foreach_set('material_index', material_indices)
-
-        main_uv = mesh_data.uv_layers.new()
-        uv_data = main_uv.data
-        _set_uv(mesh_data, uv_data, uvs_per_face)
-
-        lightmap_uv = mesh_data.uv_layers.new(name='lightmap')
-        uv_data = lightmap_uv.data
-        _set_uv(mesh_data, uv_data, luvs_per_face)
+            texture_vectors[texture_info_id] = texture_info.texture_vectors
+            lightmap_vectors[texture_info_id] = texture_info.lightmap_vectors
+            texture_sizes[texture_info_id] = texture_data.width or 512, texture_data.height or 512
+            material_indices[texture_info_id] = texture_info_materials[texture_info_id]
+
+        vertex_ids, corner_faces = gather_face_corners(faces, bsp_surf_edges, bsp_edges)
+        points = bsp_vertices[vertex_ids]
+        corner_texture_infos = texture_info_ids[corner_faces]
+        uvs = project_uvs(points, texture_vectors[corner_texture_infos], texture_sizes[corner_texture_infos])
+        lightmap_atlas = self._get_lightmap_atlas()
+        if lightmap_atlas is not None:
+            corner_lightmap_vectors = lightmap_vectors[corner_texture_infos]
+            luxels = (np.einsum("ij,ikj->ik", points, corner_lightmap_vectors[:, :, :3])
+                      + corner_lightmap_vectors[:, :, 3]
+                      - faces["lightmap_texture_mins_in_luxels"][corner_faces])
+            luvs = lightmap_atlas.uvs(face_ids[corner_faces], luxels)
+        else:
+            luvs = project_uvs(points, lightmap_vectors[corner_texture_infos], texture_sizes[corner_texture_infos])
+
+        keep = remove_dupe_face_corners(corner_faces, vertex_ids, uvs, luvs)
+        keep &= (np.bincount(corner_faces[keep], minlength=len(faces)) >= 3)[corner_faces]
+        corner_faces = corner_faces[keep]
+        order = reverse_face_winding(corner_faces, len(faces))
+        vertex_ids = vertex_ids[keep][order]
+        uvs = uvs[keep][order]
+        luvs = luvs[keep][order]
+
+        loop_totals = np.bincount(corner_faces, minlength=len(faces))
+        polygon_faces = np.flatnonzero(loop_totals)
+        unique_vertex_ids, loop_vertices = np.unique(vertex_ids, return_inverse=True)
+
+        mesh_data.from_polygons(bsp_vertices[unique_vertex_ids] * self.scale, loop_vertices, loop_totals[polygon_faces])
+        mesh_data.polygons.foreach_set('material_index', material_indices[texture_info_ids[polygon_faces]])
+
+        mesh_data.uv_layers.new().data.foreach_set("uv", uvs.astype(np.float32).ravel())
+        mesh_data.uv_layers.new(name='lightmap').data.foreach_set("uv", luvs.astype(np.float32).ravel())
+        if lightmap_atlas is not None:
+            # Index of the "<map>_lightmap_<page>" image each polygon's lightmap UVs point into
+            lightmap_pages = mesh_data.attributes.new("lightmap_page", 'INT', 'FACE')
+            lightmap_pages.data.foreach_set("value", lightmap_atlas.page[face_ids[polygon_faces]])
         if mesh_data.validate(verbose=True):
             self.logger.warn(f"Mesh(*{model_id}) had some invalid geometry")
         return mesh_obj
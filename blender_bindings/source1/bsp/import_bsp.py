@@ -9,27 +9,36 @@ from SourceIO.blender_bindings.source1.bsp.entities.abstract_entity_handlers imp
 from SourceIO.blender_bindings.source1.bsp.entities.quake3.quake3_entity_handler import QuakeEntityHandler
 from SourceIO.blender_bindings.source1.bsp.entities.quake3.sof_entity_handler import RavenQ3EntityHandler
 from SourceIO.blender_bindings.material_loader.shaders.idtech3.idtech3 import IdTech3Shader
-from SourceIO.blender_bindings.operators.import_settings_base import Source1BSPSettings
+from SourceIO.blender_bindings.models import import_model
+from SourceIO.blender_bindings.models.common import put_into_collections as s1_put_into_collections
+from SourceIO.blender_bindings.models.prop_animations import pose_prop
+from SourceIO.blender_bindings.operators.import_settings_base import ModelOptions, Source1BSPSettings
+from SourceIO.blender_bindings.operators.shared_operators import add_collection, get_collection
+from SourceIO.blender_bindings.shared.exceptions import RequiredFileNotFound
 from SourceIO.blender_bindings.source1.bsp.entities.quake3.swjk2 import StarWarsJediKnights2
 from SourceIO.blender_bindings.utils.fast_mesh import FastMesh
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.source1.bsp.bsp_file import open_bsp, VBSPFile
+from SourceIO.library.source1.bsp.datatypes.detail_prop_lump import DetailPropLump, DetailPropType, DetailSprite
 from SourceIO.library.source1.bsp.datatypes.static_prop_lump import StaticPropLump
 from SourceIO.library.source1.bsp.datatypes.face import Face
 from SourceIO.library.source1.bsp.datatypes.texture_data import TextureData
 from SourceIO.library.source1.bsp.datatypes.texture_info import TextureInfo
+from SourceIO.library.source1.bsp.displacement_geometry import align_displacement_corners, displacement_grids, \
+    displacement_triangles
 from SourceIO.library.source1.bsp.lumps import *
 from SourceIO.library.source1.bsp.lumps.texture_lump import Quake3TextureInfoLump
+from SourceIO.library.source1.bsp.overlay_geometry import build_overlay_geometry, overlay_arrays
+from SourceIO.library.source1.bsp.spatial_query import BSPRegion
 from SourceIO.library.source1.vmt import VMT
 from SourceIO.library.utils import Buffer, TinyPath, path_stem, SOURCE1_HAMMER_UNIT_TO_METERS
 from SourceIO.library.utils.idtech3_shader_parser import parse_shader_materials
-from SourceIO.library.utils.math_utilities import convert_rotation_source1_to_blender
 from SourceIO.logger import SourceLogMan, SLogger
 from SourceIO.blender_bindings.material_loader.material_loader import ShaderRegistry
 from SourceIO.blender_bindings.material_loader.shaders.source1_shader_base import Source1ShaderBase
-from SourceIO.blender_bindings.utils.bpy_utils import add_material, get_or_create_collection, get_or_create_material, \
-    is_blender_4_2
+from SourceIO.blender_bindings.utils.bpy_utils import add_material, find_layer_collection, get_or_create_collection, \
+    get_or_create_material, is_blender_4, is_blender_4_2
 
 from SourceIO.blender_bindings.source1.bsp.entities.base_entity_handler import BaseEntityHandler
 from SourceIO.blender_bindings.source1.bsp.entities.bms_entity_handlers import BlackMesaEntityHandler
@@ -63,17 +72,49 @@ def import_bsp(map_path: TinyPath, buffer: Buffer, content_manager: ContentManag
     if pak_lump:
         content_manager.add_child(pak_lump)
 
-    master_collection = bpy.data.collections.new(map_path.name)
-    bpy.context.scene.collection.children.link(master_collection)
-    import_entities(bsp, content_manager, settings, master_collection, logger)
-    import_cubemaps(bsp, settings, master_collection, logger)
-    import_static_props(bsp, settings, master_collection, logger)
-    import_materials(bsp, content_manager, settings, logger)
-    import_disp(bsp, settings, master_collection, logger)
+    # Material files are read in the background while entities and props are being created
+    prefetch = content_manager.prefetch(get_material_paths(bsp)) if settings.import_textures else None
+    try:
+        master_collection = bpy.data.collections.new(map_path.name)
+        bpy.context.scene.collection.children.link(master_collection)
+        region = load_import_region(bsp, settings, logger)
+        import_entities(bsp, content_manager, settings, master_collection, logger, region)
+        import_cubemaps(bsp, settings, master_collection, logger)
+        import_static_props(bsp, content_manager, settings, master_collection, logger, region)
+        import_detail_props(bsp, content_manager, settings, master_collection, logger, region)
+        import_materials(bsp, content_manager, settings, logger)
+        import_disp(bsp, settings, master_collection, logger, region)
+        import_overlays(bsp, settings, master_collection, logger, region)
+    finally:
+        if prefetch is not None:
+            prefetch.cancel()
+        bsp.close()
+
+
+def load_import_region(bsp: VBSPFile, settings: Source1BSPSettings, logger: SLogger) -> Optional[BSPRegion]:
+    if not getattr(settings, "import_region", False):
+        return None
+    region = BSPRegion.from_box(bsp, settings.region_min, settings.region_max)
+    if region is None:
+        logger.warn("Map has no node tree to query, importing the whole map")
+    return region
+
+
+def get_material_paths(bsp: VBSPFile) -> list[TinyPath]:
+    strings_lump: Optional[StringsLump] = bsp.get_lump('LUMP_TEXDATA_STRING_TABLE')
+    texture_data_lump: Optional[TextureDataLump] = bsp.get_lump('LUMP_TEXDATA')
+    if strings_lump is None or texture_data_lump is None:
+        return []
+    paths = []
+    for texture_data in texture_data_lump.texture_data:
+        material_name = strings_lump.strings[texture_data.name_id]
+        if material_name:
+            paths.append(TinyPath("materials") / (material_name.lstrip("/\\") + ".vmt"))
+    return paths
 
 
 def import_entities(bsp: VBSPFile, content_manager: ContentManager, settings: Source1BSPSettings,
-                    master_collection: bpy.types.Collection, logger: SLogger):
+                    master_collection: bpy.types.Collection, logger: SLogger, region: Optional[BSPRegion] = None):
     info = bsp.info
     steam_id = info.steam_app_id
 
@@ -117,6 +158,7 @@ def import_entities(bsp: VBSPFile, content_manager: ContentManager, settings: So
         handler_class = BaseEntityHandler
     logger.info(f"Using {handler_class.__name__} entity handler")
     entity_handler = handler_class(bsp, content_manager, master_collection, settings.scale, settings.light_scale)
+    entity_handler.region = region
 
     entity_lump: Optional[EntityLump] = bsp.get_lump('LUMP_ENTITIES')
     if entity_lump:
@@ -145,37 +187,297 @@ def import_cubemaps(bsp: VBSPFile, settings: Source1BSPSettings, master_collecti
         parent_collection.objects.link(obj)
 
 
-def import_static_props(bsp: VBSPFile, settings: Source1BSPSettings, master_collection: bpy.types.Collection,
-                        logger: SLogger):
+def import_static_props(bsp: VBSPFile, content_manager: ContentManager, settings: Source1BSPSettings,
+                        master_collection: bpy.types.Collection, logger: SLogger, region: Optional[BSPRegion] = None):
     gamelump: Optional[GameLump] = bsp.get_lump('LUMP_GAME_LUMP')
-    if gamelump and settings.load_static_props:
-        static_prop_lump: StaticPropLump = gamelump.game_lumps.get('sprp', None)
-        if static_prop_lump:
-            parent_collection = get_or_create_collection('static_props', master_collection)
-            for n, prop in enumerate(static_prop_lump.static_props):
-                model_name = static_prop_lump.model_names[prop.prop_type]
-                placeholder = bpy.data.objects.new(f'static_prop_{n}', None)
-                placeholder.location = np.multiply(prop.origin, settings.scale)
-                placeholder.rotation_euler = convert_rotation_source1_to_blender(prop.rotation)
-                placeholder.scale = prop.scaling
-
-                placeholder.scale *= settings.scale
-                placeholder.empty_display_size = 16
-
-                placeholder['entity_data'] = {'parent_path': str(bsp.filepath.parent),
-                                              'prop_path': model_name,
-                                              'scale': settings.scale,
-                                              'type': 'static_props',
-                                              'skin': str(prop.skin - 1 if prop.skin != 0 else 0),
-                                              'entity': {
-                                                  'type': 'static_prop',
-                                                  'origin': '{} {} {}'.format(*prop.origin),
-                                                  'angles': '{} {} {}'.format(*prop.rotation),
-                                                  'scale': '{} {} {}'.format(*prop.scaling),
-                                                  'skin': str(prop.skin - 1 if prop.skin != 0 else 0),
-                                              }
-                                              }
-                parent_collection.objects.link(placeholder)
+    if not gamelump or not settings.load_static_props:
+        return
+    static_prop_lump: StaticPropLump = gamelump.game_lumps.get('sprp', None)
+    if not static_prop_lump or not len(static_prop_lump.records):
+        return
+    parent_collection = get_or_create_collection('static_props', master_collection)
+
+    origins = static_prop_lump.origins
+    prop_ids = np.arange(len(origins))
+    if region is not None:
+        prop_ids = np.flatnonzero(region.contains(origins))
+    prop_types = static_prop_lump.prop_types[prop_ids]
+    skins = static_prop_lump.skins[prop_ids]
+    origins = origins[prop_ids]
+    angles = static_prop_lump.angles[prop_ids]
+    # Vindictus per-axis scaling times the CS:GO / Strata uniform scale, both are 1 where a version lacks them
+    scaling = static_prop_lump.scaling[prop_ids] * static_prop_lump.uniform_scales[prop_ids, None]
+    locations = (origins * settings.scale).tolist()
+    rotations = np.deg2rad(angles)[:, [2, 0, 1]].tolist()
+    scales = (scaling * settings.scale).tolist()
+
+    # One instance collection per (model, skin), each model is parsed once no matter how often it is placed
+    instance_collections: dict[tuple[int, int], Optional[bpy.types.Collection]] = {}
+    if settings.instance_static_props:
+        model_collections = {}
+        for prop_type, skin in np.unique(np.column_stack((prop_types, skins)), axis=0).tolist():
+            if prop_type not in model_collections:
+                model_collections[prop_type] = _import_static_prop_model(
+                    TinyPath(static_prop_lump.model_names[prop_type]), content_manager, settings, logger)
+            instance_collections[(prop_type, skin)] = _get_skin_collection(model_collections[prop_type], skin)
+
+    for n, prop_type, skin, origin, angle, prop_scaling, location, rotation, scale in zip(
+            prop_ids.tolist(), prop_types.tolist(), skins.tolist(), origins.tolist(), angles.tolist(),
+            scaling.tolist(), locations, rotations, scales):
+        model_name = static_prop_lump.model_names[prop_type]
+        instance_collection = instance_collections.get((prop_type, skin), None)
+        obj = bpy.data.objects.new(f'static_prop_{n}', None)
+        obj.location = location
+        obj.rotation_euler = rotation
+        obj.scale = scale
+        if instance_collection is not None:
+            obj.instance_type = 'COLLECTION'
+            obj.instance_collection = instance_collection
+        else:
+            obj.empty_display_size = 16
+
+        obj['entity_data'] = {'parent_path': str(bsp.filepath.parent),
+                              'prop_path': None if instance_collection is not None else model_name,
+                              'imported': instance_collection is not None,
+                              'scale': settings.scale,
+                              'type': 'static_props',
+                              'skin': str(skin - 1 if skin != 0 else 0),
+                              'entity': {
+                                  'type': 'static_prop',
+                                  'origin': '{} {} {}'.format(*origin),
+                                  'angles': '{} {} {}'.format(*angle),
+                                  'scale': '{} {} {}'.format(*prop_scaling),
+                                  'skin': str(skin - 1 if skin != 0 else 0),
+                              }
+                              }
+        parent_collection.objects.link(obj)
+
+
+def import_detail_props(bsp: VBSPFile, content_manager: ContentManager, settings: Source1BSPSettings,
+                        master_collection: bpy.types.Collection, logger: SLogger, region: Optional[BSPRegion] = None):
+    """Detail props as one point cloud object, instanced by a geometry nodes modifier.
+
+    Every point carries ``instance_index``, ``rotation`` (XYZ euler) and ``scale`` attributes, ``instance_index``
+    picks the model or sprite from the map's detail instance collection: models first, then sprites.
+    """
+    gamelump: Optional[GameLump] = bsp.get_lump('LUMP_GAME_LUMP')
+    if not gamelump or not getattr(settings, "load_detail_props", False):
+        return
+    detail_lump: Optional[DetailPropLump] = gamelump.game_lumps.get('dprp', None)
+    if not detail_lump or not len(detail_lump.records):
+        return
+
+    origins = detail_lump.origins
+    prop_ids = np.arange(len(origins))
+    if region is not None:
+        prop_ids = np.flatnonzero(region.contains(origins))
+    if not len(prop_ids):
+        return
+    model_count = len(detail_lump.model_names)
+    types = detail_lump.types[prop_ids]
+    instance_indices = (np.where(types == DetailPropType.MODEL, 0, model_count)
+                        + detail_lump.model_ids[prop_ids]).astype(np.int32)
+    used_instances = set(np.unique(instance_indices).tolist())
+
+    map_name = bsp.filepath.stem
+    master_instance_collection = get_or_create_collection("MASTER_INSTANCES_DO_NOT_EDIT", bpy.context.scene.collection)
+    master_instance_lcollection = find_layer_collection(bpy.context.view_layer.layer_collection,
+                                                        master_instance_collection.name)
+    if master_instance_lcollection is not None:
+        master_instance_lcollection.exclude = True
+    instance_collection = bpy.data.collections.new(f"{map_name}_detail_instances")
+    master_instance_collection.children.link(instance_collection)
+
+    sprite_material = None
+    if len(detail_lump.sprites):
+        sprite_material = _get_detail_sprite_material(bsp, content_manager, settings, logger)
+    # Collection Info hands out children sorted by name, the zero padded index keeps them in instance order
+    for index in range(model_count + len(detail_lump.sprites)):
+        name = f"{map_name}_detail_{index:05}"
+        if index < model_count:
+            obj = bpy.data.objects.new(name, None)
+            if index in used_instances:
+                collection = _import_static_prop_model(TinyPath(detail_lump.model_names[index]), content_manager,
+                                                       settings, logger)
+                if collection is not None:
+                    obj.instance_type = 'COLLECTION'
+                    obj.instance_collection = collection
+        else:
+            obj = bpy.data.objects.new(name, _detail_sprite_mesh(name, detail_lump.sprites[index - model_count]))
+            if sprite_material is not None:
+                add_material(sprite_material, obj)
+        instance_collection.objects.link(obj)
+
+    scales = (detail_lump.scales[prop_ids] * settings.scale).astype(np.float32)
+    rotations = np.deg2rad(detail_lump.angles[prop_ids])[:, [2, 0, 1]].astype(np.float32)
+    mesh_data = bpy.data.meshes.new(f"{map_name}_detail_props_POINTS")
+    mesh_data.vertices.add(len(prop_ids))
+    mesh_data.vertices.foreach_set("co", (origins[prop_ids] * settings.scale).astype(np.float32).ravel())
+    mesh_data.attributes.new("instance_index", 'INT', 'POINT').data.foreach_set("value", instance_indices)
+    mesh_data.attributes.new("rotation", 'FLOAT_VECTOR', 'POINT').data.foreach_set("vector", rotations.ravel())
+    mesh_data.attributes.new("scale", 'FLOAT', 'POINT').data.foreach_set("value", scales)
+    mesh_data.attributes.new("detail_type", 'INT', 'POINT').data.foreach_set("value", types)
+
+    points_obj = bpy.data.objects.new(f"{map_name}_detail_props", mesh_data)
+    modifier = points_obj.modifiers.new("Detail props", 'NODES')
+    modifier.node_group = _create_detail_instancer(f"{map_name}_detail_instancer", instance_collection)
+    get_or_create_collection('detail_props', master_collection).objects.link(points_obj)
+    logger.info(f"Placed {len(prop_ids)} detail props from {len(used_instances)} models and sprites")
+
+
+def _detail_sprite_mesh(name: str, sprite: DetailSprite) -> bpy.types.Mesh:
+    """Sprite quad in the engine's right/up plane, right is -Y."""
+    (left, top), (right, bottom) = sprite.upper_left, sprite.lower_right
+    (u0, v0), (u1, v1) = sprite.upper_left_uv, sprite.lower_right_uv
+    mesh_data = bpy.data.meshes.new(f"{name}_MESH")
+    mesh_data.from_pydata([(0, -left, top), (0, -left, bottom), (0, -right, bottom), (0, -right, top)], [],
+                          [(0, 1, 2, 3)])
+    uvs = np.array([(u0, v0), (u0, v1), (u1, v1), (u1, v0)], np.float32)
+    uvs[:, 1] = 1 - uvs[:, 1]
+    mesh_data.uv_layers.new().data.foreach_set("uv", uvs.ravel())
+    return mesh_data
+
+
+def _get_detail_sprite_material(bsp: VBSPFile, content_manager: ContentManager, settings: Source1BSPSettings,
+                                logger: SLogger) -> bpy.types.Material:
+    entity_lump: Optional[EntityLump] = bsp.get_lump('LUMP_ENTITIES')
+    worldspawn = next((entity for entity in entity_lump.entities if entity.get("classname") == "worldspawn"), {})
+    material_name = worldspawn.get("detailmaterial", "detail/detailsprites")
+    mat = get_or_create_material(path_stem(material_name), material_name)
+    if settings.import_textures and not mat.get('source1_loaded'):
+        material_path = TinyPath("materials") / (material_name + ".vmt")
+        material_file = content_manager.find_file(material_path)
+        if material_file:
+            try:
+                vmt = VMT(material_file, material_path, content_manager)
+                ShaderRegistry.source1_create_nodes(content_manager, mat, vmt, {})
+            except Exception as e:
+                logger.exception("Failed to load detail sprite material due to exception:", e)
+        else:
+            logger.warn(f"Failed to find detail sprite material {material_name}")
+    return mat
+
+
+def _create_detail_instancer(name: str, instance_collection: bpy.types.Collection) -> bpy.types.NodeTree:
+    """Geometry nodes placing one child of ``instance_collection`` on every point, picked by its attributes."""
+    group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+    if is_blender_4():
+        group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+        group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    else:
+        group.inputs.new('NodeSocketGeometry', "Geometry")
+        group.outputs.new('NodeSocketGeometry', "Geometry")
+    nodes, links = group.nodes, group.links
+
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+    collection_info = nodes.new('GeometryNodeCollectionInfo')
+    collection_info.transform_space = 'ORIGINAL'
+    collection_info.inputs['Collection'].default_value = instance_collection
+    collection_info.inputs['Separate Children'].default_value = True
+    collection_info.inputs['Reset Children'].default_value = True
+    instancer = nodes.new('GeometryNodeInstanceOnPoints')
+    instancer.inputs['Pick Instance'].default_value = True
+
+    def named_attribute(attribute_name: str, data_type: str, y: float):
+        node = nodes.new('GeometryNodeInputNamedAttribute')
+        node.data_type = data_type
+        node.inputs['Name'].default_value = attribute_name
+        node.location = (-300, y)
+        return next(socket for socket in node.outputs if socket.enabled)
+
+    links.new(group_input.outputs[0], instancer.inputs['Points'])
+    links.new(collection_info.outputs[0], instancer.inputs['Instance'])
+    links.new(named_attribute("instance_index", 'INT', -200), instancer.inputs['Instance Index'])
+    links.new(named_attribute("rotation", 'FLOAT_VECTOR', -350), instancer.inputs['Rotation'])
+    links.new(named_attribute("scale", 'FLOAT', -500), instancer.inputs['Scale'])
+    links.new(instancer.outputs['Instances'], group_output.inputs[0])
+
+    group_input.location = (-300, 200)
+    collection_info.location = (-300, 0)
+    group_output.location = (300, 0)
+    return group
+
+
+def _import_static_prop_model(prop_path: TinyPath, content_manager: ContentManager, settings: Source1BSPSettings,
+                              logger: SLogger) -> Optional[bpy.types.Collection]:
+    """Import a static prop model once into the shared instance collection, posed at its default sequence.
+
+    Returns None when the model can't be loaded, its props are left as placeholders then.
+    """
+    instance_collection = get_collection(prop_path)
+    if instance_collection is not None and (collection := bpy.data.collections.get(instance_collection)):
+        return collection
+    mdl_file = content_manager.find_file(prop_path)
+    if not mdl_file:
+        logger.warn(f"Failed to find MDL file for static prop {prop_path}")
+        return None
+    options = ModelOptions()
+    options.import_textures = settings.import_textures
+    options.import_physics = False
+    options.create_flex_drivers = False
+    options.scale = 1.0
+    options.use_bvlg = settings.use_bvlg
+    options.bodygroup_grouping = False
+    options.import_animations = False
+    try:
+        model_container = import_model(prop_path, mdl_file, content_manager, options,
+                                       content_manager.get_steamid_from_asset(prop_path))
+    except (RequiredFileNotFound, ValueError) as e:
+        logger.warn(f"Failed to load static prop {prop_path}: {e}")
+        return None
+    if model_container is None:
+        logger.warn(f"Failed to load MDL file for static prop {prop_path}")
+        return None
+    if model_container.armature is not None:
+        mdl_file.seek(0)
+        model_container.armature['prop_animation'] = pose_prop(content_manager, model_container.armature,
+                                                               prop_path, mdl_file, None) or ''
+
+    master_instance_collection = get_or_create_collection("MASTER_INSTANCES_DO_NOT_EDIT", bpy.context.scene.collection)
+    master_instance_lcollection = find_layer_collection(bpy.context.view_layer.layer_collection,
+                                                        master_instance_collection.name)
+    if master_instance_lcollection is not None:
+        master_instance_lcollection.exclude = True
+    s1_put_into_collections(model_container, prop_path.stem, master_instance_collection, False)
+    add_collection(prop_path, model_container.master_collection)
+    return model_container.master_collection
+
+
+def _get_skin_collection(collection: Optional[bpy.types.Collection], skin: int) -> Optional[bpy.types.Collection]:
+    """Instance collection of a model showing another skin.
+
+    The objects are copies sharing the mesh data of the default skin, only their material slots are
+    overridden per object.
+    """
+    if collection is None or skin == 0:
+        return collection
+    skin_name = f"{collection.name}_skin{skin}"
+    if (skin_collection := bpy.data.collections.get(skin_name)) is not None:
+        return skin_collection
+    objects = list(collection.all_objects)
+    if not any(str(skin) in obj.get('skin_groups', {}) for obj in objects):
+        return collection
+    skin_collection = get_or_create_collection(skin_name, get_or_create_collection("MASTER_INSTANCES_DO_NOT_EDIT",
+                                                                                   bpy.context.scene.collection))
+
+    copies = {obj: obj.copy() for obj in objects}
+    for obj, obj_copy in copies.items():
+        obj_copy.parent = copies.get(obj.parent, obj.parent)
+        for modifier in obj_copy.modifiers:
+            if modifier.type == 'ARMATURE' and modifier.object in copies:
+                modifier.object = copies[modifier.object]
+        skin_groups = obj.get('skin_groups', {})
+        if str(skin) in skin_groups and obj.get('active_skin') in skin_groups:
+            remap = dict(zip(skin_groups[obj['active_skin']], skin_groups[str(skin)]))
+            for slot in obj_copy.material_slots:
+                replacement = remap.get(slot.material, None)
+                if isinstance(replacement, bpy.types.Material):
+                    slot.link = 'OBJECT'
+                    slot.material = replacement
+            obj_copy['active_skin'] = str(skin)
+        skin_collection.objects.link(obj_copy)
+    return skin_collection
 
 
 def import_materials(bsp: VBSPFile, content_manager: ContentManager, settings: Source1BSPSettings, logger: SLogger):
@@ -192,6 +494,7 @@ def import_materials(bsp: VBSPFile, content_manager: ContentManager, settings: S
         pak_lump: Optional[PakLump] = bsp.get_lump('LUMP_PAK')
         if pak_lump:
             content_manager.add_child(pak_lump)
+        pending = []
         for texture_data in texture_data_lump.texture_data:
             material_name = strings_lump.strings[texture_data.name_id] or "NO_NAME"
             material_name = material_name.lstrip("/\\")
@@ -203,9 +506,14 @@ def import_materials(bsp: VBSPFile, content_manager: ContentManager, settings: S
                 logger.debug(
                     f'Skipping loading of {tmp} as it already loaded')
                 continue
+            pending.append((material_name, mat, TinyPath("materials") / (material_name + ".vmt")))
+
+        # Owners are resolved in one batch, every VMT is opened only when its turn comes
+        material_files = content_manager.find_files(material_path for _, _, material_path in pending)
+        for (material_name, mat, material_path), (_, material_file) in zip(pending, material_files):
+            if mat.get('source1_loaded'):
+                continue
             logger.info(f"Loading {material_name} material")
-            material_path = TinyPath("materials") / (material_name + ".vmt")
-            material_file = content_manager.find_file(material_path)
 
             if material_file:
                 try:
@@ -292,7 +600,7 @@ def get_texture_data(tex_info: TextureInfo, bsp: VBSPFile) -> Optional[TextureDa
 
 
 def import_disp(bsp: VBSPFile, settings: Source1BSPSettings,
-                master_collection: bpy.types.Collection, logger: SLogger):
+                master_collection: bpy.types.Collection, logger: SLogger, region: Optional[BSPRegion] = None):
     disp_info_lump: Optional[DispInfoLump] = bsp.get_lump('LUMP_DISPINFO')
     if not disp_info_lump or not disp_info_lump.infos:
         return
@@ -303,85 +611,99 @@ def import_disp(bsp: VBSPFile, settings: Source1BSPSettings,
     edge_lump: Optional[EdgeLump] = bsp.get_lump('LUMP_EDGES')
     surf_edge_lump: Optional[SurfEdgeLump] = bsp.get_lump('LUMP_SURFEDGES')
     disp_verts_lump: Optional[DispVertLump] = bsp.get_lump('LUMP_DISP_VERTS')
-    surf_edges = surf_edge_lump.surf_edges
-    vertices = vertex_lump.vertices
-    edges = edge_lump.edges
-
-    disp_verts = disp_verts_lump.transformed_vertices
-
-    parent_collection = get_or_create_collection('displacements', master_collection)
-    info_count = len(disp_info_lump.infos)
-    multiblend_offset = 0
-    for n, disp_info in enumerate(disp_info_lump.infos):
-        logger.info(f'Processing {n + 1}/{info_count} displacement face')
-        final_vertex_colors = {}
-        src_face = disp_info.get_source_face(bsp)
-
-        texture_info = get_tex_info(src_face, bsp)
-        texture_data = get_texture_data(texture_info, bsp)
-        tv1, tv2 = texture_info.texture_vectors
-
-        first_edge = src_face.first_edge
-        edge_count = src_face.edge_count
-
-        used_surf_edges = surf_edges[first_edge:first_edge + edge_count]
-        reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
-        used_edges = edges[np.abs(used_surf_edges)]
-        tmp = np.arange(used_edges.shape[0])
-        face_vertex_ids = used_edges[tmp, reverse]
-        face_vertices = vertices[face_vertex_ids] * settings.scale
-
-        start_pos = np.asarray(disp_info.start_position, np.float32)
-        min_index = np.where(
-            np.sum(
-                np.isclose(face_vertices,
-                           start_pos * settings.scale,
-                           0.5e-2),
-                axis=1
-            ) == 3)
-        if min_index[0].shape[0] == 0:
-            lowest = 999.e16
-            for i, value in enumerate(np.sum(face_vertices - start_pos, axis=1)):
-                if value < lowest:
-                    min_index = i
-                    lowest = value
+    face_lump: FaceLump = bsp.get_lump('LUMP_FACES')
+    texture_infos = bsp.get_lump('LUMP_TEXINFO').texture_info
+    texture_datas = bsp.get_lump('LUMP_TEXDATA').texture_data
+
+    infos = disp_info_lump.infos
+    info_count = len(infos)
+    powers = np.array([info.power for info in infos], np.int32)
+    vertex_counts = ((1 << powers) + 1) ** 2
+    vertex_starts = np.array([info.disp_vert_start for info in infos], np.int64)
+    has_multiblend = np.array([disp_multiblend is not None and info.has_multiblend for info in infos], bool)
+    multiblend_starts = np.cumsum(np.where(has_multiblend, vertex_counts, 0)) - np.where(has_multiblend,
+                                                                                         vertex_counts, 0)
+    start_positions = np.array([info.start_position for info in infos], np.float32)
+
+    src_faces = face_lump.records[np.array([info.map_face for info in infos], np.int64)]
+    texture_info_ids = src_faces["tex_info_id"].astype(np.int64)
+    corner_edges = src_faces["first_edge"].astype(np.int64)[:, None] + np.arange(4)[None, :]
+    used_surf_edges = surf_edge_lump.surf_edges[corner_edges]
+    reverse = np.subtract(1, (used_surf_edges > 0).astype(np.uint8))
+    face_vertices = vertex_lump.vertices[edge_lump.edges[np.abs(used_surf_edges), reverse]]
+    corners = align_displacement_corners(face_vertices, start_positions)
+
+    material_names = []
+    texture_vectors = np.zeros((info_count, 2, 4), np.float32)
+    texture_sizes = np.ones((info_count, 2), np.float32)
+    for n, texture_info_id in enumerate(texture_info_ids.tolist()):
+        texture_info = texture_infos[texture_info_id]
+        texture_data = texture_datas[texture_info.texture_data_id]
+        texture_vectors[n] = texture_info.texture_vectors
+        texture_sizes[n] = texture_data.view_width, texture_data.view_height
+        material_name = strings_lump.strings[texture_data.name_id] or "NO_NAME"
+        material_names.append(strip_patch_coordinates.sub("", material_name))
+
+    # Geometry of every displacement, generated for all displacements of one power at a time
+    disp_vertices: list[Optional[np.ndarray]] = [None] * info_count
+    disp_uvs: list[Optional[np.ndarray]] = [None] * info_count
+    disp_bounds = np.zeros((info_count, 2, 3), np.float32)
+    for power in np.unique(powers).tolist():
+        members = np.flatnonzero(powers == power)
+        grids = displacement_grids(corners[members], power)
+        vertex_count = grids.shape[1]
+        offsets = disp_verts_lump.transformed_vertices[vertex_starts[members, None] + np.arange(vertex_count)]
+        vectors = texture_vectors[members]
+        sizes = texture_sizes[members]
+        u = (np.einsum("dvi,di->dv", grids, vectors[:, 0, :3]) + vectors[:, 0, None, 3]) / sizes[:, None, 0]
+        v = 1 - (np.einsum("dvi,di->dv", grids, vectors[:, 1, :3]) + vectors[:, 1, None, 3]) / sizes[:, None, 1]
+        disp_bounds[members, 0] = (grids + offsets).min(axis=1)
+        disp_bounds[members, 1] = (grids + offsets).max(axis=1)
+        positions = (grids + offsets) * settings.scale
+        uvs = np.stack((u, v), axis=2)
+        for i, disp_id in enumerate(members.tolist()):
+            disp_vertices[disp_id] = positions[i]
+            disp_uvs[disp_id] = uvs[i]
+
+    merge_mode = getattr(settings, "merge_displacements", "MATERIAL")
+    in_region = region.overlaps(disp_bounds[:, 0], disp_bounds[:, 1]) if region is not None else None
+    groups: dict[str, list[int]] = {}
+    for n, info in enumerate(infos):
+        if in_region is not None and not in_region[n]:
+            continue
+        if merge_mode == "MAP":
+            key = f"{bsp.filepath.stem}_displacements"
+        elif merge_mode == "MATERIAL":
+            key = f"{bsp.filepath.stem}_disp_{path_stem(material_names[n])}"
         else:
-            min_index = min_index[0][0]
-
-        left_edge = face_vertices[(1 + min_index) & 3] - face_vertices[min_index & 3]
-        right_edge = face_vertices[(2 + min_index) & 3] - face_vertices[(3 + min_index) & 3]
-
-        num_edge_vertices = (1 << disp_info.power) + 1
-        subdivide_scale = 1.0 / (num_edge_vertices - 1)
-        left_edge_step = left_edge * subdivide_scale
-        right_edge_step = right_edge * subdivide_scale
-
-        subdiv_vert_count = num_edge_vertices ** 2
-
-        disp_vertices = np.zeros((subdiv_vert_count, 3), dtype=np.float32)
-        disp_uv = np.zeros((subdiv_vert_count, 2), dtype=np.float32)
-        disp_indices = np.arange(0, subdiv_vert_count, dtype=np.uint32) + disp_info.disp_vert_start
-        for i in range(num_edge_vertices):
-            left_end = left_edge_step * i
-            left_end += face_vertices[min_index & 3]
+            key = f"{bsp.filepath.stem}_disp_{info.map_face}"
+        groups.setdefault(key, []).append(n)
 
-            right_end = right_edge_step * i
-            right_end += face_vertices[(3 + min_index) & 3]
-
-            left_right_seg = right_end - left_end
-            left_right_step = left_right_seg * subdivide_scale
-
-            for j in range(num_edge_vertices):
-                disp_vertices[(i * num_edge_vertices + j)] = left_end + (left_right_step * j)
-        disp_uv[:, 0] = (np.dot(disp_vertices / settings.scale, tv1[:3]) + tv1[3]) / (texture_data.view_width )
-        disp_uv[:, 1] = 1 - ((np.dot(disp_vertices / settings.scale, tv2[:3]) + tv2[3]) / (texture_data.view_height))
-
-        disp_vertices_alpha = disp_verts_lump.vertices['alpha'][disp_indices] / 255
-        final_vertex_colors['vertex_alpha'] = np.ones((disp_vertices_alpha.shape[0],4))
-        final_vertex_colors['vertex_alpha'][:, 3:] = disp_vertices_alpha.reshape((disp_vertices_alpha.shape[0], 1))
-
-        if disp_multiblend and disp_info.has_multiblend:
-            multiblend_layers = disp_multiblend.blends[multiblend_offset:multiblend_offset + subdiv_vert_count]
+    parent_collection = get_or_create_collection('displacements', master_collection)
+    alphas = disp_verts_lump.vertices['alpha'].astype(np.float32) / 255
+    for group_id, (name, members) in enumerate(groups.items()):
+        logger.info(f'Building displacement mesh {group_id + 1}/{len(groups)} from {len(members)} displacements')
+        vertex_offsets = np.cumsum([0] + [vertex_counts[n] for n in members])
+        vertices = np.concatenate([disp_vertices[n] for n in members])
+        uvs = np.concatenate([disp_uvs[n] for n in members])
+        triangles = np.concatenate([displacement_triangles(int(powers[n])) + vertex_offsets[i]
+                                    for i, n in enumerate(members)])
+        group_materials = list(dict.fromkeys(material_names[n] for n in members))
+        triangle_materials = np.concatenate([np.full(len(displacement_triangles(int(powers[n]))),
+                                                     group_materials.index(material_names[n]), np.int32)
+                                             for n in members])
+
+        vertex_indices = np.concatenate([vertex_starts[n] + np.arange(vertex_counts[n]) for n in members])
+        final_vertex_colors = {'vertex_alpha': np.ones((len(vertices), 4), np.float32)}
+        final_vertex_colors['vertex_alpha'][:, 3] = alphas[vertex_indices]
+
+        if has_multiblend[members].any():
+            multiblend_layers = np.zeros(len(vertices), disp_multiblend.dtype)
+            multiblend_layers['multiblend_colors'] = 1
+            for i, n in enumerate(members):
+                if has_multiblend[n]:
+                    multiblend_layers[vertex_offsets[i]:vertex_offsets[i + 1]] = \
+                        disp_multiblend.blends[multiblend_starts[n]:multiblend_starts[n] + vertex_counts[n]]
             # m_vMultiBlend is (w1, w2, w3, w4) and maps straight onto RGBA. CS:GO's
             # lightmapped_4wayblend_ps20b.fxc reads only .g/.b/.a for layers 2/3/4:
             #     blendfactor1 = i.vertexBlend.g * lum + i.vertexBlend.g;   // layer 2
@@ -390,57 +712,34 @@ def import_disp(bsp: VBSPFile, settings: Source1BSPSettings,
             # .r (layer 1) is never sampled -- layer 1 is the base that the lerp
             # chain starts from. Swapping R and A here used to overwrite the layer-4
             # weight with the unused layer-1 one, so layer 4 never blended in.
-            final_vertex_colors['multiblend'] = multiblend_layers['multiblend'].copy()
-
+            final_vertex_colors['multiblend'] = multiblend_layers['multiblend']
             final_vertex_colors['alphablend'] = multiblend_layers['alphablend']
-            miltiblend_color_layer = multiblend_layers['multiblend_colors']
-            shape_ = multiblend_layers.shape[0]
-            final_vertex_colors['multiblend_color0'] = np.concatenate((miltiblend_color_layer[:, 0, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color1'] = np.concatenate((miltiblend_color_layer[:, 1, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color2'] = np.concatenate((miltiblend_color_layer[:, 2, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            final_vertex_colors['multiblend_color3'] = np.concatenate((miltiblend_color_layer[:, 3, :],
-                                                                       np.ones((shape_, 1))),
-                                                                      axis=1)
-            multiblend_offset += subdiv_vert_count
-        face_indices = np.zeros(((num_edge_vertices - 1) * (num_edge_vertices - 1) * 2, 3), np.uint32)
-        face_index = 0
-        for i in range(num_edge_vertices - 1):
-            for j in range(num_edge_vertices - 1):
-                index = i * num_edge_vertices + j
-                if index & 1:
-                    face_indices[face_index] = (index, index + 1, index + num_edge_vertices)
-                    face_indices[face_index + 1] = (index + 1, index + num_edge_vertices + 1, index + num_edge_vertices)
-                else:
-                    face_indices[face_index] = (index, index + num_edge_vertices + 1, index + num_edge_vertices)
-                    face_indices[face_index + 1] = (index, index + 1, index + num_edge_vertices + 1)
-                face_index += 2
-        mesh_data = FastMesh.new(f"{bsp.filepath.stem}_disp_{disp_info.map_face}_MESH")
-        mesh_obj = bpy.data.objects.new(f"{bsp.filepath.stem}_disp_{disp_info.map_face}", mesh_data)
+            multiblend_color_layer = multiblend_layers['multiblend_colors']
+            for layer in range(4):
+                final_vertex_colors[f'multiblend_color{layer}'] = np.concatenate(
+                    (multiblend_color_layer[:, layer, :], np.ones((len(vertices), 1), np.float32)), axis=1)
+
+        mesh_data = FastMesh.new(f"{name}_MESH")
+        mesh_obj = bpy.data.objects.new(name, mesh_data)
         if parent_collection is not None:
             parent_collection.objects.link(mesh_obj)
         else:
             master_collection.objects.link(mesh_obj)
-        mesh_data.from_pydata(disp_vertices + disp_verts[disp_indices] * settings.scale, [], face_indices)
+        mesh_data.from_pydata(vertices, [], triangles)
 
-        uv_data = mesh_data.uv_layers.new().data
-        vertex_indices = np.zeros((len(mesh_data.loops, )), dtype=np.uint32)
-        mesh_data.loops.foreach_get('vertex_index', vertex_indices)
-        uv_data.foreach_set('uv', disp_uv[vertex_indices].flatten())
+        # Loops are created in triangle order, so per-vertex data maps onto them directly
+        loop_vertices = triangles.ravel()
+        mesh_data.uv_layers.new().data.foreach_set('uv', uvs[loop_vertices].astype(np.float32).ravel())
 
-        for name, vertex_color_layer in final_vertex_colors.items():
-            vertex_colors = mesh_data.vertex_colors.get(name, False) or mesh_data.vertex_colors.new(name=name)
-            vertex_colors_data = vertex_colors.data
-            vertex_colors_data.foreach_set('color', vertex_color_layer[vertex_indices].flatten())
+        for layer_name, vertex_color_layer in final_vertex_colors.items():
+            vertex_colors = mesh_data.vertex_colors.get(layer_name, False) or mesh_data.vertex_colors.new(
+                name=layer_name)
+            vertex_colors.data.foreach_set('color', vertex_color_layer[loop_vertices].ravel())
 
-        material_name = strings_lump.strings[texture_data.name_id] or "NO_NAME"
-        material_name = strip_patch_coordinates.sub("", material_name)
-        add_material(get_or_create_material(path_stem(material_name), material_name), mesh_obj)
+        for material_name in group_materials:
+            add_material(get_or_create_material(path_stem(material_name), material_name), mesh_obj)
+        if len(group_materials) > 1:
+            mesh_data.polygons.foreach_set('material_index', triangle_materials)
         mesh_data.validate(clean_customdata=False)
     # def load_physics(self):
     #     physics_lump: PhysicsLump = self.map_file.get_lump('LUMP_PHYSICS')
@@ -453,3 +752,57 @@ def import_disp(bsp: VBSPFile, settings: Source1BSPSettings,
     #             mesh_obj = bpy.data.objects.new(f"physics_{sb_id}_{s_id}",
     #                                             bpy.data.meshes.new(f"physics_{sb_id}_{s_id}_MESH"))
     #             mesh_data = mesh_obj.data
+
+
+def import_overlays(bsp: VBSPFile, settings: Source1BSPSettings,
+                    master_collection: bpy.types.Collection, logger: SLogger, region: Optional[BSPRegion] = None):
+    overlay_lump: Optional[OverlayLump] = bsp.get_lump('LUMP_OVERLAYS')
+    if not getattr(settings, "import_overlays", False) or not overlay_lump or not overlay_lump.overlays:
+        return
+    face_lump: Optional[FaceLump] = bsp.get_lump('LUMP_FACES')
+    plane_lump: Optional[PlaneLump] = bsp.get_lump('LUMP_PLANES')
+    if not hasattr(face_lump, "records") or plane_lump is None or not hasattr(plane_lump.planes, "records"):
+        return
+    strings_lump: StringsLump = bsp.get_lump('LUMP_TEXDATA_STRING_TABLE')
+    texture_infos = bsp.get_lump('LUMP_TEXINFO').texture_info
+    texture_datas = bsp.get_lump('LUMP_TEXDATA').texture_data
+
+    overlays = overlay_arrays(overlay_lump.overlays)
+    if region is not None:
+        in_region = region.contains(overlays["origin"])
+        overlays = {name: column[in_region] for name, column in overlays.items()}
+    geometry = build_overlay_geometry(overlays, face_lump.records, plane_lump.planes.records,
+                                      bsp.get_lump('LUMP_VERTICES').vertices, bsp.get_lump('LUMP_EDGES').edges,
+                                      bsp.get_lump('LUMP_SURFEDGES').surf_edges)
+    if not len(geometry.loop_totals):
+        return
+
+    material_names = []
+    for texture_info_id in overlays["tex_info"].tolist():
+        texture_data = texture_datas[texture_infos[texture_info_id].texture_data_id]
+        material_name = strings_lump.strings[texture_data.name_id] or "NO_NAME"
+        material_names.append(strip_patch_coordinates.sub("", material_name))
+    polygon_materials = np.array(material_names, object)[geometry.polygon_overlays]
+    unique_materials, polygon_groups = np.unique(polygon_materials, return_inverse=True)
+
+    # One mesh per material, polygons keep their own corners so overlapping overlays don't share vertices
+    parent_collection = get_or_create_collection('overlays', master_collection)
+    polygon_starts = geometry.polygon_starts
+    for group_id, material_name in enumerate(unique_materials.tolist()):
+        polygons = np.flatnonzero(polygon_groups == group_id)
+        loop_totals = geometry.loop_totals[polygons]
+        offsets = np.cumsum(loop_totals) - loop_totals
+        point_ids = np.repeat(polygon_starts[polygons] - offsets, loop_totals) + np.arange(loop_totals.sum())
+
+        name = f"{bsp.filepath.stem}_overlay_{path_stem(material_name)}"
+        mesh_data = FastMesh.new(f"{name}_MESH")
+        mesh_obj = bpy.data.objects.new(name, mesh_data)
+        parent_collection.objects.link(mesh_obj)
+        mesh_data.from_polygons(geometry.positions[point_ids] * settings.scale, np.arange(len(point_ids)),
+                                loop_totals)
+        uvs = geometry.uvs[point_ids]
+        uvs[:, 1] = 1 - uvs[:, 1]
+        mesh_data.uv_layers.new().data.foreach_set('uv', uvs.astype(np.float32).ravel())
+        add_material(get_or_create_material(path_stem(material_name), material_name), mesh_obj)
+        mesh_data.validate(clean_customdata=False)
+    logger.info(f'Built {len(unique_materials)} overlay meshes from {len(overlays["origin"])} overlays')
@@ -81,22 +81,28 @@ class ImportContext:
 
 
 def load_model(content_manager: ContentManager, resource: CompiledModelResource, import_contex: ImportContext):
-    armature = create_armature(content_manager, resource, import_contex.scale)
-    physics_objects = []
-    if import_contex.import_physics:
-        physics_block = get_physics_block(content_manager, resource)
-        if physics_block is not None:
-            objects = load_physics(physics_block, import_contex.scale)
-            physics_objects = objects
-    container = ModelContainer([], defaultdict(list), physics_objects, [], armature, None)
-    objects = create_meshes(content_manager, resource, container, import_contex)
-    container.objects = objects
-    if armature:
-        for obj in objects:
-            modifier = obj.modifiers.new(type="ARMATURE", name="Armature")
-            modifier.object = armature
-
-    return container
+    # External resources (meshes, materials, physics) are read in the background while the armature is built.
+    prefetch = content_manager.prefetch(resource.get_dependencies())
+    try:
+        armature = create_armature(content_manager, resource, import_contex.scale)
+        physics_objects = []
+        if import_contex.import_physics:
+            physics_block = get_physics_block(content_manager, resource)
+            if physics_block is not None:
+                objects = load_physics(physics_block, import_contex.scale)
+                physics_objects = objects
+        container = ModelContainer([], defaultdict(list), physics_objects, [], armature, None)
+        objects = create_meshes(content_manager, resource, container, import_contex)
+        container.objects = objects
+        if armature:
+            for obj in objects:
+                modifier = obj.modifiers.new(type="ARMATURE", name="Armature")
+                modifier.object = armature
+
+        return container
+    finally:
+        # Dependencies this import never read (physics when it is off) must not hold the prefetch budget
+        prefetch.cancel()
 
 
 def clear_selection():
@@ -56,5 +56,31 @@ class FastMesh(Mesh):
                 calc_edges_loose=has_faces,
             )
 
+    def from_polygons(self,
+                      vertices: np.ndarray,
+                      loop_vertices: np.ndarray,
+                      loop_totals: np.ndarray,
+                      shade_flat=True):
+        """Bulk variant of from_pydata for polygons of mixed size.
+
+        ``loop_vertices`` holds the vertex index of every polygon corner, polygon after polygon,
+        ``loop_totals`` the number of corners of each polygon.
+        """
+        self.vertices.add(len(vertices))
+        self.vertices.foreach_set("co", vertices.ravel())
+
+        if len(loop_totals):
+            loop_totals = np.asarray(loop_totals, dtype=np.int32)
+            self.loops.add(len(loop_vertices))
+            self.polygons.add(len(loop_totals))
+            self.polygons.foreach_set("loop_start", np.cumsum(loop_totals, dtype=np.int32) - loop_totals)
+            self.loops.foreach_set("vertex_index", np.asarray(loop_vertices, dtype=np.int32))
+
+        if shade_flat:
+            self.shade_flat()
+
+        if len(loop_totals):
+            self.update(calc_edges_loose=True)
+
     def update(self, calc_edges: bool = False, calc_edges_loose: bool = False) -> None:
         return super().update(calc_edges=calc_edges, calc_edges_loose=calc_edges_loose)
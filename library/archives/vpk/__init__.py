@@ -0,0 +1,119 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from SourceIO.library.utils import FileBuffer, MemoryBuffer
+from SourceIO.library.utils.exceptions import InvalidFileMagic
+from SourceIO.library.utils.tiny_path import TinyPath
+
+VPK_MAGIC = 0x55AA1234
+VPK_DIR_ARCHIVE_INDEX = 0x7FFF
+
+
+@dataclass(slots=True)
+class VPKEntry:
+    crc: int
+    preload_size: int
+    archive_index: int
+    offset: int
+    size: int
+    preload_offset: int
+
+    @property
+    def total_size(self) -> int:
+        return self.preload_size + self.size
+
+    @property
+    def in_dir_archive(self) -> bool:
+        return self.archive_index == VPK_DIR_ARCHIVE_INDEX
+
+
+class VPKDirectory:
+    """Pure python reader of the ``_dir.vpk`` directory tree.
+
+    Only the tree is parsed, file data is never touched. Used to enumerate VPK contents and to locate
+    entries inside ``_NNN.vpk`` chunks without going through the native reader.
+    """
+
+    def __init__(self, filepath: TinyPath):
+        self.filepath = TinyPath(filepath)
+        self.version = 0
+        self.header_size = 0
+        self.tree_size = 0
+        self.entries: dict[str, VPKEntry] = {}
+        self._header = b''
+
+    def read(self) -> 'VPKDirectory':
+        with FileBuffer(self.filepath) as buffer:
+            magic, self.version, self.tree_size = buffer.read_fmt('3I')
+            if magic != VPK_MAGIC:
+                raise InvalidFileMagic("Not a VPK directory file", VPK_MAGIC.to_bytes(4, 'little'),
+                                       magic.to_bytes(4, 'little'))
+            if self.version == 1:
+                self.header_size = 12
+            elif self.version == 2:
+                buffer.skip(16)
+                self.header_size = 28
+            else:
+                raise NotImplementedError(f"Unsupported VPK version {self.version}")
+            buffer.seek(0)
+            self._header = buffer.read(self.header_size)
+            tree = MemoryBuffer(buffer.read(self.tree_size))
+        self._parse_tree(tree)
+        return self
+
+    def _parse_tree(self, tree: MemoryBuffer):
+        entries = self.entries
+        while True:
+            ext = tree.read_nt_string()
+            if not ext:
+                break
+            ext = "" if ext == " " else "." + ext
+            while True:
+                path = tree.read_nt_string()
+                if not path:
+                    break
+                prefix = "" if path == " " else path.strip("/") + "/"
+                while True:
+                    name = tree.read_nt_string()
+                    if not name:
+                        break
+                    crc, preload_size, archive_index, offset, size, _ = tree.read_fmt('IHHIIH')
+                    entries[(prefix + name + ext).lower()] = VPKEntry(crc, preload_size, archive_index,
+                                                                      offset, size, self.header_size + tree.tell())
+                    tree.skip(preload_size)
+
+    @property
+    def data_offset(self) -> int:
+        """Offset of embedded file data inside the directory archive itself."""
+        return self.header_size + self.tree_size
+
+    def signature(self) -> str:
+        """Fingerprint of the directory file, cheap enough to compute on every mount."""
+        stat = os.stat(self.filepath)
+        if not self._header:
+            with open(self.filepath, 'rb') as f:
+                header = f.read(28)
+        else:
+            header = self._header
+        digest = hashlib.md5(header)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("ascii"))
+        return digest.hexdigest()
+
+    def archive_path(self, archive_index: int) -> TinyPath:
+        if archive_index == VPK_DIR_ARCHIVE_INDEX:
+            return self.filepath
+        stem = self.filepath.stem
+        if stem.endswith("_dir"):
+            stem = stem[:-4]
+        return self.filepath.parent / f"{stem}_{archive_index:03}.vpk"
+
+    def find(self, filepath: str) -> Optional[VPKEntry]:
+        return self.entries.get(TinyPath(filepath).as_posix().lower())
+
+    def __iter__(self) -> Iterator[tuple[str, VPKEntry]]:
+        return iter(self.entries.items())
+
+    def __len__(self):
+        return len(self.entries)
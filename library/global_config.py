@@ -4,3 +4,39 @@ from .utils.singleton import SingletonMeta
 class GoldSrcConfig(metaclass=SingletonMeta):
     def __init__(self):
         self.use_hd = False
+        # Mip level of map textures, 0 is full size, each level halves width and height
+        self.texture_mip = 0
+        # Worker threads decoding map textures, 1 decodes them one after another
+        self.texture_decode_workers = 4
+
+
+class ContentManagerConfig(metaclass=SingletonMeta):
+    def __init__(self):
+        # Persist a listing of every mounted provider and pre-seed lookup caches from it
+        self.use_asset_index = True
+        # Folder asset indices are written to, None uses the per-user cache folder of the platform
+        self.asset_index_dir: str | None = None
+        # Seconds a loose folder listing is trusted before its directory mtimes are checked again
+        self.loose_index_recheck_seconds = 5.0
+        # Serve VPK files as views over memory-mapped archive chunks instead of copies
+        self.use_vpk_mmap = False
+        # Total size of file buffers ContentManager keeps around between lookups
+        self.cache_budget_bytes = 256 * 1024 * 1024
+        # Cached buffers reading straight from an open file, each one holds a file descriptor
+        self.cache_max_open_files = 16
+        # Worker threads used by ContentManager.prefetch, 0 disables prefetching
+        self.prefetch_workers = 4
+        # Prefetched bytes not yet requested by the importer, workers wait once this is reached
+        self.prefetch_max_inflight_bytes = 64 * 1024 * 1024
+        # Game detectors run concurrently on this many threads, 1 runs them one after another
+        self.detect_game_workers = 8
+
+
+class Source1BSPConfig(metaclass=SingletonMeta):
+    def __init__(self):
+        # Decode every LZMA compressed lump on worker threads right after the header is read
+        self.eager_lump_decompression = False
+        # Worker threads used for eager lump decompression
+        self.lump_decompression_workers = 4
+        # Decompressed bytes eager mode may hold before lumps fall back to lazy decompression
+        self.lump_decompression_max_bytes = 512 * 1024 * 1024
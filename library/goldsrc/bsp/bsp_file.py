@@ -1,5 +1,6 @@
 from typing import Optional
 
+from SourceIO.library.goldsrc.wad import WadLibrary
 from SourceIO.library.shared.content_manager import ContentManager
 from SourceIO.library.utils import Buffer, FileBuffer, TinyPath
 from .lump import Lump, LumpInfo, LumpType
@@ -12,6 +13,8 @@ class BspFile:
         self.lumps = {}
         self.lumps_info: list[LumpInfo] = []
         self.version = 0
+        # WADs listed by the map's worldspawn
+        self.wad_library = WadLibrary()
 
     @classmethod
     def from_filename(cls, filepath: TinyPath, content_manager: ContentManager):
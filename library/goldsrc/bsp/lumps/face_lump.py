@@ -1,3 +1,7 @@
+from collections.abc import Sequence
+
+import numpy as np
+
 from SourceIO.library.goldsrc.bsp.bsp_file import BspFile
 from SourceIO.library.goldsrc.bsp.lump import Lump, LumpInfo, LumpType
 from SourceIO.library.goldsrc.bsp.structs.face import Face
@@ -9,9 +13,14 @@ class FaceLump(Lump):
 
     def __init__(self, info: LumpInfo):
         super().__init__(info)
-        self.values: list[Face] = []
+        self.values: Sequence[Face] = []
+
+    @property
+    def records(self) -> np.ndarray:
+        """All faces as one structured array with :class:`Face` field names as columns."""
+        if not self.values:
+            return np.zeros(0, Face.LAYOUT.dtype)
+        return self.values.records
 
     def parse(self, buffer: Buffer, bsp: BspFile):
-        while buffer:
-            face = Face.from_buffer(buffer)
-            self.values.append(face)
+        self.values = buffer.read_structure_array(buffer.tell(), buffer.remaining() // Face.LAYOUT.size, Face)
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from SourceIO.library.goldsrc.bsp.bsp_file import BspFile
 from SourceIO.library.goldsrc.bsp.lump import Lump, LumpInfo, LumpType
 from SourceIO.library.goldsrc.bsp.structs.texture import TextureData
@@ -28,3 +30,18 @@ class TextureDataLump(Lump):
             texture_data.info_id = n
             self.key_values[texture_data.name] = texture_data
             self.values.append(texture_data)
+
+    def load_contents(self, bsp: BspFile, texture_mip: int = 0, workers: int = 4):
+        """Decode every texture of the map up front, embedded and WAD textures on ``workers`` threads."""
+        embedded = [texture for texture in self.values if texture.is_embedded]
+        bsp.wad_library.decode_textures([texture.name for texture in self.values if not texture.is_embedded],
+                                        texture_mip, workers)
+        if workers > 1 and len(embedded) > 1:
+            with ThreadPoolExecutor(min(workers, len(embedded))) as pool:
+                decoded = list(pool.map(lambda texture: texture.decode_embedded(texture_mip), embedded))
+            for texture, data in zip(embedded, decoded):
+                texture.data = data
+                texture._data_mip = texture_mip
+        # Cached now, textures of WADs outside of the library are looked up through the content manager
+        for texture in self.values:
+            texture.get_contents(bsp, texture_mip)
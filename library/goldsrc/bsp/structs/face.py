@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 
 from SourceIO.library.utils import Buffer
+from SourceIO.library.utils.struct_layout import struct_layout
 
 
+@struct_layout(("plane", "H"), ("plane_side", "H"), ("first_edge", "I"), ("edges", "H"), ("texture_info", "H"),
+               ("styles", "4B"), ("light_map_offset", "I"))
 @dataclass(slots=True)
 class Face:
     plane: int
@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import Optional
 
 import numpy as np
+import numpy.typing as npt
 
 from SourceIO.library.goldsrc.bsp.bsp_file import BspFile
-from SourceIO.library.goldsrc.wad import MipTex, WadLump, flip_texture, make_texture
+from SourceIO.library.goldsrc.wad import MipTex, WadLump, decode_miptex
 from SourceIO.library.models.mdl.v10.structs.texture import MdlTextureFlag
 from SourceIO.library.utils import Buffer, TinyPath
 from SourceIO.logger import SourceLogMan
@@ -31,8 +32,10 @@ class TextureData:
         self.width = 0
         self.height = 0
         self.offsets = (0, 0, 0, 0)
-        self.data: Optional[np.array] = None
+        self.data: Optional[npt.NDArray[np.uint8]] = None
         self.info_id = -1
+        self._data_mip = 0
+        self._embedded: Optional[memoryview] = None
 
     def parse(self, buffer: Buffer):
         entry_offset = buffer.tell()
@@ -43,25 +46,28 @@ class TextureData:
         self.offsets = buffer.read_fmt('4I')
 
         if any(self.offsets):
-            offset = self.offsets[0]
-            index = 0
+            # Decoded on demand, at the mip level the importer asks for
+            self._embedded = buffer.ro_view(entry_offset)
 
-            buffer.seek(entry_offset + offset)
-            texture_size = (self.width * self.height) >> (index * 2)
-            texture_indices = np.frombuffer(buffer.read(texture_size), np.uint8)
+    @property
+    def is_embedded(self) -> bool:
+        return self._embedded is not None
 
-            buffer.seek(entry_offset + self.offsets[-1] + ((self.width * self.height) >> (3 * 2)))
+    def decode_embedded(self, texture_mip: int = 0) -> npt.NDArray[np.uint8]:
+        return decode_miptex(self._embedded, self.width, self.height, self.offsets, texture_mip,
+                             self.name.startswith('{'))
 
-            assert buffer.read(2) == b'\x00\x01', 'Invalid palette start anchor'
-
-            texture_palette = np.frombuffer(buffer.read(256 * 3), np.uint8).reshape((-1, 3))
-
-            assert buffer.read(2) == b'\x00\x00', 'Invalid palette end anchor'
+    def get_contents(self, bsp: BspFile, texture_mip: int = 0) -> npt.NDArray[np.uint8]:
+        """Texture as an uint8 (height, width, 4) array, height and width shrink with ``texture_mip``."""
+        if self.data is not None and self._data_mip == texture_mip:
+            return self.data
 
-            texture_data = make_texture(texture_indices, texture_palette, self.name.startswith('{'))
-            self.data = flip_texture(texture_data, self.width >> index, self.height >> index)
+        self._data_mip = texture_mip
+        if self.is_embedded:
+            self.data = self.decode_embedded(texture_mip)
+            return self.data
 
-    def get_contents(self, bsp: BspFile):
+        self.data = bsp.wad_library.get_texture(self.name, texture_mip)
         if self.data is not None:
             return self.data
 
@@ -71,11 +77,11 @@ class TextureData:
             if isinstance(resource, MipTex):
                 self.width = resource.width
                 self.height = resource.height
-                self.data = resource.load_texture()
+                self.data = resource.load_texture_rgba8(texture_mip)
             else:
                 raise Exception(f"Unexpected resource type {type(resource)}")
         else:
             logger.error(f'Could not find texture resource: {self.name}')
-            self.data = np.full(self.width * self.height * 4, 0.5, dtype=np.float32)
-
+            self.data = np.full((max(self.height >> texture_mip, 1), max(self.width >> texture_mip, 1), 4), 127,
+                                dtype=np.uint8)
         return self.data
@@ -1,25 +1,29 @@
+import os
 import struct
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import IntEnum
-from typing import Optional
+from typing import Iterable, Optional
 
 import numpy as np
 import numpy.typing as npt
 
-from SourceIO.library.utils import Buffer, FileBuffer, TinyPath
+from SourceIO.library.utils import Buffer, MMapBuffer, TinyPath
 
 
-def make_texture(indices, palette, use_alpha: bool = False) -> npt.NDArray[np.float32]:
+def make_texture_rgba8(indices, palette, use_alpha: bool = False) -> npt.NDArray[np.uint8]:
     new_palette = np.full((len(palette), 4), 255, dtype=np.uint8)
     new_palette[:, :3] = palette
 
-    colors: np.ndarray = new_palette[indices]
-
     if use_alpha:
-        transparency_key = new_palette[-1]
-        alpha = np.where((colors == transparency_key).all(axis=1))[0]
-        colors[alpha] = [0, 0, 0, 0]
-    return np.divide(colors.astype(np.float32), 255)
+        # Every palette entry with the color of the last one is the transparency key
+        transparent = (new_palette == new_palette[-1]).all(axis=1)
+        new_palette[transparent] = 0
+    return new_palette[indices]
+
+
+def make_texture(indices, palette, use_alpha: bool = False) -> npt.NDArray[np.float32]:
+    return np.divide(make_texture_rgba8(indices, palette, use_alpha).astype(np.float32), 255)
 
 
 def flip_texture(pixels: npt.NDArray, width: int, height: int) -> npt.NDArray[np.float32]:
@@ -29,6 +33,27 @@ def flip_texture(pixels: npt.NDArray, width: int, height: int) -> npt.NDArray[np
     return pixels
 
 
+def decode_miptex(data: memoryview, width: int, height: int, offsets: tuple[int, ...], texture_mip: int = 0,
+                  use_alpha: bool = False) -> npt.NDArray[np.uint8]:
+    """Decode one mip level of a miptex into an uint8 RGBA array of shape (height, width, 4), bottom row first.
+
+    ``data`` starts at the miptex header, ``offsets`` are relative to it.
+    """
+    texture_mip = min(max(texture_mip, 0), 3)
+    mip_width, mip_height = max(width >> texture_mip, 1), max(height >> texture_mip, 1)
+    start = offsets[texture_mip]
+    texture_indices = np.frombuffer(data, np.uint8, mip_width * mip_height, start)
+
+    palette_offset = offsets[-1] + ((width * height) >> (3 * 2))
+    assert data[palette_offset:palette_offset + 2] == b'\x00\x01', 'Invalid palette start anchor'
+    texture_palette = np.frombuffer(data, np.uint8, 256 * 3, palette_offset + 2).reshape((-1, 3))
+    palette_end = palette_offset + 2 + 256 * 3
+    assert data[palette_end:palette_end + 2] == b'\x00\x00', 'Invalid palette end anchor'
+
+    texture_data = make_texture_rgba8(texture_indices, texture_palette, use_alpha)
+    return np.flip(texture_data.reshape((mip_height, mip_width, 4)), 0)
+
+
 class WadEntryType(IntEnum):
     PALETTE = 64
     COLORMAP = 65
@@ -60,26 +85,14 @@ class MipTex(WadLump):
         self.width, self.height = struct.unpack('II', handle.read(8))
         self.offsets = struct.unpack('4I', handle.read(16))
 
-    def load_texture(self, texture_mip: int = 0) -> npt.NDArray:
-        handle = self.buffer
-
-        has_alpha = self.name.startswith('{')
-
-        handle.seek(self._entry_offset + self.offsets[texture_mip])
-        texture_size = (self.width * self.height) >> (texture_mip * 2)
-        texture_indices = np.frombuffer(handle.read(texture_size), np.uint8)
-
-        handle.seek(self._entry_offset + self.offsets[-1] + ((self.width * self.height) >> (3 * 2)))
+    def load_texture_rgba8(self, texture_mip: int = 0) -> npt.NDArray[np.uint8]:
+        """Decoded mip level as an uint8 (height, width, 4) array. Doesn't move the buffer, safe to call from threads."""
+        return decode_miptex(self.buffer.ro_view(self._entry_offset), self.width, self.height, self.offsets,
+                             texture_mip, self.name.startswith('{'))
 
-        assert handle.read(2) == b'\x00\x01', 'Invalid palette start anchor'
-
-        texture_palette = np.frombuffer(handle.read(256 * 3), np.uint8).reshape((-1, 3))
-
-        assert handle.read(2) == b'\x00\x00', 'Invalid palette end anchor'
-
-        texture_data = make_texture(texture_indices, texture_palette, has_alpha)
-        texture_data = flip_texture(texture_data, self.width >> texture_mip, self.height >> texture_mip)
-        return texture_data
+    def load_texture(self, texture_mip: int = 0) -> npt.NDArray:
+        texture_data = self.load_texture_rgba8(texture_mip).reshape((-1, 4))
+        return np.divide(texture_data.astype(np.float32), 255)
 
 
 class Font(MipTex):
@@ -145,7 +158,8 @@ class WadEntry:
 
 class WadFile:
     def __init__(self, file: TinyPath):
-        self.buffer = FileBuffer(file)
+        self.filepath = file
+        self.buffer = MMapBuffer(file)
         self.version = self.buffer.read(4)
         self.count, self.offset = struct.unpack('II', self.buffer.read(8))
         assert self.version in (b'WAD3', b'WAD4')
@@ -175,3 +189,70 @@ class WadFile:
 
             return entry
         return None
+
+
+class WadLibrary:
+    """Texture index over the WADs of a map or mod, searched in the order they were added.
+
+    Every WAD is opened and indexed once, decoded textures are kept as uint8 RGBA per (name, mip level).
+    """
+
+    def __init__(self):
+        self.wads: dict[str, WadFile] = {}
+        self._index: dict[str, WadFile] = {}
+        self._decoded: dict[tuple[str, int], npt.NDArray[np.uint8]] = {}
+
+    def add_wad(self, filepath: TinyPath) -> WadFile:
+        key = os.path.normcase(os.path.realpath(filepath))
+        wad_file = self.wads.get(key)
+        if wad_file is None:
+            wad_file = self.wads[key] = WadFile(filepath)
+            for name, entry in wad_file.entries.items():
+                if entry.type == WadEntryType.MIPTEX:
+                    self._index.setdefault(name, wad_file)
+        return wad_file
+
+    def __contains__(self, name: str) -> bool:
+        return name.upper() in self._index
+
+    def get_miptex(self, name: str) -> Optional[MipTex]:
+        wad_file = self._index.get(name.upper())
+        if wad_file is None:
+            return None
+        return wad_file.get_file(name)
+
+    def get_texture(self, name: str, texture_mip: int = 0) -> Optional[npt.NDArray[np.uint8]]:
+        """Decoded texture as an uint8 (height, width, 4) array, None if no WAD has it."""
+        name = name.upper()
+        texture = self._decoded.get((name, texture_mip))
+        if texture is None:
+            miptex = self.get_miptex(name)
+            if miptex is None:
+                return None
+            texture = self._decoded[(name, texture_mip)] = miptex.load_texture_rgba8(texture_mip)
+        return texture
+
+    def decode_textures(self, names: Iterable[str], texture_mip: int = 0,
+                        workers: int = 4) -> dict[str, npt.NDArray[np.uint8]]:
+        """Decode every texture of ``names`` found in the library, the ones not cached yet on ``workers`` threads."""
+        textures = {}
+        pending: list[tuple[str, MipTex]] = []
+        for name in dict.fromkeys(name.upper() for name in names):
+            texture = self._decoded.get((name, texture_mip))
+            if texture is not None:
+                textures[name] = texture
+                continue
+            # Headers are read here, decoding only reads through views so it can run on workers
+            miptex = self.get_miptex(name)
+            if miptex is not None:
+                pending.append((name, miptex))
+
+        if workers > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(min(workers, len(pending))) as pool:
+                decoded = list(pool.map(lambda item: item[1].load_texture_rgba8(texture_mip), pending))
+        else:
+            decoded = [miptex.load_texture_rgba8(texture_mip) for _, miptex in pending]
+
+        for (name, _), texture in zip(pending, decoded):
+            textures[name] = self._decoded[(name, texture_mip)] = texture
+        return textures
@@ -61,8 +61,7 @@ class Vvd:
         for count in header.lod_vertex_count[:header.lod_count]:
             lod_datas.append(np.zeros((count,), dtype=cls.vertex_t))
 
-        buffer.seek(header.fixup_table_offset)
-        fixups = [Fixup.from_buffer(buffer) for _ in range(header.fixup_count)]
+        fixups = buffer.read_structure_array(header.fixup_table_offset, header.fixup_count, Fixup)
 
         if header.fixup_count:
             lod_offsets = np.zeros(len(lod_datas), dtype=np.uint32)
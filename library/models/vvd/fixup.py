@@ -1,14 +1,11 @@
 from dataclasses import dataclass
 
-from SourceIO.library.utils import Buffer
+from SourceIO.library.utils.struct_layout import struct_layout
 
 
+@struct_layout(("lod_index", "I"), ("vertex_index", "I"), ("vertex_count", "I"))
 @dataclass(slots=True)
 class Fixup:
     lod_index: int
     vertex_index: int
     vertex_count: int
-
-    @classmethod
-    def from_buffer(cls, buffer: Buffer):
-        return cls(*buffer.read_fmt("3I"))
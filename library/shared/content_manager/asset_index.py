@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+
+from SourceIO.library.archives.vpk import VPKDirectory
+from SourceIO.library.global_config import ContentManagerConfig
+from SourceIO.library.utils import TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('AssetIndex')
+
+ASSET_INDEX_VERSION = 1
+# Index files older versions wrote into game folders, never listed as game content
+ASSET_INDEX_PREFIX = ".sourceio_index_"
+ASSET_INDEX_SUFFIX = ".json.gz"
+# Loose folders above this size are not worth walking up front, they keep using per-file probes.
+MAX_LOOSE_INDEX_FILES = 250_000
+
+
+def asset_key(filepath: TinyPath | str) -> str:
+    """Case-folded posix form of a relative asset path, every lookup cache and listing is keyed by it."""
+    return str(filepath).replace("\\", "/").lower().lstrip("/")
+
+
+@dataclass(slots=True)
+class ProviderIndex:
+    """Listing of a single provider: relative path -> (size, stamp).
+
+    ``stamp`` is the file mtime in nanoseconds for loose files and the entry CRC for VPK entries.
+    ``stamps`` holds whatever is needed to validate the listing later: every directory mtime for
+    loose folders, the directory file signature for VPKs.
+    """
+    kind: str
+    path: str
+    stamps: dict[str, int | str] = field(default_factory=dict)
+    files: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    def is_valid(self) -> bool:
+        try:
+            if self.kind == "loose":
+                root = self.path
+                for rel_dir, mtime in self.stamps.items():
+                    if os.stat(os.path.join(root, rel_dir)).st_mtime_ns != mtime:
+                        return False
+                return True
+            elif self.kind == "vpk":
+                return VPKDirectory(TinyPath(self.path)).signature() == self.stamps.get("")
+        except OSError:
+            return False
+        return False
+
+    def to_json(self) -> dict:
+        return {"kind": self.kind, "path": self.path, "stamps": self.stamps,
+                "files": {k: list(v) for k, v in self.files.items()}}
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'ProviderIndex':
+        return cls(data["kind"], data["path"], data["stamps"],
+                   {k: (v[0], v[1]) for k, v in data["files"].items()})
+
+
+def build_loose_index(root: TinyPath) -> Optional[ProviderIndex]:
+    index = ProviderIndex("loose", str(root))
+    files = index.files
+    stamps = index.stamps
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        full_dir = os.path.join(root, rel_dir) if rel_dir else str(root)
+        try:
+            stamps[rel_dir] = os.stat(full_dir).st_mtime_ns
+            with os.scandir(full_dir) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=True):
+                        pending.append(rel_path)
+                    elif not entry.name.startswith(ASSET_INDEX_PREFIX):
+                        stat = entry.stat()
+                        files[rel_path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError as ex:
+            logger.debug(f"Failed to index {full_dir!r}: {ex}")
+            continue
+        if len(files) > MAX_LOOSE_INDEX_FILES:
+            logger.info(f"Not indexing {root!r}: more than {MAX_LOOSE_INDEX_FILES} files")
+            return None
+    return index
+
+
+def build_vpk_index(filepath: TinyPath) -> Optional[ProviderIndex]:
+    try:
+        directory = VPKDirectory(filepath).read()
+    except (OSError, NotImplementedError, ValueError) as ex:
+        logger.debug(f"Failed to index {filepath!r}: {ex}")
+        return None
+    index = ProviderIndex("vpk", str(filepath), {"": directory.signature()})
+    index.files = {name: (entry.total_size, entry.crc) for name, entry in directory}
+    return index
+
+
+def user_cache_dir() -> TinyPath:
+    """Per-user cache folder of SourceIO, nothing is ever written into game installs."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/AppData/Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return TinyPath(base) / "SourceIO"
+
+
+def index_file_path(filepath: TinyPath) -> TinyPath:
+    """Asset index file of a provider, keyed by its absolute path."""
+    folder = ContentManagerConfig().asset_index_dir
+    folder = TinyPath(folder) if folder else user_cache_dir() / "asset_index"
+    normalized = os.path.normcase(os.path.abspath(filepath))
+    digest = hashlib.sha1(normalized.encode("utf8")).hexdigest()[:16]
+    return folder / f"{filepath.name or 'root'}_{digest}{ASSET_INDEX_SUFFIX}"
+
+
+class AssetIndex:
+    """On-disk bundle of :class:`ProviderIndex` for every mount of one top-level provider."""
+
+    def __init__(self, filepath: TinyPath):
+        self.filepath = filepath
+        self.providers: dict[str, ProviderIndex] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, filepath: TinyPath) -> 'AssetIndex':
+        asset_index = cls(filepath)
+        if not filepath.exists():
+            return asset_index
+        try:
+            with gzip.open(filepath, "rt", encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("version") != ASSET_INDEX_VERSION:
+                return asset_index
+            for item in data["providers"]:
+                index = ProviderIndex.from_json(item)
+                asset_index.providers[index.path] = index
+        except (OSError, ValueError, KeyError, TypeError) as ex:
+            logger.warn(f"Discarding unreadable asset index {filepath!r}: {ex}")
+            asset_index.providers.clear()
+        return asset_index
+
+    def get(self, provider) -> Optional[ProviderIndex]:
+        """Return a valid index for the provider, rebuilding it if the stored one is stale."""
+        key = str(provider.filepath)
+        index = self.providers.get(key)
+        if index is not None and index.is_valid():
+            return index
+        index = provider.build_index()
+        if index is None:
+            self.providers.pop(key, None)
+        else:
+            self.providers[key] = index
+        self.dirty = True
+        return index
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            data = {"version": ASSET_INDEX_VERSION,
+                    "providers": [index.to_json() for index in self.providers.values()]}
+            with gzip.open(self.filepath, "wt", encoding="utf8", compresslevel=1) as f:
+                json.dump(data, f, separators=(",", ":"))
+        except OSError as ex:
+            logger.debug(f"Failed to write asset index {self.filepath!r}: {ex}")
+            return
+        self.dirty = False
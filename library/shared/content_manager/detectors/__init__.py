@@ -1,3 +1,7 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from SourceIO.library.global_config import ContentManagerConfig
 from SourceIO.library.shared.content_manager.detectors.content_detector import ContentDetector
 from SourceIO.library.shared.content_manager.detectors.cs2 import CS2Detector
 from SourceIO.library.shared.content_manager.detectors.csgo import CSGODetector
@@ -24,6 +28,7 @@ from SourceIO.library.shared.content_manager.detectors.vindictus import Vindictu
 from SourceIO.library.shared.content_manager.detectors.vampire import VampireDetector
 from SourceIO.library.shared.content_manager.detectors.workshop import WorkshopDetector
 from SourceIO.library.shared.content_manager.provider import ContentProvider
+from SourceIO.library.utils.path_utilities import probe_scope
 from SourceIO.library.utils.tiny_path import TinyPath
 from SourceIO.logger import SourceLogMan
 
@@ -52,10 +57,25 @@ GAME_DETECTORS: list[ContentDetector] = [
 
 
 def detect_game(path: TinyPath) -> set[ContentProvider]:
+    """Run every detector against the path.
+
+    Detectors are independent, so they run concurrently and share one probe cache: the ancestors of
+    ``path`` are listed once per scan instead of being probed by each detector in turn.
+    """
     content_providers = set()
-    for detector in GAME_DETECTORS:
-        results, root_path = detector.scan(path)
+    workers = ContentManagerConfig().detect_game_workers
+    with probe_scope() as probes:
+        if workers > 1:
+            with ThreadPoolExecutor(min(workers, len(GAME_DETECTORS)), thread_name_prefix="SourceIODetect") as pool:
+                # Each detector gets a copy of this context, so all of them see the same probe cache.
+                futures = [pool.submit(contextvars.copy_context().run, detector.scan, path)
+                           for detector in GAME_DETECTORS]
+                scans = [future.result() for future in futures]
+        else:
+            scans = [detector.scan(path) for detector in GAME_DETECTORS]
+    for detector, (results, root_path) in zip(GAME_DETECTORS, scans):
         if results:
             logger.info(f"Detected {detector.game()} game: {root_path}")
             content_providers.update(results)
+    logger.debug(f"Game detection probes: {probes.stats()}")
     return content_providers or None
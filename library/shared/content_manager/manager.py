@@ -1,9 +1,13 @@
+import threading
 from collections import Counter, OrderedDict
 from hashlib import md5
-from typing import Optional, TypeVar, Union, Iterator, Hashable
+from typing import Optional, TypeVar, Union, Iterator, Hashable, Iterable
 
+from SourceIO.library.global_config import ContentManagerConfig
 from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.shared.content_manager.asset_index import AssetIndex, asset_key, index_file_path
 from SourceIO.library.shared.content_manager.detectors import detect_game
+from SourceIO.library.shared.content_manager.prefetch import PrefetchRequest, Prefetcher
 from SourceIO.library.shared.content_manager.provider import ContentProvider
 from SourceIO.library.shared.content_manager.providers import register_provider
 from SourceIO.library.shared.content_manager.providers.hfs_provider import HFS1ContentProvider, HFS2ContentProvider
@@ -14,6 +18,7 @@ from SourceIO.library.shared.content_manager.providers.vpk_provider import VPKCo
 from SourceIO.library.shared.content_manager.providers.zip_content_provider import ZIPContentProvider
 from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, backwalk_file_resolver, corrected_path
 from SourceIO.library.utils.path_utilities import get_mod_path
+from SourceIO.library.utils.perf_sampler import register_stats_source
 from SourceIO.library.utils.singleton import SingletonMeta
 from SourceIO.logger import SourceLogMan
 
@@ -23,7 +28,6 @@ logger = log_manager.get_logger('ContentManager')
 AnyContentDetector = TypeVar('AnyContentDetector', bound='ContentDetector')
 AnyContentProvider = TypeVar('AnyContentProvider', bound='ContentProvider')
 
-MAX_CACHE_SIZE = 16
 META_CACHE_SIZE = 200_000
 
 K = TypeVar('K', bound=Hashable)
@@ -31,23 +35,163 @@ T = TypeVar('T')
 
 
 class _LRU(OrderedDict[K, T]):
-    """Minimal LRU with O(1) move-to-end on get/set."""
+    """Minimal LRU with O(1) move-to-end on get/set, safe to share with prefetch workers."""
 
     def __init__(self, maxsize: int):
         super().__init__()
         self.maxsize = maxsize
+        # Reentrant, set() evicts through popitem() while holding it
+        self._lock = threading.RLock()
 
     def get(self, key, default=None) -> T | None:
-        v = super().get(key, default)
-        if v is not default:
-            self.move_to_end(key)
-        return v
+        with self._lock:
+            v = super().get(key, default)
+            if v is not default:
+                self.move_to_end(key)
+            return v
 
     def set(self, key:K, value:T):
-        super().__setitem__(key, value)
-        self.move_to_end(key)
-        if len(self) > self.maxsize:
-            self.popitem(last=False)
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def pop(self, key, *default):
+        with self._lock:
+            return super().pop(key, *default)
+
+    def popitem(self, last: bool = True):
+        with self._lock:
+            return super().popitem(last)
+
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+
+    def clear(self):
+        with self._lock:
+            super().clear()
+
+
+class _BufferCache:
+    """LRU of file buffers bounded by their total size in bytes instead of entry count.
+
+    Buffers backed by an open file (:class:`FileBuffer`) are additionally capped by count, so a budget full of
+    small loose files can not exhaust file descriptors. Evicted buffers the cache opened itself and never handed
+    out (prefetched ones) are closed, the rest are left to whoever still reads them and closed by GC.
+    Pinned paths are never evicted, but still count against the budget.
+    """
+
+    def __init__(self, budget: int, max_open_files: int):
+        self.budget = budget
+        self.max_open_files = max_open_files
+        # key -> (buffer, size, handed out to a caller)
+        self._entries: OrderedDict[TinyPath, tuple[Buffer, int, bool]] = OrderedDict()
+        self._pinned: set[TinyPath] = set()
+        self._lock = threading.RLock()
+        self.used_bytes = 0
+        self.open_files = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.closed = 0
+        self.rejected = 0
+
+    def get(self, key: TinyPath) -> Buffer | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0].closed:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if not entry[2]:
+                self._entries[key] = entry[0], entry[1], True
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: TinyPath, buffer: Buffer, handed_out: bool = True):
+        """Cache ``buffer``, ``handed_out`` is False only for buffers no caller has seen yet."""
+        size = buffer.size()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.budget and key not in self._pinned:
+                self.rejected += 1
+                return
+            self._entries[key] = (buffer, size, handed_out)
+            self.used_bytes += size
+            if isinstance(buffer, FileBuffer):
+                self.open_files += 1
+            self._evict()
+
+    def __contains__(self, key: TinyPath):
+        return key in self._entries
+
+    def pin(self, key: TinyPath):
+        with self._lock:
+            self._pinned.add(key)
+
+    def unpin(self, key: TinyPath):
+        with self._lock:
+            self._pinned.discard(key)
+            self._evict()
+
+    def set_budget(self, budget: int):
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def _remove(self, key: TinyPath):
+        buffer, size, handed_out = self._entries.pop(key)
+        self.used_bytes -= size
+        if isinstance(buffer, FileBuffer):
+            self.open_files -= 1
+            if not handed_out and not buffer.closed:
+                buffer.close()
+                self.closed += 1
+        return size
+
+    def _evict(self):
+        if self.used_bytes <= self.budget and self.open_files <= self.max_open_files:
+            return
+        for key in list(self._entries.keys()):
+            over_budget = self.used_bytes > self.budget
+            over_files = self.open_files > self.max_open_files
+            if not (over_budget or over_files):
+                break
+            if key in self._pinned:
+                continue
+            if not over_budget and not isinstance(self._entries[key][0], FileBuffer):
+                continue
+            self.evicted_bytes += self._remove(key)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached buffer, pins stay registered for the paths they were set for."""
+        with self._lock:
+            for key in list(self._entries.keys()):
+                self._remove(key)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "budget": self.budget,
+            "used_bytes": self.used_bytes,
+            "entries": len(self._entries),
+            "open_files": self.open_files,
+            "pinned": len(self._pinned),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "closed": self.closed,
+            "rejected": self.rejected,
+        }
 
 
 def get_loose_file_fs_root(path: TinyPath):
@@ -60,11 +204,20 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         super().__init__(TinyPath("."))
         self.children: set[ContentProvider] = set()
         self._steam_id = -1
-        self._cache: _LRU[TinyPath, Buffer] = _LRU(MAX_CACHE_SIZE)
-        self._exists_cache: _LRU[TinyPath, bool] = _LRU(META_CACHE_SIZE)
-        self._owner_cache: _LRU[TinyPath, ContentProvider] = _LRU(META_CACHE_SIZE)
+        config = ContentManagerConfig()
+        self._cache = _BufferCache(config.cache_budget_bytes, config.cache_max_open_files)
+        # Keyed by asset_key(), providers disagree on path case
+        self._exists_cache: _LRU[str, bool] = _LRU(META_CACHE_SIZE)
+        self._owner_cache: _LRU[str, ContentProvider] = _LRU(META_CACHE_SIZE)
+        # Asset index listings of mounted children, consulted when the owner cache has no answer
+        self._indexed_paths: dict[ContentProvider, dict[str, ContentProvider]] = {}
         self.first_import: TinyPath = None
         self.priority_list: list[ContentProvider] = None
+        self._prefetcher = Prefetcher(self._resolve_file, self._store_prefetched, self._cache.__contains__,
+                                      config.prefetch_workers, config.prefetch_max_inflight_bytes)
+        register_stats_source("ContentManager buffer cache", self._cache.stats)
+        register_stats_source("ContentManager prefetcher", self._prefetcher.stats)
+        register_stats_source("ContentManager membership filters", self.filter_stats)
 
     @property
     def root(self) -> TinyPath:
@@ -79,10 +232,10 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         if filepath.is_absolute():
             return filepath.exists()
         k = self._key(filepath)
-        cached = self._exists_cache.get(k)
+        cached = self._cached_exists(k)
         if cached is not None:
             return cached
-        owner = self._owner_cache.get(k)
+        owner = self._cached_owner(k)
         if owner is not None and owner.check(k):
             self._note_hit(k, owner)
             return True
@@ -98,7 +251,7 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         k = self._key(filepath)
         if not self.check(k):
             return None
-        owner = self._owner_cache.get(k)
+        owner = self._cached_owner(k)
         if owner is not None:
             return owner
         for child in self.children:
@@ -112,7 +265,7 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         k = self._key(asset_path)
         if k is None:
             return None
-        owner = self._owner_cache.get(k)
+        owner = self._cached_owner(k)
         if owner is not None and owner.check(k):
             return owner.steam_id
         for child in self.children:
@@ -149,17 +302,20 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
 
     def scan_for_content(self, scan_path: TinyPath):
         """Discover and mount providers for the given path."""
+        mounted = set(self.children)
         providers = detect_game(scan_path)
         if providers:
             for provider in providers:
                 logger.info(f"Mounted: {provider}")
             self.children.update(set(providers))
-            pass
+            self._load_asset_index(providers)
             return
         self._find_steam_appid(scan_path)
         if scan_path.suffix == '.vpk':
             if scan_path.exists():
-                self.add_child(VPKContentProvider(scan_path))
+                provider = VPKContentProvider(scan_path)
+                self.add_child(provider)
+                self._load_asset_index([provider])
                 return
 
         root_path = get_loose_file_fs_root(scan_path)
@@ -189,7 +345,30 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
             else:
                 root_path = root_path.parent
                 self.add_child(LooseFilesContentProvider(root_path))
-        pass
+        self._load_asset_index(self.children - mounted)
+
+    def _load_asset_index(self, providers: Iterable[ContentProvider]):
+        """Load (or build and persist) asset indices of providers, lookups consult them before probing."""
+        if not ContentManagerConfig().use_asset_index:
+            return
+        indexed = 0
+        for provider in providers:
+            asset_index = AssetIndex.load(index_file_path(provider.filepath))
+            owners: dict[str, ContentProvider] = {}
+            for mount in provider.index_mounts():
+                index = asset_index.get(mount)
+                if index is None:
+                    continue
+                mount.apply_index(index)
+                for filepath in index.files.keys():
+                    owners.setdefault(asset_key(filepath), mount)
+            asset_index.save()
+            if owners:
+                provider.seed_index(owners)
+                self._indexed_paths[provider] = owners
+                indexed += len(owners)
+        if indexed:
+            logger.info(f"Loaded asset index of {indexed} paths")
 
     def add_child(self, child: ContentProvider):
         """Mount a child provider and invalidate metadata caches."""
@@ -202,6 +381,24 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
         for child in self.children:
             yield from child.glob(pattern)
 
+    def glob_paths(self, pattern: str) -> Iterator[TinyPath]:
+        """Yield unique matching paths across children without opening them, see :meth:`find_file`."""
+        seen = set()
+        for child in self._lookup_order():
+            for path in child.glob_paths(pattern):
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+
+    def prefix_paths(self, prefix: str) -> Iterator[TinyPath]:
+        """Yield unique paths under ``prefix`` across children without opening them."""
+        seen = set()
+        for child in self._lookup_order():
+            for path in child.prefix_paths(prefix):
+                if path not in seen:
+                    seen.add(path)
+                    yield path
+
 
     def find_file(self, filepath: TinyPath, do_not_cache=False) -> Buffer | None:
         """Find and optionally cache file buffers with owner/exists LRU metadata."""
@@ -212,24 +409,44 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
             return None
         k = self._key(filepath)
         buf = self._cache.get(k)
-        if buf is not None and not buf.closed:
+        if buf is None and self._prefetcher.wait_for(k):
+            buf = self._cache.get(k)
+        if buf is not None:
+            self._prefetcher.note_consumed(k)
             buf.seek(0)
             return buf
         logger.debug(f'Requesting {k} file')
-        owner = self._owner_cache.get(k)
+        file = self._resolve_file(k)
+        if file is not None and not do_not_cache:
+            self._cache.set(k, file)
+        return file
+
+    def _resolve_file(self, k: TinyPath) -> Buffer | None:
+        """Look a normalized key up in the owning provider or every child, bypassing the buffer cache."""
+        owner = self._cached_owner(k)
         if owner is not None:
             file = owner.find_file(k)
             if file is not None:
                 self._note_hit(k, owner)
-                if do_not_cache:
-                    return file
-                self._cache.set(k, file)
                 return file
-            self._owner_cache.pop(k, None)
-            self._exists_cache.pop(k, None)
+            self._forget(k)
 
-        children = self.priority_list or set(self.children)
+        children = self._lookup_order()
 
+        for child in children:
+            file = child.find_file(k)
+            if file is not None:
+                logger.debug(f'Found in {child}!')
+                self._note_hit(k, child)
+                return file
+        self._note_miss(k)
+        return None
+
+    def _lookup_order(self) -> list[ContentProvider]:
+        """Children in lookup order, the provider the first import came from goes first."""
+        if self.priority_list:
+            return self.priority_list
+        children = list(self.children)
         if (self.first_import is not None) and (self.priority_list is None):
             for child in children:
                 if not isinstance(child, (Source1GameInfoProvider, Source2GameInfoProvider, LooseFilesContentProvider)):
@@ -237,26 +454,121 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
                 provider_path = child.filepath
                 if provider_path.is_file():
                     provider_path = provider_path.parent
-                
-                if self.first_import.as_posix().startswith(provider_path.as_posix()+'/'):
-                    priority = child
-                    children.discard(child)
-                    self.priority_list = [priority, *children]
-                    break
+
+                if self.first_import.as_posix().startswith(provider_path.as_posix() + '/'):
+                    children.remove(child)
+                    self.priority_list = [child, *children]
+                    return self.priority_list
             else:
-                self.priority_list = False # we tried. no point to keep trying any further
+                self.priority_list = False  # we tried. no point to keep trying any further
+        return children
 
-        for child in children:
-            file = child.find_file(k)
-            if file is not None:
-                logger.debug(f'Found in {child}!')
+    def find_owners(self, filepaths: Iterable[TinyPath]) -> dict[TinyPath, Optional[ContentProvider]]:
+        """Resolve owners of many paths at once, None for missing ones.
+
+        Paths not answered by the metadata caches are handed to every child as one batch,
+        so providers can answer from a single directory listing instead of per-path probes.
+        """
+        result: dict[TinyPath, Optional[ContentProvider]] = {}
+        pending: dict[TinyPath, TinyPath] = {}
+        for filepath in filepaths:
+            filepath = TinyPath(filepath)
+            result[filepath] = None
+            if filepath.is_absolute():
+                result[filepath] = self.get_provider_from_path(filepath)
+                continue
+            k = self._key(filepath)
+            if self._cached_exists(k) is False:
+                continue
+            owner = self._cached_owner(k)
+            if owner is not None:
+                result[filepath] = owner
+                continue
+            pending[k] = filepath
+        for child in self._lookup_order():
+            if not pending:
+                break
+            for k in child.check_many(list(pending.keys())):
                 self._note_hit(k, child)
-                if do_not_cache:
-                    return file
-                self._cache.set(k, file)
-                return file
-        self._note_miss(k)
-        return None
+                result[pending.pop(k)] = child
+        for k in pending.keys():
+            self._note_miss(k)
+        return result
+
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        """Paths that exist in any child, see :meth:`find_owners`."""
+        return {filepath for filepath, owner in self.find_owners(filepaths).items() if owner is not None}
+
+    def find_files(self, filepaths: Iterable[TinyPath],
+                   do_not_cache=False) -> Iterator[tuple[TinyPath, Optional[Buffer]]]:
+        """Batch version of :meth:`find_file`: owners are resolved with :meth:`find_owners` first,
+        every file is only opened once the caller iterates up to it.
+        """
+        for filepath, owner in self.find_owners(filepaths).items():
+            if owner is None and not filepath.is_absolute():
+                yield filepath, None
+            else:
+                yield filepath, self.find_file(filepath, do_not_cache)
+
+    def prefetch(self, filepaths: Iterable[TinyPath]) -> PrefetchRequest:
+        """Start pulling predicted dependencies into the buffer cache on background threads.
+
+        Paths that turn out to be missing are ignored. The returned request can be cancelled once
+        the caller is done, anything not fetched by then is dropped.
+        """
+        keys = []
+        for filepath in filepaths:
+            filepath = TinyPath(filepath)
+            if filepath.is_absolute():
+                continue
+            k = self._key(filepath)
+            if self._cached_exists(k) is False:
+                continue
+            keys.append(k)
+        return self._prefetcher.submit(keys)
+
+    def cancel_prefetch(self):
+        """Cancel every outstanding prefetch request."""
+        self._prefetcher.cancel_all()
+
+    def prefetch_stats(self) -> dict[str, int | float]:
+        return self._prefetcher.stats()
+
+    def _store_prefetched(self, k: TinyPath, buffer: Buffer) -> bool:
+        self._cache.set(k, buffer, handed_out=False)
+        return k in self._cache
+
+    def pin(self, filepath: TinyPath):
+        """Keep a file in the buffer cache regardless of budget pressure, e.g. textures shared by most materials."""
+        self._cache.pin(self._key(filepath))
+
+    def unpin(self, filepath: TinyPath):
+        self._cache.unpin(self._key(filepath))
+
+    def set_cache_budget(self, budget: int):
+        """Change the buffer cache budget in bytes, evicting right away if needed."""
+        self._cache.set_budget(budget)
+
+    def cache_stats(self) -> dict[str, int | float]:
+        return self._cache.stats()
+
+    def filter_stats(self) -> dict[str, int | float]:
+        """Aggregated counters of provider membership filters, see :class:`BloomFilter`."""
+        stats = {"filters": 0, "bytes": 0, "queries": 0, "negatives": 0, "false_positives": 0}
+        seen = set()
+        for child in self.children:
+            for mount in child.index_mounts():
+                membership_filter = getattr(mount, "membership_filter", None)
+                if membership_filter is None or id(membership_filter) in seen:
+                    continue
+                seen.add(id(membership_filter))
+                stats["filters"] += 1
+                for key, value in membership_filter.stats().items():
+                    if key in stats:
+                        stats[key] += value
+        actual_negatives = stats["negatives"] + stats["false_positives"]
+        stats["false_positive_rate"] = stats["false_positives"] / actual_negatives if actual_negatives else 0.0
+        return stats
 
     # TODO: MAYBE DEPRECATED
     def serialize(self):
@@ -346,13 +658,21 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
             logger.warn(f'Map {full_path} no longer exists, skipping its embedded PAK')
             return
         with FileBuffer(full_path) as f:
-            pak_lump = open_bsp(map_path, f, self).get_lump('LUMP_PAK')
+            bsp = open_bsp(map_path, f, self)
+            try:
+                pak_lump = bsp.get_lump('LUMP_PAK')
+            finally:
+                bsp.close()
         if pak_lump and pak_lump not in self.children:
             self.children.add(register_provider(pak_lump))
 
     def clean(self):
         """Reset mounts and caches."""
+        self._prefetcher.shutdown()
+        for child in self.children:
+            child.clean()
         self.children.clear()
+        self._indexed_paths.clear()
         self._steam_id = -1
         self._cache.clear()
         self._clear_meta_caches()
@@ -380,15 +700,36 @@ class ContentManager(ContentProvider, metaclass=SingletonMeta):
             return rel if rel is not None else path
         return path
 
+    def _cached_exists(self, k: TinyPath) -> Optional[bool]:
+        return self._exists_cache.get(asset_key(k))
+
+    def _cached_owner(self, k: TinyPath) -> Optional[ContentProvider]:
+        """Owner from the LRU, or the first child in lookup order whose asset index lists the path."""
+        key = asset_key(k)
+        owner = self._owner_cache.get(key)
+        if owner is None and self._indexed_paths:
+            for child in self._lookup_order():
+                indexed = self._indexed_paths.get(child)
+                if indexed is not None and key in indexed:
+                    return child
+        return owner
+
     def _note_hit(self, k: TinyPath, owner: ContentProvider) -> None:
         """Mark path as existing and owned by provider."""
-        self._exists_cache.set(k, True)
-        self._owner_cache.set(k, owner)
+        key = asset_key(k)
+        self._exists_cache.set(key, True)
+        self._owner_cache.set(key, owner)
 
     def _note_miss(self, k: TinyPath) -> None:
         """Mark path as non-existent."""
-        self._exists_cache.set(k, False)
-        self._owner_cache.pop(k, None)
+        key = asset_key(k)
+        self._exists_cache.set(key, False)
+        self._owner_cache.pop(key, None)
+
+    def _forget(self, k: TinyPath) -> None:
+        key = asset_key(k)
+        self._owner_cache.pop(key, None)
+        self._exists_cache.pop(key, None)
 
     def _clear_meta_caches(self) -> None:
         """Clear metadata caches."""
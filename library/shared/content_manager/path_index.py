@@ -0,0 +1,97 @@
+import fnmatch
+import re
+from bisect import bisect_left
+from typing import Iterable, Iterator
+
+_WILDCARDS = re.compile(r"[*?\[]")
+
+
+def _match_segments(segments: list[str], parts: list[str]) -> bool:
+    """Match path segments against pattern segments one to one, a ``**`` segment spans any number of them."""
+    if not parts:
+        return not segments
+    if parts[0] == "**":
+        return any(_match_segments(segments[i:], parts[1:]) for i in range(len(segments) + 1))
+    return bool(segments) and fnmatch.fnmatchcase(segments[0], parts[0]) and _match_segments(segments[1:], parts[1:])
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class PathIndex:
+    """Sorted listing of a provider's relative paths, answers prefix and glob queries without touching the disk.
+
+    Lookups are case-insensitive, matches are returned with their original spelling. :meth:`glob` patterns
+    are matched against the whole relative path the same way :func:`fnmatch.fnmatch` does, so ``*`` also
+    crosses ``/`` and ``*.shader`` finds shaders in every folder. :meth:`rglob` follows
+    :meth:`pathlib.Path.rglob` instead, for providers that used to walk the disk.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        pairs = sorted((path.replace("\\", "/").lower(), path.replace("\\", "/")) for path in paths)
+        self._keys = [key for key, _ in pairs]
+        self._paths = [path for _, path in pairs]
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _range(self, prefix: str) -> range:
+        if not prefix:
+            return range(len(self._keys))
+        return range(bisect_left(self._keys, prefix), bisect_left(self._keys, _prefix_end(prefix)))
+
+    def prefix(self, prefix: str) -> Iterator[str]:
+        """Every path starting with ``prefix``, e.g. ``"materials/models/"``."""
+        paths = self._paths
+        for i in self._range(prefix.replace("\\", "/").lower()):
+            yield paths[i]
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        pattern = pattern.replace("\\", "/").lower()
+        wildcard = _WILDCARDS.search(pattern)
+        if wildcard is None:
+            matches = pattern.__eq__
+            literal = pattern
+        else:
+            literal = pattern[:wildcard.start()]
+            rest = pattern[wildcard.start():]
+            if rest[0] == "*" and _WILDCARDS.search(rest, 1) is None:
+                # "prefix*suffix", by far the most common shape, needs no regex.
+                suffix = rest[1:]
+                min_size = len(literal) + len(suffix)
+                matches = lambda key: len(key) >= min_size and key.endswith(suffix)
+            else:
+                matches = re.compile(fnmatch.translate(pattern)).match
+        keys = self._keys
+        paths = self._paths
+        for i in self._range(literal):
+            if matches(keys[i]):
+                yield paths[i]
+
+    def rglob(self, pattern: str, case_sensitive: bool = True) -> Iterator[str]:
+        """Paths matching ``pattern`` at any depth, ``*`` stays within one folder like in :meth:`pathlib.Path.rglob`."""
+        parts = [part for part in pattern.replace("\\", "/").split("/") if part not in ("", ".")]
+        if not parts:
+            return
+        keys = self._paths
+        if not case_sensitive:
+            keys = self._keys
+            parts = [part.lower() for part in parts]
+        paths = self._paths
+        if "**" in parts:
+            parts = ["**"] + parts
+            for i, key in enumerate(keys):
+                if _match_segments(key.split("/"), parts):
+                    yield paths[i]
+            return
+        depth = len(parts)
+        last = parts[-1]
+        literal_tail = None if _WILDCARDS.search(last) else last
+        for i, key in enumerate(keys):
+            if literal_tail is not None and not key.endswith(literal_tail):
+                continue
+            segments = key.split("/")
+            if len(segments) >= depth and all(map(fnmatch.fnmatchcase, segments[-depth:], parts)):
+                yield paths[i]
@@ -0,0 +1,220 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from SourceIO.library.utils import Buffer, FileBuffer, MemoryBuffer, TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('Prefetcher')
+
+
+class PrefetchRequest:
+    """Handle of one batch of prefetched paths, cancel it once its consumer is done or gave up."""
+
+    def __init__(self, paths: list[TinyPath], on_cancel: Optional[Callable[['PrefetchRequest'], None]] = None):
+        self.paths = paths
+        self._cancelled = threading.Event()
+        self._futures: list[Future] = []
+        self._on_cancel = on_cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return all(future.done() for future in self._futures)
+
+    def cancel(self):
+        """Drop paths that were not fetched yet, reads already in progress still finish.
+
+        Buffers this request fetched but nobody consumed stop counting against the in-flight budget.
+        """
+        if self._cancelled.is_set():
+            return
+        self._cancelled.set()
+        for future in self._futures:
+            future.cancel()
+        if self._on_cancel is not None:
+            self._on_cancel(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every path is fetched, skipped or cancelled. Returns False on timeout."""
+        _, not_done = wait(self._futures, timeout)
+        return not not_done
+
+
+class Prefetcher:
+    """Pulls predicted dependencies into the buffer cache on worker threads while the caller keeps parsing.
+
+    ``max_inflight_bytes`` caps prefetched bytes nobody has asked for yet: once reached, workers stall
+    until the importer consumes some of them, so a long dependency list can not flush the cache.
+    A path the caller is blocked on in :meth:`wait_for` is never throttled, and the wait itself gives up
+    after ``wait_timeout`` seconds so the caller can read the file inline.
+    """
+
+    def __init__(self, read: Callable[[TinyPath], Optional[Buffer]], store: Callable[[TinyPath, Buffer], bool],
+                 is_cached: Callable[[TinyPath], bool], workers: int, max_inflight_bytes: int,
+                 wait_timeout: float = 2.0):
+        self._read = read
+        self._store = store
+        self._is_cached = is_cached
+        self.workers = workers
+        self.max_inflight_bytes = max_inflight_bytes
+        self.wait_timeout = wait_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._condition = threading.Condition()
+        self._requests: list[PrefetchRequest] = []
+        self._pending: dict[TinyPath, Future] = {}
+        # Fetched but not consumed yet: size and the request that fetched it
+        self._unconsumed: dict[TinyPath, tuple[int, PrefetchRequest]] = {}
+        self._wanted: set[TinyPath] = set()
+        self.inflight_bytes = 0
+        self.requested = 0
+        self.fetched = 0
+        self.fetched_bytes = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.consumed = 0
+        self.throttled = 0
+        self.failed = 0
+        self.wait_timeouts = 0
+
+    def submit(self, paths: Iterable[TinyPath]) -> PrefetchRequest:
+        request = PrefetchRequest(list(paths), self._release)
+        if self.workers <= 0:
+            return request
+        with self._condition:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="SourceIOPrefetch")
+            self._requests = [item for item in self._requests if not item.done]
+            self._requests.append(request)
+            for path in request.paths:
+                self.requested += 1
+                if path in self._pending or self._is_cached(path):
+                    self.skipped += 1
+                    continue
+                future = self._executor.submit(self._fetch, path, request)
+                self._pending[path] = future
+                future.add_done_callback(lambda _, done_path=path: self._pending.pop(done_path, None))
+                request._futures.append(future)
+        return request
+
+    def wait_for(self, path: TinyPath) -> bool:
+        """Wait for a prefetch of this path if one is queued or running, True if it finished in time."""
+        future = self._pending.get(path)
+        if future is None or future.cancel():
+            # Not started yet, reading it on the calling thread is faster than waiting for a worker.
+            return False
+        with self._condition:
+            # The worker may be parked in _throttle, waiting for bytes only this thread can free
+            self._wanted.add(path)
+            self._condition.notify_all()
+        try:
+            _, not_done = wait((future,), self.wait_timeout)
+        finally:
+            with self._condition:
+                self._wanted.discard(path)
+        if not_done:
+            self.wait_timeouts += 1
+            return False
+        return True
+
+    def note_consumed(self, path: TinyPath):
+        if path not in self._unconsumed:
+            return
+        with self._condition:
+            entry = self._unconsumed.pop(path, None)
+            if entry is None:
+                return
+            self.inflight_bytes -= entry[0]
+            self.consumed += 1
+            self._condition.notify_all()
+
+    def _release(self, request: PrefetchRequest):
+        """Stop counting the unconsumed buffers of a cancelled request, they stay cached until evicted."""
+        with self._condition:
+            for path in request.paths:
+                entry = self._unconsumed.get(path)
+                if entry is not None and entry[1] is request:
+                    del self._unconsumed[path]
+                    self.inflight_bytes -= entry[0]
+            self._condition.notify_all()
+
+    def cancel_all(self):
+        with self._condition:
+            requests, self._requests = self._requests, []
+            self._unconsumed.clear()
+            self.inflight_bytes = 0
+            self._condition.notify_all()
+        for request in requests:
+            request.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        with self._condition:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _throttle(self, path: TinyPath, request: PrefetchRequest) -> bool:
+        with self._condition:
+            if self.inflight_bytes >= self.max_inflight_bytes and path not in self._wanted:
+                self.throttled += 1
+            while self.inflight_bytes >= self.max_inflight_bytes and not request.cancelled:
+                if path in self._wanted:
+                    break
+                # Buffers evicted from the cache before anybody used them no longer hold memory.
+                for evicted in [evicted for evicted in self._unconsumed if not self._is_cached(evicted)]:
+                    self.inflight_bytes -= self._unconsumed.pop(evicted)[0]
+                if self.inflight_bytes < self.max_inflight_bytes:
+                    break
+                self._condition.wait(0.1)
+            return not request.cancelled
+
+    def _fetch(self, path: TinyPath, request: PrefetchRequest):
+        try:
+            if request.cancelled or not self._throttle(path, request):
+                self.cancelled += 1
+                return
+            if self._is_cached(path):
+                self.skipped += 1
+                return
+            buffer = self._read(path)
+            if buffer is None:
+                self.skipped += 1
+                return
+            if isinstance(buffer, FileBuffer):
+                with buffer:
+                    buffer = MemoryBuffer(buffer.read())
+            size = buffer.size()
+            if not self._store(path, buffer):
+                self.skipped += 1
+                return
+            with self._condition:
+                self.fetched += 1
+                self.fetched_bytes += size
+                if request.cancelled or path in self._wanted:
+                    # Nobody will release it, or it is about to be consumed
+                    return
+                self._unconsumed[path] = (size, request)
+                self.inflight_bytes += size
+        except Exception as ex:
+            self.failed += 1
+            logger.debug(f"Failed to prefetch {path}: {ex}")
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "requested": self.requested,
+            "fetched": self.fetched,
+            "fetched_bytes": self.fetched_bytes,
+            "consumed": self.consumed,
+            "skipped": self.skipped,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "wait_timeouts": self.wait_timeouts,
+            "inflight_bytes": self.inflight_bytes,
+            "queued": len(self._pending),
+        }
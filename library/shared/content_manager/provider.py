@@ -1,10 +1,14 @@
 from abc import abstractmethod
-from typing import Iterator, Optional
+from typing import Iterator, Optional, TYPE_CHECKING
 
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, corrected_path
 from SourceIO.logger import SourceLogMan
 
+if TYPE_CHECKING:
+    from SourceIO.library.shared.content_manager.asset_index import ProviderIndex
+    from SourceIO.library.shared.content_manager.path_index import PathIndex
+
 log_manager = SourceLogMan()
 logger = log_manager.get_logger('ContentManager')
 
@@ -56,6 +60,29 @@ class ContentProvider:
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
         ...
 
+    def glob_paths(self, pattern: str) -> Iterator[TinyPath]:
+        """Like :meth:`glob`, but yields only paths, buffers can be opened later with :meth:`find_file`."""
+        index = self.path_index()
+        if index is None:
+            for path, _ in self.glob(pattern):
+                yield TinyPath(path)
+            return
+        for path in index.glob(pattern):
+            yield TinyPath(path)
+
+    def prefix_paths(self, prefix: str) -> Iterator[TinyPath]:
+        """Every path under ``prefix``, e.g. all files of one folder and its subfolders."""
+        index = self.path_index()
+        if index is None:
+            yield from self.glob_paths(prefix + "*")
+            return
+        for path in index.prefix(prefix):
+            yield TinyPath(path)
+
+    def path_index(self) -> Optional['PathIndex']:
+        """In-memory listing used to answer glob queries, None if the provider can not be listed cheaply."""
+        return None
+
     @abstractmethod
     def find_file(self, filepath: TinyPath) -> Buffer | None:
         ...
@@ -64,6 +91,10 @@ class ContentProvider:
     def check(self, filepath: TinyPath) -> bool:
         ...
 
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        """Return the subset of paths this provider contains."""
+        return {filepath for filepath in filepaths if self.check(filepath)}
+
     @abstractmethod
     def get_relative_path(self, filepath: TinyPath) -> TinyPath | None:
         ...
@@ -76,6 +107,26 @@ class ContentProvider:
     def get_steamid_from_asset(self, asset_path: TinyPath) -> SteamAppId | None:
         ...
 
+    def build_index(self) -> Optional['ProviderIndex']:
+        """Build a persistent listing of this provider, None if it cannot be listed cheaply."""
+        return None
+
+    def index_mounts(self) -> list['ContentProvider']:
+        """Providers whose listings make up the asset index of this provider, in lookup order."""
+        return [self]
+
+    def apply_index(self, index: 'ProviderIndex'):
+        """Called with the validated index of this provider at mount time."""
+        pass
+
+    def seed_index(self, owners: dict[str, 'ContentProvider']):
+        """Hand over the mounts owning every indexed path, keyed by :func:`asset_key`, for lazy lookups."""
+        pass
+
+    def clean(self):
+        """Release resources held by this provider, it must stay usable afterwards."""
+        pass
+
     @property
     @abstractmethod
     def root(self) -> TinyPath:
@@ -1,7 +1,10 @@
+import threading
+
 from SourceIO.library.shared.content_manager.provider import ContentProvider
 from SourceIO.library.utils import TinyPath
 
 ALL_PROVIDERS = {}
+_REGISTRY_LOCK = threading.Lock()
 
 
 def check_provider_exists(provider_filepath: TinyPath) -> ContentProvider | None:
@@ -9,7 +12,6 @@ def check_provider_exists(provider_filepath: TinyPath) -> ContentProvider | None
 
 
 def register_provider(provider: ContentProvider):
-    if provider.filepath in ALL_PROVIDERS:
-        return ALL_PROVIDERS[provider.filepath]
-    ALL_PROVIDERS[provider.filepath] = provider
-    return provider
+    # Game detectors run concurrently and may create the same provider at once.
+    with _REGISTRY_LOCK:
+        return ALL_PROVIDERS.setdefault(provider.filepath, provider)
@@ -26,11 +26,12 @@ class GoldSrcContentProvider(LooseFilesContentProvider):
 
 
 class GoldSrcWADContentProvider(ContentProvider):
-    def __init__(self, filepath: TinyPath, steamapp_id: SteamAppId = SteamAppId.UNKNOWN):
+    def __init__(self, filepath: TinyPath, steamapp_id: SteamAppId = SteamAppId.UNKNOWN,
+                 wad_file: Optional[WadFile] = None):
         assert filepath.suffix == '.wad'
         super().__init__(filepath)
         self._steamapp_id = steamapp_id
-        self.wad_file = WadFile(filepath)
+        self.wad_file = wad_file or WadFile(filepath)
 
     def check(self, filepath: TinyPath) -> bool:
         return self.wad_file.contains(filepath)
@@ -1,7 +1,14 @@
+import os
+import time
+from collections import defaultdict
 from typing import Iterator, Optional, Union
 
+from SourceIO.library.global_config import ContentManagerConfig
+from SourceIO.library.shared.content_manager.asset_index import ProviderIndex, build_loose_index
+from SourceIO.library.shared.content_manager.path_index import PathIndex
 from SourceIO.library.shared.content_manager.provider import ContentProvider, glob_generic
 from SourceIO.library.utils import Buffer, FileBuffer, TinyPath, backwalk_file_resolver, corrected_path
+from SourceIO.library.utils.path_utilities import DIRECTORY_CACHE, is_windows
 from SourceIO.library.shared.app_id import SteamAppId
 
 
@@ -12,6 +19,37 @@ class LooseFilesContentProvider(ContentProvider):
             return filepath.exists()
         return (self.root / filepath).exists()
 
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        """Check paths grouped by folder, every folder is listed once.
+
+        Matches :meth:`check`: names are compared exactly outside Windows and directories don't count,
+        only the names a listing finds are stat'ed.
+        """
+        found = set()
+        by_folder: dict[TinyPath, list[TinyPath]] = defaultdict(list)
+        for filepath in filepaths:
+            if filepath.is_absolute():
+                if self.check(filepath):
+                    found.add(filepath)
+                continue
+            by_folder[filepath.parent if "/" in filepath else TinyPath("")].append(filepath)
+        for folder, folder_files in by_folder.items():
+            real_folder = self.root / folder if folder else self.root
+            listing = DIRECTORY_CACHE.listing(real_folder)
+            if not listing:
+                continue
+            for filepath in folder_files:
+                name = filepath.name
+                real_name = listing.get(name.casefold())
+                if real_name is None:
+                    continue
+                if not is_windows:
+                    # The listing keeps one spelling per folded name, a sibling may still match exactly
+                    real_name = name
+                if os.path.isfile(real_folder / real_name):
+                    found.add(filepath)
+        return found
+
     def get_relative_path(self, filepath: TinyPath):
         filepath = corrected_path(filepath)
         if filepath.is_relative_to(self.root):
@@ -40,6 +78,12 @@ class LooseFilesContentProvider(ContentProvider):
 
     def __init__(self, filepath: TinyPath, override_steamid=SteamAppId.UNKNOWN):
         self._override_steamid = override_steamid
+        self._listing: ProviderIndex | None = None
+        self._path_index: PathIndex | None = None
+        # When the listing was last checked against the disk, see ContentManagerConfig.loose_index_recheck_seconds
+        self._checked_at: float | None = None
+        # Set once the folder turned out to be too big to list, glob then walks the disk as before.
+        self._unlistable = False
         super().__init__(filepath)
 
     def find_file(self, filepath: str | TinyPath) -> Optional[Buffer]:
@@ -49,7 +93,50 @@ class LooseFilesContentProvider(ContentProvider):
         return None
 
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
-        yield from glob_generic(self.root, pattern)
+        index = self.path_index()
+        if index is None:
+            yield from glob_generic(self.root, pattern)
+            return
+        for path in index.rglob(pattern, case_sensitive=not is_windows):
+            yield TinyPath(path), FileBuffer(self.root / path)
+
+    def glob_paths(self, pattern: str) -> Iterator[TinyPath]:
+        index = self.path_index()
+        if index is None:
+            yield from super().glob_paths(pattern)
+            return
+        for path in index.rglob(pattern, case_sensitive=not is_windows):
+            yield TinyPath(path)
+
+    def _listing_changed(self) -> bool:
+        # Loose folders may change while Blender is open, but one import runs many queries in a row,
+        # directory mtimes are only stat'ed again once the last check is old enough.
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < ContentManagerConfig().loose_index_recheck_seconds:
+            return False
+        self._checked_at = now
+        return not self._listing.is_valid()
+
+    def path_index(self) -> Optional[PathIndex]:
+        if self._unlistable:
+            return None
+        if self._listing is None or self._listing_changed():
+            listing = build_loose_index(self.root)
+            if listing is None:
+                self._unlistable = True
+                return None
+            self.apply_index(listing)
+        if self._path_index is None:
+            self._path_index = PathIndex(self._listing.files.keys())
+        return self._path_index
+
+    def build_index(self) -> Optional[ProviderIndex]:
+        return build_loose_index(self.root)
+
+    def apply_index(self, index: ProviderIndex):
+        self._listing = index
+        self._path_index = None
+        self._checked_at = time.monotonic()
 
     @property
     def steam_id(self) -> SteamAppId:
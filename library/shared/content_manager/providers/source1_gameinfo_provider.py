@@ -1,6 +1,7 @@
 from typing import Iterator, Optional, Any
 
 from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.shared.content_manager.asset_index import asset_key
 from SourceIO.library.shared.content_manager.provider import ContentProvider, is_relative_to
 from SourceIO.library.shared.content_manager.providers import register_provider
 from SourceIO.library.shared.content_manager.providers.loose_files import LooseFilesContentProvider
@@ -28,8 +29,11 @@ class Source1GameInfoProvider(ContentProvider):
         self._steamapp_id = SteamAppId(int(self.filesystem.get("steamappid", 0)))
         self.mount: list[ContentProvider] = []
 
-        self._exists_cache: dict[TinyPath, bool] = {}
-        self._owner_cache: dict[TinyPath, ContentProvider] = {}
+        # Keyed by asset_key(), mounts disagree on path case
+        self._exists_cache: dict[str, bool] = {}
+        self._owner_cache: dict[str, ContentProvider] = {}
+        # Asset index listings of the mounts, consulted when the owner cache has no answer
+        self._indexed_owners: dict[str, ContentProvider] = {}
 
         mods_folder = self.root.parent
         for search_path_type, search_path in self.filesystem.get("searchpaths", {}).items():
@@ -76,16 +80,22 @@ class Source1GameInfoProvider(ContentProvider):
         self._exists_cache.clear()
         self._owner_cache.clear()
 
+    def _cached_owner(self, filepath: TinyPath) -> Optional[ContentProvider]:
+        key = asset_key(filepath)
+        owner = self._owner_cache.get(key)
+        return owner if owner is not None else self._indexed_owners.get(key)
+
     def _note_hit(self, filepath: TinyPath, provider: ContentProvider) -> None:
         """Record that a filepath exists and which provider owns it."""
-        self._exists_cache[filepath] = True
-        self._owner_cache[filepath] = provider
+        key = asset_key(filepath)
+        self._exists_cache[key] = True
+        self._owner_cache[key] = provider
 
     def _note_miss(self, filepath: TinyPath) -> None:
         """Record that a filepath does not exist in any mounted provider."""
-        self._exists_cache[filepath] = False
-        if filepath in self._owner_cache:
-            self._owner_cache.pop(filepath, None)
+        key = asset_key(filepath)
+        self._exists_cache[key] = False
+        self._owner_cache.pop(key, None)
 
     @property
     def name(self) -> str:
@@ -93,10 +103,10 @@ class Source1GameInfoProvider(ContentProvider):
 
     def check(self, filepath: TinyPath) -> bool:
         """Return True if any mounted provider contains the path, with caching."""
-        cached = self._exists_cache.get(filepath)
+        cached = self._exists_cache.get(asset_key(filepath))
         if cached is not None:
             return cached
-        owner = self._owner_cache.get(filepath)
+        owner = self._cached_owner(filepath)
         if owner is not None and owner.check(filepath):
             self._note_hit(filepath, owner)
             return True
@@ -107,6 +117,28 @@ class Source1GameInfoProvider(ContentProvider):
         self._note_miss(filepath)
         return False
 
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        """Batch :meth:`check`, every mount receives the paths the previous mounts did not have."""
+        found = set()
+        pending = []
+        for filepath in filepaths:
+            cached = self._exists_cache.get(asset_key(filepath))
+            if cached is None:
+                pending.append(filepath)
+            elif cached:
+                found.add(filepath)
+        for mount in self.mount:
+            if not pending:
+                break
+            mount_found = mount.check_many(pending)
+            for filepath in mount_found:
+                self._note_hit(filepath, mount)
+            found.update(mount_found)
+            pending = [filepath for filepath in pending if filepath not in mount_found]
+        for filepath in pending:
+            self._note_miss(filepath)
+        return found
+
     def get_relative_path(self, filepath: TinyPath):
         if is_relative_to(filepath, self.root):
             rel_path = filepath.relative_to(self.root)
@@ -126,14 +158,14 @@ class Source1GameInfoProvider(ContentProvider):
 
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
         """Return a Buffer for the file by querying the owning provider first if cached."""
-        owner = self._owner_cache.get(filepath)
+        owner = self._cached_owner(filepath)
         if owner is not None:
             buf = owner.find_file(filepath)
             if buf is not None:
                 self._note_hit(filepath, owner)
                 return buf
-            self._owner_cache.pop(filepath, None)
-            self._exists_cache.pop(filepath, None)
+            self._owner_cache.pop(asset_key(filepath), None)
+            self._exists_cache.pop(asset_key(filepath), None)
         for mount in self.mount:
             buf = mount.find_file(filepath)
             if buf is not None:
@@ -146,6 +178,24 @@ class Source1GameInfoProvider(ContentProvider):
         for mount in self.mount:
             yield from mount.glob(pattern)
 
+    def glob_paths(self, pattern: str) -> Iterator[TinyPath]:
+        for mount in self.mount:
+            yield from mount.glob_paths(pattern)
+
+    def prefix_paths(self, prefix: str) -> Iterator[TinyPath]:
+        for mount in self.mount:
+            yield from mount.prefix_paths(prefix)
+
+    def index_mounts(self) -> list[ContentProvider]:
+        return self.mount
+
+    def clean(self):
+        for mount in self.mount:
+            mount.clean()
+
+    def seed_index(self, owners: dict[str, ContentProvider]):
+        self._indexed_owners = owners
+
     @property
     def steam_id(self) -> SteamAppId:
         return self._steamapp_id
@@ -63,6 +63,17 @@ class Source2GameInfoProvider(ContentProvider):
                 return True
         return False
 
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        found = set()
+        pending = list(filepaths)
+        for mount in self.mount:
+            if not pending:
+                break
+            mount_found = mount.check_many(pending)
+            found.update(mount_found)
+            pending = [filepath for filepath in pending if filepath not in mount_found]
+        return found
+
     def get_relative_path(self, filepath: TinyPath):
         if is_relative_to(filepath, self.root):
             rel_path = filepath.relative_to(self.root)
@@ -92,6 +103,21 @@ class Source2GameInfoProvider(ContentProvider):
         for mount in self.mount:
             yield from mount.glob(pattern)
 
+    def glob_paths(self, pattern: str) -> Iterator[TinyPath]:
+        for mount in self.mount:
+            yield from mount.glob_paths(pattern)
+
+    def prefix_paths(self, prefix: str) -> Iterator[TinyPath]:
+        for mount in self.mount:
+            yield from mount.prefix_paths(prefix)
+
+    def index_mounts(self) -> list[ContentProvider]:
+        return self.mount
+
+    def clean(self):
+        for mount in self.mount:
+            mount.clean()
+
     @property
     def steam_id(self) -> SteamAppId:
         return self._steamapp_id
@@ -1,8 +1,17 @@
+import mmap
+import threading
+import weakref
 from typing import Iterator, Optional
 
+from SourceIO.library.archives.vpk import VPK_DIR_ARCHIVE_INDEX, VPKDirectory, VPKEntry
+from SourceIO.library.global_config import ContentManagerConfig
 from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.shared.content_manager.asset_index import ProviderIndex, asset_key, build_vpk_index
+from SourceIO.library.shared.content_manager.path_index import PathIndex
 from SourceIO.library.shared.content_manager.provider import ContentProvider
 from SourceIO.library.utils import Buffer, MemoryBuffer, TinyPath
+from SourceIO.library.utils.bloom_filter import BloomFilter
+from SourceIO.library.utils.exceptions import InvalidFileMagic
 from SourceIO.library.utils.pylib import VPKFile
 from SourceIO.logger import SourceLogMan
 
@@ -10,16 +19,96 @@ log_manager = SourceLogMan()
 logger = log_manager.get_logger('VpkProvider')
 
 
+class _MappedChunk:
+    """Read-only mapping of a single VPK archive chunk.
+
+    Every buffer handed out holds a reference, the mapping is closed once the owning provider was cleaned
+    and the last of those buffers is gone.
+    """
+
+    def __init__(self, filepath: TinyPath):
+        with open(filepath, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._mm)
+        # Buffers are handed out and finalized on prefetch workers as well as the main thread, reentrant
+        # since a finalizer may run from a garbage collection triggered while the lock is held.
+        self._lock = threading.RLock()
+        self.refs = 0
+        self.released = False
+
+    def buffer(self, offset: int, size: int) -> MemoryBuffer:
+        buffer = MemoryBuffer(self.view[offset:offset + size])
+        with self._lock:
+            self.refs += 1
+        weakref.finalize(buffer, self._unref)
+        return buffer
+
+    def _unref(self):
+        with self._lock:
+            self.refs -= 1
+            if self.released and self.refs <= 0:
+                self._close()
+
+    def release(self):
+        with self._lock:
+            self.released = True
+            if self.refs <= 0:
+                self._close()
+
+    def _close(self):
+        if self._mm is None:
+            return
+        mm, self._mm = self._mm, None
+        view, self.view = self.view, None
+        try:
+            view.release()
+            mm.close()
+        except BufferError:
+            # Somebody still holds a slice of one of our buffers. Those slices keep the mapping alive,
+            # it gets unmapped when the last of them is garbage collected.
+            pass
+
+
 class VPKContentProvider(ContentProvider):
     def __init__(self, filepath: TinyPath, override_steamid=SteamAppId.UNKNOWN):
         super().__init__(filepath)
         self._override_steamid = override_steamid
         self._initialized = False
         self.vpk_archive: VPKFile | None = None
+        self.vpk_directory: VPKDirectory | None = None
+        self._chunks: dict[int, _MappedChunk] = {}
+        # Guards lazy init, chunk mapping and the native reader, prefetch workers share this provider.
+        self._lock = threading.RLock()
+        # Built from the asset index at mount time, lets lookups skip archives that certainly miss a path
+        # without even opening them.
+        self.membership_filter: BloomFilter | None = None
+        self._listing: ProviderIndex | None = None
+        self._path_index: PathIndex | None = None
 
-    def check(self, filepath: TinyPath) -> bool:
+    def _filtered_out(self, filepath: TinyPath) -> bool:
+        return self.membership_filter is not None and asset_key(filepath) not in self.membership_filter
+
+    def _check(self, filepath: TinyPath) -> bool:
         self._init()
-        return self.vpk_archive.check(filepath)
+        if self.vpk_directory is not None:
+            found = self.vpk_directory.find(filepath) is not None
+        else:
+            with self._lock:
+                found = self.vpk_archive.check(filepath)
+        if not found and self.membership_filter is not None:
+            self.membership_filter.note_false_positive()
+        return found
+
+    def check(self, filepath: TinyPath) -> bool:
+        if self._filtered_out(filepath):
+            return False
+        return self._check(filepath)
+
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        filepaths = [filepath for filepath in filepaths if not self._filtered_out(filepath)]
+        if not filepaths:
+            return set()
+        return {filepath for filepath in filepaths if self._check(filepath)}
 
     def get_relative_path(self, filepath: TinyPath) -> TinyPath | None:
         return None
@@ -36,22 +125,97 @@ class VPKContentProvider(ContentProvider):
     def _init(self):
         if self._initialized:
             return
-        logger.info(f"Loading {self.filepath!r}")
-        self.vpk_archive = VPKFile(self.filepath)
-        self._initialized = True
+        with self._lock:
+            if self._initialized:
+                return
+            logger.info(f"Loading {self.filepath!r}")
+            if ContentManagerConfig().use_vpk_mmap:
+                try:
+                    self.vpk_directory = VPKDirectory(self.filepath).read()
+                except (InvalidFileMagic, NotImplementedError) as ex:
+                    logger.warn(f"Cannot memory-map {self.filepath!r}, falling back to regular reads: {ex}")
+            if self.vpk_directory is None:
+                self.vpk_archive = VPKFile(self.filepath)
+            self._initialized = True
+
+    def _get_chunk(self, archive_index: int) -> _MappedChunk:
+        chunk = self._chunks.get(archive_index)
+        if chunk is None:
+            with self._lock:
+                chunk = self._chunks.get(archive_index)
+                if chunk is None:
+                    chunk = self._chunks[archive_index] = _MappedChunk(self.vpk_directory.archive_path(archive_index))
+        return chunk
+
+    def _read_mapped(self, entry: VPKEntry) -> Buffer:
+        directory = self.vpk_directory
+        if entry.size == 0:
+            return self._get_chunk(VPK_DIR_ARCHIVE_INDEX).buffer(entry.preload_offset, entry.preload_size)
+        offset = entry.offset
+        if entry.in_dir_archive:
+            offset += directory.data_offset
+        buffer = self._get_chunk(entry.archive_index).buffer(offset, entry.size)
+        if entry.preload_size == 0:
+            return buffer
+        # Preloaded bytes live in the directory file, such entries can't be a single view.
+        preload = self._get_chunk(VPK_DIR_ARCHIVE_INDEX).view
+        preload = preload[entry.preload_offset:entry.preload_offset + entry.preload_size]
+        return MemoryBuffer(preload.tobytes() + buffer.data.tobytes())
 
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
+        index = self.path_index()
+        if index is not None:
+            for key in index.glob(pattern):
+                key = TinyPath(key)
+                yield key, self.find_file(key)
+            return
         self._init()
         for key, data in self.vpk_archive.glob(pattern):
             yield key, MemoryBuffer(data)
 
+    def path_index(self) -> Optional[PathIndex]:
+        if self._path_index is None:
+            if self.vpk_directory is not None:
+                paths = self.vpk_directory.entries.keys()
+            elif self._listing is not None:
+                paths = self._listing.files.keys()
+            else:
+                try:
+                    paths = VPKDirectory(self.filepath).read().entries.keys()
+                except (OSError, InvalidFileMagic, NotImplementedError, ValueError) as ex:
+                    logger.debug(f"Cannot list {self.filepath!r}: {ex}")
+                    return None
+            self._path_index = PathIndex(paths)
+        return self._path_index
+
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
+        if self._filtered_out(filepath):
+            return None
         self._init()
-        file = self.vpk_archive.find_file(filepath)
+        if self.vpk_directory is not None:
+            entry = self.vpk_directory.find(filepath)
+            if entry is None:
+                return None
+            return self._read_mapped(entry)
+        with self._lock:
+            file = self.vpk_archive.find_file(filepath)
         if file:
             return MemoryBuffer(file)
         return None
 
+    def clean(self):
+        with self._lock:
+            for chunk in self._chunks.values():
+                chunk.release()
+            self._chunks.clear()
+
+    def build_index(self) -> Optional[ProviderIndex]:
+        return build_vpk_index(self.filepath)
+
+    def apply_index(self, index: ProviderIndex):
+        self.membership_filter = BloomFilter.from_keys(index.files.keys())
+        self._listing = index
+
     @property
     def root(self) -> TinyPath:
         return self.filepath.parent
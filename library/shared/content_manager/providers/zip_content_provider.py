@@ -1,22 +1,130 @@
-import fnmatch
+import io
+import struct
 from typing import Iterator, Optional
-from zipfile import ZipFile
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
 
 from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.shared.content_manager.path_index import PathIndex
 from SourceIO.library.shared.content_manager.provider import ContentProvider
-from SourceIO.library.utils import Buffer, MemoryBuffer, TinyPath
+from SourceIO.library.utils import Buffer, MemoryBuffer, MMapBuffer, TinyPath
+from SourceIO.library.utils.file_utils import MemorySlice
+
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_HEADER_MAGIC = b"PK\x03\x04"
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview, lets ZipFile work without copying the archive."""
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        else:
+            raise ValueError("Invalid whence argument")
+        if self._pos < 0:
+            raise ValueError("Negative seek position")
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = max(self._pos, end)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, b) -> int:
+        data = self._view[self._pos:self._pos + len(b)]
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
 
 
 class ZIPContentProvider(ContentProvider):
     def __init__(self, filepath: TinyPath, steamapp_id: SteamAppId = SteamAppId.UNKNOWN):
         super().__init__(filepath)
         self._steamapp_id = steamapp_id
-        self._zip_file = ZipFile(filepath)
-        self._cache = {k.replace("\\", "/").lower(): k for k in self._zip_file.namelist()}
+        self._zip_file: ZipFile | None = None
+        self._view: memoryview | None = None
+        self._mapping: MMapBuffer | None = None
+        self._mapped_region: tuple[TinyPath, int, int] | None = None
+        self._cache: dict[str, str] = {}
+        self._open_mapping(MMapBuffer(filepath))
+
+    def _open_view(self, view: memoryview):
+        """Open the archive over ``view``, stored members are later served as slices of it."""
+        self._view = view
+        self._zip_file = ZipFile(_ViewReader(view))
+        self._cache = {k.replace("\\", "/").lower(): k for k in self._zip_file.NameToInfo}
+        self._path_index = None
+
+    def _open_mapping(self, mapping: MMapBuffer):
+        """Open the archive over a file mapping this provider owns and closes in :meth:`clean`."""
+        self._mapping = mapping
+        self._mapped_region = mapping.path, mapping.offset, mapping.size()
+        self._open_view(mapping.data)
+
+    def _reopen(self):
+        self._open_mapping(MMapBuffer(*self._mapped_region))
+
+    def clean(self):
+        """Close the archive mapping, it is mapped again on the next read."""
+        if self._mapping is None:
+            return
+        mapping, self._mapping = self._mapping, None
+        self._zip_file = None
+        self._view = None
+        # Members already handed out keep their pages mapped until they are gone
+        mapping.close()
+
+    def _read_member(self, name: str) -> Buffer:
+        if self._zip_file is None:
+            self._reopen()
+        info = self._zip_file.getinfo(name)
+        if self._view is not None and info.compress_type == ZIP_STORED and not info.flag_bits & 0x1:
+            start = self._member_data_offset(info)
+            if start is not None:
+                return MemorySlice(self._view[start:start + info.file_size], start)
+        return MemoryBuffer(self._zip_file.read(info))
+
+    def _member_data_offset(self, info: ZipInfo) -> int | None:
+        offset = info.header_offset
+        if offset + _LOCAL_HEADER.size > len(self._view):
+            return None
+        magic, name_size, extra_size = _LOCAL_HEADER.unpack_from(self._view, offset)
+        if magic != _LOCAL_HEADER_MAGIC:
+            return None
+        start = offset + _LOCAL_HEADER.size + name_size + extra_size
+        if start + info.file_size > len(self._view):
+            return None
+        return start
 
     def check(self, filepath: TinyPath) -> bool:
         return filepath.as_posix().lower() in self._cache
 
+    def check_many(self, filepaths: list[TinyPath]) -> set[TinyPath]:
+        cache = self._cache
+        return {filepath for filepath in filepaths if filepath.as_posix().lower() in cache}
+
     def get_relative_path(self, filepath: TinyPath) -> TinyPath | None:
         return None
 
@@ -29,13 +137,18 @@ class ZIPContentProvider(ContentProvider):
             return self.steam_id
 
     def find_file(self, filepath: TinyPath) -> Optional[Buffer]:
-        if filepath.as_posix().lower() in self._cache:
-            return MemoryBuffer(self._zip_file.read(self._cache[filepath.as_posix().lower()]))
+        name = self._cache.get(filepath.as_posix().lower())
+        if name is not None:
+            return self._read_member(name)
 
     def glob(self, pattern: str) -> Iterator[tuple[TinyPath, Buffer]]:
-        matches = fnmatch.filter(self._cache.keys(), pattern)
-        for match in matches:
-            yield TinyPath(match), MemoryBuffer(self._zip_file.read(self._cache[match]))
+        for match in self.path_index().glob(pattern):
+            yield TinyPath(match), self._read_member(self._cache[match])
+
+    def path_index(self) -> PathIndex:
+        if self._path_index is None:
+            self._path_index = PathIndex(self._cache.keys())
+        return self._path_index
 
     @property
     def root(self) -> TinyPath:
@@ -1,10 +1,12 @@
 from dataclasses import dataclass, field
 from typing import Optional, Type, TypeVar
 
+from SourceIO.library.global_config import Source1BSPConfig
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager import ContentManager
-from SourceIO.library.source1.bsp.lump import Quake3LumpInfo, LumpTag, ValveLumpInfo, Lump, AbstractLump
-from SourceIO.library.utils import Buffer, FileBuffer
+from SourceIO.library.source1.bsp.lump import Quake3LumpInfo, LumpTag, ValveLumpInfo, Lump, AbstractLump, \
+    LumpDecompressor, LUMP_TAGS
+from SourceIO.library.utils import Buffer, FileBuffer, MMapBuffer
 from SourceIO.library.utils.tiny_path import TinyPath
 from SourceIO.logger import SourceLogMan
 
@@ -39,59 +41,96 @@ class BSPInfo:
     steam_app_id: SteamAppId
 
 
+_RESOLVED_LUMP_CLASSES: dict[tuple, dict[str, tuple[Type[Lump], LumpTag]]] = {}
+
+
+def _registry_generation() -> int:
+    # Lump modules register their tags on import, a new registration invalidates resolved tables
+    return sum(len(tags) for tags in LUMP_TAGS.values())
+
+
+def _rank_lump_tag(info: BSPInfo, tag: LumpTag) -> Optional[int]:
+    """Rank of a tag for this map, None when it does not apply."""
+    if tag.lump_id >= len(info.lumps):
+        return None
+    lump = info.lumps[tag.lump_id]
+    if tag.bsp_ident is not None and tag.bsp_ident != info.ident:
+        return None
+    if tag.bsp_version is not None and tag.bsp_version > info.version:
+        return None
+    if tag.steam_id is not None and tag.steam_id != info.steam_app_id:
+        return None
+    if tag.lump_version is not None and tag.lump_version != lump.version:
+        return None
+    rank = 0
+    if tag.bsp_version is not None and tag.bsp_version == info.version:
+        rank += 2
+    if tag.bsp_ident is not None and tag.bsp_ident == info.ident:
+        rank += 4
+    if tag.steam_id is not None and tag.steam_id == info.steam_app_id:
+        rank += 1
+    if tag.lump_version is not None and tag.lump_version == lump.version:
+        rank += 1
+    return rank
+
+
+def resolve_lump_classes(info: BSPInfo) -> dict[str, tuple[Type[Lump], LumpTag]]:
+    """Pick the best lump class for every registered lump name.
+
+    Maps sharing ident, version, steam id and lump versions share the result.
+    """
+    key = (info.ident, info.version, info.steam_app_id,
+           tuple(lump.version if lump is not None else None for lump in info.lumps), _registry_generation())
+    resolved = _RESOLVED_LUMP_CLASSES.get(key)
+    if resolved is not None:
+        return resolved
+    resolved = {}
+    for lump_name, tags in LUMP_TAGS.items():
+        best_rank = -1
+        for sub, tag in tags:
+            rank = _rank_lump_tag(info, tag)
+            # Later registrations win ties, the same way a stable sort by rank picks its last element
+            if rank is not None and rank >= best_rank:
+                best_rank = rank
+                resolved[lump_name] = sub, tag
+    _RESOLVED_LUMP_CLASSES[key] = resolved
+    return resolved
+
+
 @dataclass
 class BSPFile:
     info: BSPInfo
     filepath: TinyPath
     buffer: Buffer
     lump_cache: dict[str, Lump] = field(default_factory=dict, init=False)
+    _lump_classes: Optional[dict[str, tuple[Type[Lump], LumpTag]]] = field(default=None, init=False, repr=False)
+    _lump_classes_generation: int = field(default=-1, init=False, repr=False)
 
     def get_lump(self, lump_name) -> LumpType | None:
-        info = self.info
         if lump_name in self.lump_cache:
             return self.lump_cache[lump_name]
-        else:
-            matches: list[tuple[Type[Lump], LumpTag]] = []
-            for sub in Lump.all_subclasses():
-                sub: Type[Lump]
-                for dep in sub.tags:
-                    if dep.lump_id >= len(info.lumps):
-                        continue
-                    if dep.lump_name == lump_name:
-                        if dep.bsp_ident is not None and dep.bsp_ident != info.ident:
-                            continue
-                        if dep.bsp_version is not None and dep.bsp_version > info.version:
-                            continue
-                        if dep.steam_id is not None and dep.steam_id != info.steam_app_id:
-                            continue
-                        if dep.lump_version is not None and dep.lump_version != info.lumps[dep.lump_id].version:
-                            continue
-                        matches.append((sub, dep))
-            best_matches = []
-            for match_sub, match_dep in matches:
-                if match_dep.lump_id >= len(info.lumps):
-                    continue
-                lump = info.lumps[match_dep.lump_id]
-                rank = 0
-                if match_dep.bsp_version is not None and match_dep.bsp_version == info.version:
-                    rank += 2
-                elif match_dep.bsp_version is not None and match_dep.bsp_version > info.version:
-                    rank += 1
-                if match_dep.bsp_ident is not None and match_dep.bsp_ident == info.ident:
-                    rank += 4
-                if match_dep.steam_id is not None and match_dep.steam_id == info.steam_app_id:
-                    rank += 1
-                if match_dep.lump_version is not None and match_dep.lump_version == lump.version:
-                    rank += 1
-                best_matches.append((rank, match_sub, match_dep))
-            if not best_matches:
-                return None
-            best_matches = list(sorted(best_matches, key=lambda a: a[0]))
-            _, sub, dep = best_matches[-1]
-
-            parsed_lump = self.parse_lump(sub, dep.lump_id, dep.lump_name)
-            self.lump_cache[lump_name] = parsed_lump
-            return parsed_lump
+        resolved = self.lump_classes().get(lump_name)
+        if resolved is None:
+            return None
+        sub, dep = resolved
+        parsed_lump = self.parse_lump(sub, dep.lump_id, dep.lump_name)
+        self.lump_cache[lump_name] = parsed_lump
+        return parsed_lump
+
+    def lump_classes(self) -> dict[str, tuple[Type[Lump], LumpTag]]:
+        """Lump class and tag chosen for every lump name this map can provide."""
+        if self._lump_classes is None or self._lump_classes_generation != _registry_generation():
+            self._lump_classes = resolve_lump_classes(self.info)
+            self._lump_classes_generation = _registry_generation()
+        return self._lump_classes
+
+    def close(self):
+        """Release resources held past parsing, the map stays readable through lazily parsed lumps."""
+
+    def available_lumps(self) -> list[str]:
+        """Names of the lumps this map has data for."""
+        lumps = self.info.lumps
+        return [name for name, (_, tag) in self.lump_classes().items() if lumps[tag.lump_id].size != 0]
 
     def parse_lump(self, lump_class: Type[Lump], lump_id, lump_name):
         info = self.info
@@ -109,7 +148,9 @@ class BSPFile:
 
         if info.lumps[lump_id].size != 0:
             lump_info = info.lumps[lump_id]
-            buffer = self._get_lump_buffer(lump_id, lump_info)
+            buffer = self._map_lump(lump_id, lump_info) if lump_class.map_in_place else None
+            if buffer is None:
+                buffer = self._get_lump_buffer(lump_id, lump_info)
 
             parsed_lump = lump_class(lump_info).parse(buffer, self)
             self.lump_cache[lump_id] = parsed_lump
@@ -125,30 +166,80 @@ class BSPFile:
 
         return self.buffer.slice(lump_info.offset, lump_info.size)
 
+    def _map_lump(self, lump_id: int, lump_info: AbstractLump) -> Optional[MMapBuffer]:
+        """Lump data mapped straight from disk, None unless it is stored uncompressed in a file."""
+        lump_path = self.filepath.parent / f'{self.filepath.name}.{lump_id:04x}.bsp_lump'
+        if lump_path.exists():
+            return MMapBuffer(lump_path)
+        if getattr(lump_info, "compressed", False) or not isinstance(self.buffer, FileBuffer):
+            return None
+        if isinstance(self.buffer.name, int):
+            return None
+        return MMapBuffer(self.buffer.name, lump_info.offset, lump_info.size)
+
+
+def read_vbsp_header(buffer: Buffer) -> tuple[str, tuple[int, int], list[AbstractLump], int, bool]:
+    """Read a VBSP header: magic, (version, minor version), lump infos, map revision and the L4D2 layout flag."""
+    magic = buffer.read_fourcc()
+    assert magic == "VBSP", "Invalid BSP header"
+    version = buffer.read_int32()
+    if version > 0xFFFF:
+        version = version & 0xFFFF, version >> 16
+    else:
+        version = (version, 0)
+    is_l4d2 = buffer.peek_uint32() <= 1036 and version == (21, 0)
+    # noinspection PyTypeChecker
+    lumps_info: list[AbstractLump] = [None] * 64  # Just pre-allocating array
+    for lump_id in range(64):
+        lump = ValveLumpInfo.from_buffer(buffer, lump_id, is_l4d2)
+        lumps_info[lump_id] = lump
+    revision = buffer.read_int32()
+    return magic, version, lumps_info, revision, is_l4d2
+
 
 @dataclass(slots=True)
 class VBSPFile(BSPFile):
     is_l4d2: bool
+    decompressor: Optional[LumpDecompressor] = field(default=None, init=False)
 
     @classmethod
     def from_buffer(cls, filepath: TinyPath, buffer: Buffer, content_manager: ContentManager,
                     override_steamappid: Optional[SteamAppId] = None):
-        magic = buffer.read_fourcc()
-        assert magic == "VBSP", "Invalid BSP header"
-        version = buffer.read_int32()
-        if version > 0xFFFF:
-            version = version & 0xFFFF, version >> 16
-        else:
-            version = (version, 0)
-        is_l4d2 = buffer.peek_uint32() <= 1036 and version == (21, 0)
-        # noinspection PyTypeChecker
-        lumps_info: list[AbstractLump] = [None] * 64  # Just pre-allocating array
-        for lump_id in range(64):
-            lump = ValveLumpInfo.from_buffer(buffer, lump_id, is_l4d2)
-            lumps_info[lump_id] = lump
-        revision = buffer.read_int32()
+        magic, version, lumps_info, revision, is_l4d2 = read_vbsp_header(buffer)
         steam_app_id = override_steamappid or content_manager.get_steamid_from_asset(filepath)
-        return cls(BSPInfo(magic, version, lumps_info, revision, steam_app_id), filepath, buffer, is_l4d2)
+        bsp = cls(BSPInfo(magic, version, lumps_info, revision, steam_app_id), filepath, buffer, is_l4d2)
+        bsp.start_decompression()
+        return bsp
+
+    def start_decompression(self):
+        """In eager mode, start decoding every compressed lump a lump class is registered for in the background."""
+        config = Source1BSPConfig()
+        if not config.eager_lump_decompression:
+            return
+        self.decompressor = LumpDecompressor(config.lump_decompression_workers, config.lump_decompression_max_bytes)
+        parsed_lump_ids = {tag.lump_id for _, tag in self.lump_classes().values()}
+        for lump_id, lump_info in enumerate(self.info.lumps):
+            if lump_info is None or lump_info.size == 0 or not lump_info.compressed:
+                continue
+            if lump_id not in parsed_lump_ids:
+                continue
+            if (self.filepath.parent / f'{self.filepath.name}.{lump_id:04x}.bsp_lump').exists():
+                continue
+            compressed = self.buffer.slice(lump_info.offset, lump_info.size)
+            if not self.decompressor.submit(lump_id, compressed, lump_info.decompressed_size):
+                logger.debug(f"Lump {lump_id} exceeds the eager decompression budget, it will be decoded on demand")
+
+    def close(self):
+        """Drop eagerly decompressed lumps nobody asked for and stop the decompression workers."""
+        if self.decompressor is not None:
+            self.decompressor.close()
+            self.decompressor = None
+
+    def pop_decompressed(self, key) -> Optional[Buffer]:
+        """Buffer eager mode decompressed under ``key``, None if it has to be decompressed by the caller."""
+        if self.decompressor is None:
+            return None
+        return self.decompressor.pop(key)
 
     def _get_lump_buffer(self, lump_id: int, lump_info: ValveLumpInfo) -> Buffer:
         base_path = self.filepath.parent
@@ -161,7 +252,9 @@ class VBSPFile(BSPFile):
             return self.buffer.slice(lump_info.offset, lump_info.size)
         else:
             assert isinstance(lump_info, ValveLumpInfo)
-            buffer = Lump.decompress_lump(self.buffer.slice(lump_info.offset, lump_info.size))
+            buffer = self.pop_decompressed(lump_id)
+            if buffer is None:
+                buffer = Lump.decompress_lump(self.buffer.slice(lump_info.offset, lump_info.size))
             assert buffer.size() == lump_info.decompressed_size
             return buffer
 
@@ -182,7 +275,9 @@ class RespawnBSPFile(VBSPFile):
             lump.id = lump_id
             lumps_info[lump_id] = lump
         steam_app_id = override_steamappid or content_manager.get_steamid_from_asset(filepath)
-        return cls(BSPInfo(magic, (version, 0), lumps_info, revision, steam_app_id), filepath, buffer, False)
+        bsp = cls(BSPInfo(magic, (version, 0), lumps_info, revision, steam_app_id), filepath, buffer, False)
+        bsp.start_decompression()
+        return bsp
 
 
 class IBSPFile(BSPFile):
@@ -0,0 +1,266 @@
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import struct
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+
+from SourceIO.library.shared.content_manager.asset_index import user_cache_dir
+from SourceIO.library.source1.bsp.bsp_file import read_vbsp_header
+from SourceIO.library.source1.bsp.datatypes.game_lump_header import (GameLumpHeader, DMGameLumpHeader,
+                                                                     VindictusGameLumpHeader)
+from SourceIO.library.source1.bsp.lump import Lump, ValveLumpInfo
+from SourceIO.library.source1.bsp.lumps.entity_lump import EntityLump
+from SourceIO.library.utils import Buffer, FileBuffer, MemoryBuffer, TinyPath
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('BSPScanner')
+
+BSP_SCAN_CACHE_VERSION = 1
+
+_LUMP_ENTITIES = 0
+_LUMP_GAME_LUMP = 35
+_LUMP_TEXDATA_STRING_DATA = 43
+
+
+@dataclass(slots=True)
+class BSPSummary:
+    """What a map picker needs to know about a map, without loading it."""
+    path: str
+    size: int
+    mtime_ns: int
+    version: tuple[int, int]
+    revision: int
+    lump_sizes: dict[int, int] = field(default_factory=dict)
+    worldspawn: dict[str, str] = field(default_factory=dict)
+    entity_classes: dict[str, int] = field(default_factory=dict)
+    materials: list[str] = field(default_factory=list)
+    static_prop_models: list[str] = field(default_factory=list)
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'BSPSummary':
+        summary = cls(**data)
+        summary.version = tuple(summary.version)
+        summary.lump_sizes = {int(lump_id): size for lump_id, size in summary.lump_sizes.items()}
+        return summary
+
+
+def _read_lump(buffer: Buffer, lump_info: ValveLumpInfo) -> Optional[Buffer]:
+    if lump_info.size == 0:
+        return None
+    buffer.seek(lump_info.offset)
+    data = MemoryBuffer(buffer.read(lump_info.size))
+    if lump_info.compressed:
+        return Lump.decompress_lump(data)
+    return data
+
+
+def _read_game_lump_headers(game_lump: Buffer, lump_info: ValveLumpInfo, version: tuple[int, int],
+                            file_size: int) -> Optional[list[GameLumpHeader]]:
+    """Game lump directory in whichever header layout fits inside the map, None if no layout does.
+
+    Dark Messiah (20.4) headers carry 4 extra leading bytes, Vindictus widens flags and version to 32 bits and
+    is only told apart by its offsets making sense.
+    """
+    count = game_lump.read_int32()
+    if version == (20, 4):
+        readers = (DMGameLumpHeader.read,)
+    else:
+        readers = (GameLumpHeader.from_buffer, VindictusGameLumpHeader.read)
+    start = game_lump.tell()
+    for reader in readers:
+        game_lump.seek(start)
+        try:
+            headers = [reader(game_lump, None) for _ in range(count)]
+        except (EOFError, ValueError, struct.error):
+            continue
+        if all(lump_info.offset <= header.offset <= lump_info.offset + lump_info.size and
+               (header.flags == 1 or header.offset + header.size <= file_size)
+               for header in headers if header.id):
+            return headers
+    return None
+
+
+def _read_static_prop_models(buffer: Buffer, lump_info: ValveLumpInfo, version: tuple[int, int]) -> list[str]:
+    """Model dictionary of the sprp game lump, the props themselves are not read."""
+    game_lump = _read_lump(buffer, lump_info)
+    if game_lump is None:
+        return []
+    headers = _read_game_lump_headers(game_lump, lump_info, version, buffer.size())
+    if headers is None:
+        logger.debug(f"Unknown game lump header layout in BSP v{version[0]}.{version[1]}, skipping static props")
+        return []
+    for index, header in enumerate(headers):
+        if header.id != 'sprp':
+            continue
+        buffer.seek(header.offset)
+        if header.flags == 1:
+            end = headers[index + 1].offset if index + 1 < len(headers) else lump_info.offset + lump_info.size
+            prop_buffer = Lump.decompress_lump(MemoryBuffer(buffer.read(end - header.offset)))
+        else:
+            prop_buffer = MemoryBuffer(buffer.read(header.size))
+        return [prop_buffer.read_ascii_string(128) for _ in range(prop_buffer.read_int32())]
+    return []
+
+
+def scan_bsp(filepath: TinyPath) -> Optional[BSPSummary]:
+    """Summarize a VBSP map reading only its header, entities, texture names and static prop models.
+
+    Returns None for files that are not VBSP maps or can't be read.
+    """
+    try:
+        stat = os.stat(filepath)
+        with FileBuffer(filepath) as buffer:
+            if buffer.size() < 8 or buffer.read(4) != b"VBSP":
+                return None
+            buffer.seek(0)
+            _, version, lumps, revision, _ = read_vbsp_header(buffer)
+            summary = BSPSummary(str(filepath), stat.st_size, stat.st_mtime_ns, version, revision,
+                                 {lump.id: lump.size for lump in lumps if lump.size})
+
+            entity_buffer = _read_lump(buffer, lumps[_LUMP_ENTITIES])
+            if entity_buffer is not None:
+                entities = EntityLump(lumps[_LUMP_ENTITIES]).parse(entity_buffer, None).entities
+                summary.entity_classes = dict(Counter(entity.get("classname", "") for entity in entities))
+                worldspawn = next((entity for entity in entities if entity.get("classname") == "worldspawn"), {})
+                summary.worldspawn = {key: value if isinstance(value, str) else str(value)
+                                      for key, value in worldspawn.items()}
+
+            strings_buffer = _read_lump(buffer, lumps[_LUMP_TEXDATA_STRING_DATA])
+            if strings_buffer is not None:
+                names = strings_buffer.read(-1).decode("latin1").split("\x00")
+                summary.materials = list(dict.fromkeys(name for name in names if name))
+
+            summary.static_prop_models = _read_static_prop_models(buffer, lumps[_LUMP_GAME_LUMP], version)
+    except (OSError, AssertionError, ValueError, EOFError, IndexError, lzma.LZMAError, struct.error) as ex:
+        logger.warn(f"Failed to scan {filepath!r}: {ex}")
+        return None
+    return summary
+
+
+def _scan_bsp_json(filepath: str) -> Optional[dict]:
+    try:
+        summary = scan_bsp(TinyPath(filepath))
+    except Exception as ex:
+        # One broken map must not take the rest of the batch down with it
+        logger.exception(f"Failed to scan {filepath!r}", ex)
+        return None
+    return summary.to_json() if summary is not None else None
+
+
+class BSPScanCache:
+    """Summaries of the maps of one folder, kept on disk and reused while a map's size and mtime match."""
+
+    def __init__(self, filepath: TinyPath):
+        self.filepath = filepath
+        self.summaries: dict[str, BSPSummary] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, filepath: TinyPath) -> 'BSPScanCache':
+        cache = cls(filepath)
+        if not filepath.exists():
+            return cache
+        try:
+            with gzip.open(filepath, "rt", encoding="utf8") as f:
+                data = json.load(f)
+            if data.get("version") != BSP_SCAN_CACHE_VERSION:
+                return cache
+            for item in data["maps"]:
+                summary = BSPSummary.from_json(item)
+                cache.summaries[summary.path] = summary
+        except (OSError, ValueError, KeyError, TypeError) as ex:
+            logger.warn(f"Discarding unreadable map summary cache {filepath!r}: {ex}")
+            cache.summaries.clear()
+        return cache
+
+    def get(self, filepath: TinyPath, stat: os.stat_result) -> Optional[BSPSummary]:
+        summary = self.summaries.get(str(filepath))
+        if summary is not None and summary.size == stat.st_size and summary.mtime_ns == stat.st_mtime_ns:
+            return summary
+        return None
+
+    def put(self, summary: BSPSummary):
+        self.summaries[summary.path] = summary
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {"version": BSP_SCAN_CACHE_VERSION,
+                "maps": [summary.to_json() for summary in self.summaries.values()]}
+        try:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.filepath, "wt", encoding="utf8", compresslevel=1) as f:
+                json.dump(data, f, separators=(",", ":"))
+        except OSError as ex:
+            logger.debug(f"Failed to write map summary cache {self.filepath!r}: {ex}")
+            return
+        self.dirty = False
+
+
+def scan_bsp_files(filepaths: Iterable[TinyPath], workers: int = 0,
+                   cache: Optional[BSPScanCache] = None) -> list[BSPSummary]:
+    """Summaries of ``filepaths``, maps that are not in ``cache`` are scanned on ``workers`` processes.
+
+    With ``workers`` below 2 everything is scanned in this process.
+    """
+    summaries: dict[str, BSPSummary] = {}
+    pending: list[str] = []
+    for filepath in filepaths:
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            continue
+        summary = cache.get(filepath, stat) if cache is not None else None
+        if summary is not None:
+            summaries[str(filepath)] = summary
+        else:
+            pending.append(str(filepath))
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(min(workers, len(pending))) as pool:
+            results = list(pool.map(_scan_bsp_json, pending, chunksize=4))
+    else:
+        results = [_scan_bsp_json(filepath) for filepath in pending]
+
+    for filepath, result in zip(pending, results):
+        if result is None:
+            continue
+        summary = BSPSummary.from_json(result)
+        summaries[filepath] = summary
+        if cache is not None:
+            cache.put(summary)
+    return [summaries[key] for key in sorted(summaries)]
+
+
+def scan_cache_path(directory: TinyPath) -> TinyPath:
+    """Summary cache file of a map folder, kept in the per-user cache and keyed by the folder's absolute path."""
+    normalized = os.path.normcase(os.path.abspath(directory))
+    digest = hashlib.sha1(normalized.encode("utf8")).hexdigest()[:16]
+    return user_cache_dir() / "bsp_summaries" / f"{directory.name or 'root'}_{digest}.json.gz"
+
+
+def scan_bsp_directory(directory: TinyPath, workers: int = 0, use_cache: bool = True) -> list[BSPSummary]:
+    """Summaries of every ``.bsp`` directly inside ``directory``, cached in the per-user cache folder."""
+    filepaths = sorted(directory.glob("*.bsp"))
+    if not use_cache:
+        return scan_bsp_files(filepaths, workers)
+    cache = BSPScanCache.load(scan_cache_path(directory))
+    summaries = scan_bsp_files(filepaths, workers, cache)
+    # Forget maps that were deleted
+    known = {summary.path for summary in summaries}
+    for path in list(cache.summaries):
+        if path not in known:
+            del cache.summaries[path]
+            cache.dirty = True
+    cache.save()
+    return summaries
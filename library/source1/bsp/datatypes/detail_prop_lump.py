@@ -1,28 +1,72 @@
+from collections.abc import Sequence
 from dataclasses import dataclass
+from enum import IntEnum
+
+import numpy as np
 
 from SourceIO.library.shared.types import Vector2, Vector3
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile
 from SourceIO.library.source1.bsp.datatypes.game_lump_header import GameLumpHeader
 from SourceIO.library.utils.file_utils import Buffer
+from SourceIO.library.utils.struct_layout import struct_layout
+
+
+class DetailPropType(IntEnum):
+    MODEL = 0
+    SPRITE = 1
+    SHAPE_CROSS = 2
+    SHAPE_TRI = 3
 
 
 class DetailPropLump:
     def __init__(self, glump_info: GameLumpHeader):
         self._glump_info = glump_info
         self.model_names: list[str] = []
-        self.sprites: list[DetailSprite] = []
-        self.detail_props: list[DetailProp] = []
+        self.sprites: Sequence[DetailSprite] = []
+        self.detail_props: Sequence[DetailProp] = []
+
+    @property
+    def records(self) -> np.ndarray:
+        """All detail props as one structured array with :class:`DetailProp` field names as columns."""
+        if not self.detail_props:
+            return np.zeros(0, DetailProp.LAYOUT.dtype)
+        return self.detail_props.records
+
+    @property
+    def origins(self) -> np.ndarray:
+        return self.records["origin"].astype(np.float32)
+
+    @property
+    def angles(self) -> np.ndarray:
+        """Pitch, yaw, roll in degrees."""
+        return self.records["rotation"].astype(np.float32)
+
+    @property
+    def model_ids(self) -> np.ndarray:
+        """Index into :attr:`model_names` for models, into :attr:`sprites` for every other type."""
+        return self.records["model_id"].astype(np.int32)
+
+    @property
+    def types(self) -> np.ndarray:
+        """:class:`DetailPropType` of every detail prop."""
+        return self.records["type"].astype(np.int32)
+
+    @property
+    def scales(self) -> np.ndarray:
+        """Sprite scale, models are not scaled."""
+        return np.where(self.types == DetailPropType.MODEL, 1, self.records["scale"]).astype(np.float32)
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
         for _ in range(buffer.read_int32()):
             self.model_names.append(buffer.read_ascii_string(128))
         if self._glump_info.version == 4:
-            for _ in range(buffer.read_int32()):
-                self.sprites.append(DetailSprite.from_buffer(buffer, self._glump_info.version, bsp))
-            for _ in range(buffer.read_int32()):
-                self.detail_props.append(DetailProp.from_buffer(buffer, self._glump_info.version, bsp))
+            sprite_count = buffer.read_int32()
+            self.sprites = buffer.read_structure_array(buffer.tell(), sprite_count, DetailSprite)
+            detail_prop_count = buffer.read_int32()
+            self.detail_props = buffer.read_structure_array(buffer.tell(), detail_prop_count, DetailProp)
 
 
+@struct_layout(("upper_left", "2f"), ("lower_right", "2f"), ("upper_left_uv", "2f"), ("lower_right_uv", "2f"))
 @dataclass(slots=True)
 class DetailSprite:
     upper_left: Vector2[float]
@@ -30,12 +74,10 @@ class DetailSprite:
     upper_left_uv: Vector2[float]
     lower_right_uv: Vector2[float]
 
-    @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        return cls(buffer.read_fmt('2f'), buffer.read_fmt('2f'),
-                   buffer.read_fmt('2f'), buffer.read_fmt('2f'))
-
 
+@struct_layout(("origin", "3f"), ("rotation", "3f"), ("model_id", "H"), ("leaf_id", "H"), ("lighting", "4B"),
+               ("light_style", "I"), ("light_style_count", "B"), ("sway_amount", "B"), ("shape_angle", "B"),
+               ("shape_size", "B"), ("orientation", "B"), (None, "3x"), ("type", "B"), (None, "3x"), ("scale", "f"))
 @dataclass(slots=True)
 class DetailProp:
     origin: Vector3[float]
@@ -50,17 +92,4 @@ class DetailProp:
     shape_size: int
     orientation: int
     type: int
-    scale: int
-
-    @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        origin = buffer.read_fmt('3f')
-        rotation = buffer.read_fmt('3f')
-        model_id, leaf_id = buffer.read_fmt('2H')
-        lighting = buffer.read_fmt('4B')
-        (light_style, light_style_count,
-         sway_amount, shape_angle,
-         shape_size, orientation,
-         detail_type, scale) = buffer.read_fmt('I4BB3xB3xf')
-        return cls(origin, rotation, model_id, leaf_id, lighting, light_style, light_style_count, sway_amount,
-                   shape_angle, shape_size, orientation, detail_type, scale)
+    scale: float
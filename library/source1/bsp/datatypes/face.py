@@ -7,11 +7,26 @@ from enum import IntEnum
 from SourceIO.library.shared.types import Vector2, Vector3
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile, IBSPFile
 from SourceIO.library.utils.file_utils import Buffer
+from SourceIO.library.utils.struct_layout import struct_layout
 
 if typing.TYPE_CHECKING:
     from SourceIO.library.source1.bsp.lumps import TextureInfoLump, DispInfoLump
 
 
+_FACE_FIELDS = (("plane_index", "H"), ("side", "B"), ("on_node", "B"), ("first_edge", "I"), ("edge_count", "h"),
+                ("tex_info_id", "h"), ("disp_info_id", "h"), ("surface_fog_volume_id", "h"), ("styles", "4b"),
+                ("light_offset", "i"), ("area", "f"), ("lightmap_texture_mins_in_luxels", "2i"),
+                ("lightmap_width", "i"), ("lightmap_height", "i"), ("orig_face", "i"), ("prim_count", "H"),
+                ("first_prim_id", "H"), ("smoothing_groups", "i"))
+# In version 2 records the lowest bit of prim_count is a flag, Face instances hold the shifted count.
+_FACE_V2_FIELDS = (("plane_index", "I"), ("side", "H"), ("on_node", "H"), ("first_edge", "I"), ("edge_count", "I"),
+                   ("tex_info_id", "I"), ("disp_info_id", "i"), ("surface_fog_volume_id", "I"), ("styles", "4B"),
+                   ("light_offset", "i"), ("area", "f"), ("lightmap_texture_mins_in_luxels", "2i"),
+                   ("lightmap_width", "i"), ("lightmap_height", "i"), ("orig_face", "i"), ("prim_count", "I"),
+                   ("first_prim_id", "I"), ("smoothing_groups", "I"))
+
+
+@struct_layout(*_FACE_FIELDS)
 @dataclass(slots=True)
 class Face:
     plane_index: int
@@ -33,34 +48,18 @@ class Face:
     first_prim_id: int
     smoothing_groups: int
 
+    @classmethod
+    def record_class(cls, version: int) -> type[Face]:
+        return FaceV2 if version == 2 else Face
+
     @classmethod
     def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        if version == 2:
-            plane_index = buffer.read_uint32()
-            side, on_node = buffer.read_fmt("2H")
-            first_edge = buffer.read_uint32()
-            edge_count = buffer.read_uint32()
-            tex_info_id = buffer.read_uint32()
-            disp_info_id = buffer.read_int32()
-            surface_fog_volume_id = buffer.read_uint32()
-            styles = buffer.read_fmt("4B")
-            light_offset = buffer.read_int32()
-            area = buffer.read_float()
-            lightmap_texture_mins_in_luxels = buffer.read_fmt("2i")
-            lightmap_width, lightmap_height = buffer.read_fmt("2i")
-            orig_face, prim_count, first_prim_id, smoothing_groups = buffer.read_fmt("i3I")
-            prim_count = (prim_count >> 1) & 0x7FFFFFFF
-        else:
-            (plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
-             *styles,
-             light_offset, area) = buffer.read_fmt("H2BI4h4bif")
-            lightmap_texture_mins_in_luxels = buffer.read_fmt("2i")
-            lightmap_width, lightmap_height = buffer.read_fmt("2i")
-            orig_face, prim_count, first_prim_id, smoothing_groups = buffer.read_fmt("i2Hi")
-        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
-                   surface_fog_volume_id, styles, light_offset, area,
-                   lightmap_texture_mins_in_luxels, lightmap_width, lightmap_height,
-                   orig_face, prim_count, first_prim_id, smoothing_groups)
+        face_class = cls.record_class(version)
+        return face_class.from_values(face_class.LAYOUT.read_from(buffer))
+
+    @classmethod
+    def from_values(cls, values: tuple):
+        return cls(*values)
 
     # def get_tex_info(self, bsp: BSPFile):
     #     tex_info_lump: TextureInfoLump = bsp.get_lump('LUMP_TEXINFO')
@@ -75,6 +74,16 @@ class Face:
     #     return None
 
 
+@struct_layout(*_FACE_V2_FIELDS)
+class FaceV2(Face):
+    @classmethod
+    def from_values(cls, values: tuple):
+        *values, prim_count, first_prim_id, smoothing_groups = values
+        return cls(*values, (prim_count >> 1) & 0x7FFFFFFF, first_prim_id, smoothing_groups)
+
+
+@struct_layout((None, "32x"), *_FACE_FIELDS[:8], ("styles", "8b"), ("day_styles", "8b"), ("night_styles", "8b"),
+               *_FACE_FIELDS[9:15], ("smoothing_groups", "I"))
 @dataclass(slots=True)
 class VampireFace(Face):
     # struct dface_bsp17_t
@@ -100,20 +109,14 @@ class VampireFace(Face):
     #  };
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: 'VBSPFile'):
-        buffer.skip(4 * 8)
-        (plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
-         surface_fog_volume_id) = buffer.read_fmt("H2BI4h")
-        styles = buffer.read_fmt("8b")
-        day_styles = buffer.read_fmt("8b")
-        night_styles = buffer.read_fmt("8b")
-        light_offset, area = buffer.read_fmt("if")
-        lightmap_texture_mins_in_luxels = buffer.read_fmt("2i")
-        lm_width, lm_height = buffer.read_fmt("2i")
-        orig_face, smoothing_groups = buffer.read_fmt("iI")
-        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
-                   surface_fog_volume_id, styles, light_offset, area,
-                   lightmap_texture_mins_in_luxels, lm_width, lm_height,
+    def record_class(cls, version: int) -> type[Face]:
+        return cls
+
+    @classmethod
+    def from_values(cls, values: tuple):
+        (*values, styles, day_styles, night_styles, light_offset, area, lightmap_texture_mins_in_luxels,
+         lm_width, lm_height, orig_face, smoothing_groups) = values
+        return cls(*values, styles, light_offset, area, lightmap_texture_mins_in_luxels, lm_width, lm_height,
                    orig_face, 0, 0, smoothing_groups)
 
     def get_tex_info(self, bsp: 'VBSPFile'):
@@ -129,35 +132,33 @@ class VampireFace(Face):
         return None
 
 
+_VFACE_FIELDS = (("plane_index", "I"), ("side", "B"), ("on_node", "B"), ("unk", "H"), ("first_edge", "I"),
+                 ("edge_count", "I"), ("tex_info_id", "I"), ("disp_info_id", "I"), ("surface_fog_volume_id", "I"),
+                 ("styles", "4b"))
+_VFACE_TAIL_FIELDS = (("light_offset", "i"), ("area", "f"), ("lightmap_texture_mins_in_luxels", "2i"),
+                      ("lightmap_width", "i"), ("lightmap_height", "i"), ("orig_face", "I"), ("prim_count", "I"),
+                      ("first_prim_id", "I"), ("smoothing_groups", "I"))
+
+
+@struct_layout(*_VFACE_FIELDS, *_VFACE_TAIL_FIELDS)
 class VFace1(Face):
     @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        (plane_index, side, on_node, unk, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
-         *styles,
-         light_offset, area) = buffer.read_fmt("I2BH5I4bif")
-        lightmap_texture_mins_in_luxels = buffer.read_fmt("2i")
-        lm_width, lm_height = buffer.read_fmt("2i")
-        orig_face, prim_count, first_prim_id, smoothing_groups = buffer.read_fmt("4I")
-        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
-                   surface_fog_volume_id, styles, light_offset, area,
-                   lightmap_texture_mins_in_luxels, lm_width, lm_height,
-                   orig_face, prim_count, first_prim_id, smoothing_groups)
+    def record_class(cls, version: int) -> type[Face]:
+        return cls
 
+    @classmethod
+    def from_values(cls, values: tuple):
+        plane_index, side, on_node, _, *values = values
+        return cls(plane_index, side, on_node, *values)
 
+
+@struct_layout(*_VFACE_FIELDS, ("unk2", "i"), *_VFACE_TAIL_FIELDS)
 class VFace2(VFace1):
     @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        (plane_index, side, on_node, unk, first_edge, edge_count, tex_info_id, disp_info_id, surface_fog_volume_id,
-         *styles,
-         light_offset, area) = buffer.read_fmt("I2BH5I4b2if")
-        lightmap_texture_mins_in_luxels = buffer.read_fmt("2i")
-        lm_width, lm_height = buffer.read_fmt("2i")
-        orig_face, prim_count, first_prim_id, smoothing_groups = buffer.read_fmt("4I")
-
-        return cls(plane_index, side, on_node, first_edge, edge_count, tex_info_id, disp_info_id,
-                   surface_fog_volume_id, styles, light_offset, area,
-                   lightmap_texture_mins_in_luxels, lm_width, lm_height,
-                   orig_face, prim_count, first_prim_id, smoothing_groups)
+    def from_values(cls, values: tuple):
+        plane_index, side, on_node, _, *values = values
+        del values[6]
+        return cls(plane_index, side, on_node, *values)
 
 
 class SurfaceType(IntEnum):
@@ -169,6 +170,10 @@ class SurfaceType(IntEnum):
     FOLIAGE = 5
 
 
+@struct_layout(("texture_id", "i"), ("effect_id", "i"), ("surface_type", "i"), ("vertex_offset", "i"),
+               ("vertex_count", "i"), ("index_offset", "i"), ("indices_count", "i"), ("lightmap_id", "i"),
+               ("lightmap_start", "2i"), ("lightmap_size", "2i"), ("lightmap_origin", "3f"), ("lightmap_vec_s", "3f"),
+               ("lightmap_vec_t", "3f"), ("normal", "3f"), ("size", "2i"))
 @dataclass(slots=True)
 class Quake3Face:
     texture_id: int
@@ -190,24 +195,17 @@ class Quake3Face:
     size: Vector2[int]
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: IBSPFile):
-        texture_id, effect_id, type_ = buffer.read_fmt('3i')
-        vertex_offset, vertex_count = buffer.read_fmt('2i')
-        mesh_vert_offset, mesh_vert_count = buffer.read_fmt('2i')
-        lightmap_id = buffer.read_int32()
-        lightmap_start = buffer.read_fmt('2i')
-        lightmap_size = buffer.read_fmt('2i')
-        lightmap_origin = buffer.read_fmt('3f')
-        lightmap_vecs = buffer.read_fmt('3f'), buffer.read_fmt('3f')
-        normal = buffer.read_fmt('3f')
-        size = buffer.read_fmt('2i')
-        return cls(texture_id, effect_id, type_,
-                   vertex_offset, vertex_count,
-                   mesh_vert_offset, mesh_vert_count,
-                   lightmap_id, lightmap_start, lightmap_size,
-                   lightmap_origin, lightmap_vecs, normal, size)
+    def from_values(cls, values: tuple):
+        *values, lightmap_vec_s, lightmap_vec_t, normal, size = values
+        return cls(*values, (lightmap_vec_s, lightmap_vec_t), normal, size)
 
 
+@struct_layout(("texture_id", "I"), ("effect_id", "I"), ("surface_type", "I"), ("vertex_offset", "I"),
+               ("vertex_count", "I"), ("index_offset", "I"), ("indices_count", "I"), ("lightmap_styles", "4b"),
+               ("vertex_styles", "4b"), ("lightmap_count", "4i"), ("lightmap_x", "4I"), ("lightmap_y", "4I"),
+               ("lightmap_width", "I"), ("lightmap_height", "I"), ("lightmap_origin", "3f"),
+               ("lightmap_vec_s", "3f"), ("lightmap_vec_t", "3f"), ("lightmap_vec_n", "3f"),
+               ("patch_width", "I"), ("patch_height", "I"))
 @dataclass(slots=True)
 class RavenFace:
     texture_id: int
@@ -234,24 +232,8 @@ class RavenFace:
     size: Vector2[int]  # ydnar: num foliage instances, num foliage mesh verts
 
     @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        (texture_id, fog_id, surface_type,
-         vertex_offset, vertex_count,
-         index_offset, indices_count) = buffer.read_fmt('7I')
-        lightmap_styles = buffer.read_fmt("4b")
-        vertex_styles = buffer.read_fmt("4b")
-        lightmap_count = buffer.read_fmt("4i")
-        lightmap_x = buffer.read_fmt("4I")
-        lightmap_y = buffer.read_fmt("4I")
-        lightmap_width, lightmap_height = buffer.read_fmt("2I")
-        lightmap_origin = buffer.read_fmt("3f")
-        lightmap_vecs = buffer.read_fmt("3f"), buffer.read_fmt("3f"), buffer.read_fmt("3f")
-        patch_width, patch_height = buffer.read_fmt("2I")
-        return cls(texture_id, fog_id, SurfaceType(surface_type),
-                   vertex_offset, vertex_count,
-                   index_offset, indices_count,
-                   lightmap_styles, vertex_styles,
-                   lightmap_count, lightmap_x, lightmap_y,
-                   lightmap_width, lightmap_height,
-                   lightmap_origin, lightmap_vecs,
-                   (patch_width, patch_height))
+    def from_values(cls, values: tuple):
+        (texture_id, fog_id, surface_type, *values,
+         lightmap_vec_s, lightmap_vec_t, lightmap_vec_n, patch_width, patch_height) = values
+        return cls(texture_id, fog_id, SurfaceType(surface_type), *values,
+                   (lightmap_vec_s, lightmap_vec_t, lightmap_vec_n), (patch_width, patch_height))
@@ -1,8 +1,14 @@
 from dataclasses import dataclass
 
 from SourceIO.library.shared.types import Vector3
-from SourceIO.library.source1.bsp.bsp_file import VBSPFile
-from SourceIO.library.utils.file_utils import Buffer
+from SourceIO.library.utils.struct_layout import StructLayout, struct_layout
+
+NODE_LAYOUTS = {
+    0: StructLayout((("plane_index", "i"), ("childes_id", "2i"), ("min", "3h"), ("max", "3h"),
+                     ("first_face", "H"), ("face_count", "H"), ("area", "h"), (None, "2x"))),
+    1: StructLayout((("plane_index", "i"), ("childes_id", "2i"), ("min", "3f"), ("max", "3f"),
+                     ("first_face", "I"), ("face_count", "I"), ("area", "h"))),
+}
 
 
 @dataclass(slots=True)
@@ -15,29 +21,12 @@ class Node:
     face_count: int
     area: int
 
-    @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        plane_index = buffer.read_int32()
-        childes_id = buffer.read_fmt('2i')
-        if version == 1:
-            b_min = buffer.read_fmt('3f')
-            b_max = buffer.read_fmt('3f')
-            first_face, face_count, area = buffer.read_fmt('2Ih')
-        else:
-            b_min = buffer.read_fmt('3h')
-            b_max = buffer.read_fmt('3h')
-            first_face, face_count, area = buffer.read_fmt('3hxx')
-
-        return cls(plane_index, childes_id, b_min, b_max, first_face, face_count, area)
+    @staticmethod
+    def layout(version: int) -> StructLayout:
+        return NODE_LAYOUTS[1 if version == 1 else 0]
 
 
+@struct_layout(("plane_index", "i"), ("childes_id", "2i"), ("min", "3i"), ("max", "3i"),
+               ("first_face", "i"), ("face_count", "i"), ("area", "i"))
 class VNode(Node):
-    @classmethod
-    def from_buffer(cls, buffer: Buffer, version: int, bsp: VBSPFile):
-        plane_index = buffer.read_int32()
-        childes_id = buffer.read_fmt('2i')
-        b_min = buffer.read_fmt('3i')
-        b_max = buffer.read_fmt('3i')
-        first_face, face_count, area = buffer.read_fmt('3i')
-
-        return cls(plane_index, childes_id, b_min, b_max, first_face, face_count, area)
+    pass
@@ -1,9 +1,13 @@
 from enum import IntFlag
+from typing import Optional
+
+import numpy as np
 
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile
 from SourceIO.library.source1.bsp.datatypes.game_lump_header import GameLumpHeader
 from SourceIO.library.utils.file_utils import Buffer
+from SourceIO.library.utils.struct_layout import StructLayout
 from SourceIO.logger import SourceLogMan
 
 log_manager = SourceLogMan()
@@ -23,6 +27,78 @@ class StaticPropFlag(IntFlag):
     NO_PER_TEXEL_LIGHTING = 0x100
 
 
+def _base_fields(flags_field: tuple[str, str] = ("flags", "B")) -> list[tuple[Optional[str], str]]:
+    return [("origin", "3f"), ("rotation", "3f"), ("prop_type", "H"), ("first_leaf", "H"), ("leaf_count", "H"),
+            ("solid", "B"), flags_field, ("skin", "i"), ("fade_min_dist", "f"), ("fade_max_dist", "f"),
+            ("lighting_origin", "3f")]
+
+
+_V5 = _base_fields() + [("forced_fade_scale", "f")]
+_V6 = _V5 + [("min_dx_level", "H"), ("max_dx_level", "H")]
+_V8 = _V5 + [("min_cpu_level", "B"), ("max_cpu_level", "B"), ("min_gpu_level", "B"), ("max_gpu_level", "B"),
+             ("diffuse_modulation", "4B")]
+_V9 = _V8 + [("disable_x360", "I")]
+# From v10 on the flags are an uint32 after the DX levels, the old byte flags are unused
+_V10 = _base_fields(("legacy_flags", "B")) + [("forced_fade_scale", "f"), ("min_dx_level", "H"),
+                                               ("max_dx_level", "H"), ("flags", "I"), ("lightmap_resolution", "2H")]
+_V10_CSGO = _V9 + [(None, "4x")]
+_V11_LITE = _V10 + [("diffuse_modulation", "4B")]
+_V11_CSGO = _V10_CSGO + [("uniform_scale", "f")]
+
+STATIC_PROP_LAYOUTS: dict[str, StructLayout] = {
+    "v4": StructLayout(_base_fields()),
+    "v5": StructLayout(_V5),
+    "v6": StructLayout(_V6),
+    "v6_dm": StructLayout(_V6 + [(None, "72x")]),
+    "v7_l4d": StructLayout(_V6 + [("diffuse_modulation", "4B")]),
+    "v8": StructLayout(_V8),
+    "v9": StructLayout(_V9),
+    "v10": StructLayout(_V10),
+    "v10_csgo": StructLayout(_V10_CSGO),
+    "v11_lite": StructLayout(_V11_LITE),
+    "v11": StructLayout(_V11_LITE + [("flags_ex", "i")]),
+    "v11_csgo": StructLayout(_V11_CSGO),
+    "v12": StructLayout([("origin", "3f"), ("rotation", "3f"), ("prop_type", "h"), (None, "6x"), ("skin", "i"),
+                         (None, "48x")]),
+    "v13_strata": StructLayout(_V11_CSGO + [("uniform_scale_yz", "2f")]),
+}
+
+
+def static_prop_layout(version: int, bsp_version: tuple[int, int], size: int, app_id: int) -> Optional[StructLayout]:
+    """Record layout of a ``sprp`` version, None for unsupported versions."""
+    if bsp_version == (20, 4):
+        return STATIC_PROP_LAYOUTS["v6_dm"]
+
+    if version == 7 and app_id == SteamAppId.LEFT_4_DEAD and size == 68:
+        # Old Left 4 Dead maps use v7 and incompatible with newer v7 from Source 2013
+        return STATIC_PROP_LAYOUTS["v7_l4d"]
+
+    if version == 7 and app_id == SteamAppId.TEAM_FORTRESS_2 and size == 72:
+        # Old Team Fortress 2 maps use v7 which became v10 in Source 2013
+        return STATIC_PROP_LAYOUTS["v10"]
+
+    if app_id == SteamAppId.COUNTER_STRIKE_GO and version in (10, 11):
+        # Some Counter-Strike: GO use v10 which is not compatible with Source 2013, now use v11
+        return STATIC_PROP_LAYOUTS["v10_csgo" if version == 10 else "v11_csgo"]
+
+    if app_id == SteamAppId.BLACK_MESA and version in (10, 11):
+        # Black Mesa uses different structures
+        if version == 10 and size == 72:
+            return STATIC_PROP_LAYOUTS["v10"]
+        elif version == 11 and size == 76:
+            return STATIC_PROP_LAYOUTS["v11_lite"]
+
+    if version == 6 and app_id == SteamAppId.VINDICTUS:
+        return STATIC_PROP_LAYOUTS["v5"]
+    if version == 7 and app_id == SteamAppId.VINDICTUS:
+        return STATIC_PROP_LAYOUTS["v6"]
+
+    name = {4: "v4", 5: "v5", 6: "v6", 8: "v8", 9: "v9", 10: "v10", 11: "v11", 12: "v12", 13: "v13_strata"}.get(version)
+    if name is None:
+        return None
+    return STATIC_PROP_LAYOUTS[name]
+
+
 class StaticProp:
 
     def __init__(self):
@@ -72,202 +148,73 @@ class StaticProp:
                f'flags_ex: {self.flags_ex}, uniform_scale: {self.uniform_scale}, uniform_scale_yz: {self.uniform_scale_yz}, ' \
                f'unk_vector: {self.unk_vector}, scaling: {self.scaling}>'
 
-    def parse(self, reader: Buffer, version: int, bsp_version: tuple[int, int], size: int, app_id: int):
-        if bsp_version == (20, 4):
-            self._parse_v6(reader)
-            reader.skip(72)
-            return
-
-        if app_id == SteamAppId.LEFT_4_DEAD and version == 7 and size == 68:
-            # Old Left 4 Dead maps use v7 and incompatible with newer v7 from Source 2013
-            self._parse_v7_l4d(reader)
-            return
-
-        if app_id == SteamAppId.TEAM_FORTRESS_2 and version == 7 and size == 72:
-            # Old Team Fortress 2 maps use v7 which became v10 in Source 2013
-            self._parse_v10(reader)
-            return
-
-        if app_id == SteamAppId.COUNTER_STRIKE_GO and version in (10, 11):
-            # Some Counter-Strike: GO use v10 which is not compatible with Source 2013, now use v11
-            if version == 10:
-                self._parse_v10_csgo(reader)
-            else:
-                self._parse_v11_csgo(reader)
-            return
-
-        if app_id == SteamAppId.BLACK_MESA and version in (10, 11):
-            # Black Mesa uses different structures
-            if version == 10 and size == 72:
-                self._parse_v10(reader)
-                return
-            elif version == 11:
-                if size == 76:
-                    self._parse_v11_lite(reader)
-                    return
-                elif size == 80:
-                    self._parse_v11(reader)
-                    return
-
-        if version == 4:
-            self._parse_v4(reader)
-            return
-
-        if version == 5:
-            self._parse_v5(reader)
-            return
-
-        if version == 6:
-            if app_id == SteamAppId.VINDICTUS:
-                self._parse_v6_vin(reader)
-                return
-            else:
-                self._parse_v6(reader)
-                return
-
-        if version == 7:
-            if app_id == SteamAppId.VINDICTUS:
-                self._parse_v7_vin(reader)
-                return
-
-            if app_id == SteamAppId.LEFT_4_DEAD and size == 68:
-                # Old Left 4 Dead maps use v7 and incompatible with newer v7 from Source 2013
-                self._parse_v7_l4d(reader)
-                return
-
-            if app_id == SteamAppId.TEAM_FORTRESS_2 and size == 72:
-                # Old Team Fortress 2 maps use v7 which became v10 in Source 2013
-                self._parse_v10(reader)
-                return
-
-        if version == 8:
-            self._parse_v8(reader)
-            return
-
-        if version == 9:
-            self._parse_v9(reader)
-            return
-
-        if version == 10:
-            if app_id == SteamAppId.COUNTER_STRIKE_GO:
-                self._parse_v10_csgo(reader)
-                return
-
-            self._parse_v10(reader)
-            return
-
-        if version == 11:
-            if app_id == SteamAppId.COUNTER_STRIKE_GO:
-                self._parse_v11_csgo(reader)
-                return
-
-            if app_id == SteamAppId.BLACK_MESA:
-                if size == 76:
-                    self._parse_v11_lite(reader)
-                    return
-                elif size == 80:
-                    self._parse_v11(reader)
-                    return
-
-            self._parse_v11(reader)
-            return
-
-        if version == 12:
-            self._parse_v12(reader)
-            return
-        if version == 13:
-            self._parse_v13_strata(reader)
-            return
-
-        logger.error(f'Cannot find handler for static prop of version {version} (size: {size}, app_id: {app_id})')
-        reader.skip(size)
-
-    def _parse_v4(self, reader: Buffer):
-        self.origin = reader.read_fmt('3f')
-        self.rotation = reader.read_fmt('3f')
-        self.prop_type, self.first_leaf, self.leaf_count = reader.read_fmt('3H')
-        self.solid, self.flags = reader.read_fmt('2B')
-        self.skin = reader.read_int32()
-        self.fade_min_dist, self.fade_max_dist = reader.read_fmt('2f')
-        self.lighting_origin = reader.read_fmt('3f')
-
-    def _parse_v5(self, reader: Buffer):
-        self._parse_v4(reader)
-        self.forced_fade_scale = reader.read_float()
-
-    def _parse_v6_vin(self, reader: Buffer):
-        self._parse_v5(reader)
-
-    def _parse_v6(self, reader: Buffer):
-        self._parse_v5(reader)
-        self.min_dx_level, self.max_dx_level = reader.read_fmt('2H')
-
-    def _parse_v7_l4d(self, reader: Buffer):
-        self._parse_v6(reader)
-        self.diffuse_modulation = reader.read_fmt('4B')
-
-    def _parse_v7_vin(self, reader: Buffer):
-        self._parse_v6(reader)
-
-    def _parse_v8(self, reader: Buffer):
-        self._parse_v5(reader)
-        self.min_cpu_level, self.max_cpu_level, self.min_gpu_level, self.max_gpu_level = reader.read_fmt('4B')
-        self.diffuse_modulation = reader.read_fmt('4B')
-
-    def _parse_v9(self, reader: Buffer):
-        self._parse_v8(reader)
-        self.disable_x360 = reader.read_fmt('I')
-
-    def _parse_v10(self, reader: Buffer):
-        self._parse_v6(reader)
-        self.flags = StaticPropFlag(reader.read_uint32())
-        self.lightmap_resolution = reader.read_fmt('2H')
-
-    def _parse_v10_csgo(self, reader: Buffer):
-        self._parse_v9(reader)
-        reader.skip(4)
-
-    def _parse_v11_lite(self, reader: Buffer):
-        self._parse_v10(reader)
-        self.diffuse_modulation = reader.read_fmt('4B')
-
-    def _parse_v11(self, reader: Buffer):
-        self._parse_v11_lite(reader)
-        self.flags_ex = reader.read_int32()
-
-    def _parse_v11_csgo(self, reader: Buffer):
-        self._parse_v10_csgo(reader)
-        self.uniform_scale = reader.read_float()
-
-    def _parse_v12(self, reader: Buffer):
-        self.origin = reader.read_fmt('3f')
-        self.rotation = reader.read_fmt('3f')
-        self.prop_type = reader.read_int16()
-        reader.skip(4 + 2)
-        self.skin = reader.read_int32()
-        reader.skip(12 * 4)
-
-    def _parse_v13_strata(self, reader: Buffer):
-        self._parse_v11_csgo(reader)
-        self.uniform_scale_yz = reader.read_fmt("2f")
+    @classmethod
+    def from_record(cls, record: np.void, scaling: np.ndarray):
+        """Build a prop from one row of :attr:`StaticPropLump.records`."""
+        prop = cls()
+        for name in record.dtype.names:
+            if name.startswith("_") or name == "legacy_flags":
+                continue
+            value = record[name]
+            setattr(prop, name, tuple(value.tolist()) if value.ndim else value.item())
+        prop.flags = StaticPropFlag(prop.flags)
+        prop.scaling = scaling.tolist()
+        return prop
 
 
 class StaticPropLump:
     def __init__(self, glump_info):
         self._glump_info: GameLumpHeader = glump_info
         self.model_names: list[str] = []
-        self.leafs: list[int] = []
-        self.static_props: list[StaticProp] = []
+        self.leafs: np.ndarray = np.zeros(0, np.uint32)
+        self.records: np.ndarray = np.zeros(0, STATIC_PROP_LAYOUTS["v4"].dtype)
+        self.scaling: np.ndarray = np.ones((0, 3), np.float32)
+        self._static_props: Optional[list[StaticProp]] = None
+
+    @property
+    def static_props(self) -> list[StaticProp]:
+        if self._static_props is None:
+            self._static_props = [StaticProp.from_record(record, scaling)
+                                  for record, scaling in zip(self.records, self.scaling)]
+        return self._static_props
+
+    def _column(self, name: str, default, dtype, shape: tuple[int, ...] = ()) -> np.ndarray:
+        if name in self.records.dtype.names:
+            return self.records[name].astype(dtype)
+        return np.full((len(self.records), *shape), default, dtype)
+
+    @property
+    def origins(self) -> np.ndarray:
+        return self._column("origin", 0, np.float32, (3,))
+
+    @property
+    def angles(self) -> np.ndarray:
+        """Pitch, yaw, roll in degrees."""
+        return self._column("rotation", 0, np.float32, (3,))
+
+    @property
+    def prop_types(self) -> np.ndarray:
+        """Index of every prop's model in :attr:`model_names`."""
+        return self._column("prop_type", 0, np.int32)
+
+    @property
+    def skins(self) -> np.ndarray:
+        return self._column("skin", 0, np.int32)
+
+    @property
+    def flags(self) -> np.ndarray:
+        return self._column("flags", 0, np.uint32)
+
+    @property
+    def uniform_scales(self) -> np.ndarray:
+        """Per prop scale, 1 for versions without one."""
+        return self._column("uniform_scale", 1, np.float32)
 
     def parse(self, reader: Buffer, bsp: VBSPFile):
         for _ in range(reader.read_int32()):
             self.model_names.append(reader.read_ascii_string(128))
-        if self._glump_info.version < 13:
-            for _ in range(reader.read_int32()):
-                self.leafs.append(reader.read_uint16())
-        else:
-            for _ in range(reader.read_int32()):
-                self.leafs.append(reader.read_uint32())
+        leaf_layout = _LEAF_LAYOUT if self._glump_info.version < 13 else _LEAF_LAYOUT_V13
+        self.leafs = reader.read_record_array(reader.read_int32(), leaf_layout)["leaf"].astype(np.uint32)
         if self._glump_info.version == 12:
             unk1 = reader.read_int32()
             unk2 = reader.read_int32()
@@ -281,10 +228,19 @@ class StaticPropLump:
         if prop_count == 0:
             return
         prop_size = reader.remaining() // prop_count
-        for i in range(prop_count):
-            prop = StaticProp()
-            prop.parse(reader, self._glump_info.version, bsp.info.version, prop_size, bsp.info.steam_app_id)
-            self.static_props.append(prop)
-        if prop_scaling:
-            for prop_id, scale in prop_scaling.items():
-                self.static_props[prop_id].scaling[:] = scale
+        version = self._glump_info.version
+        app_id = bsp.info.steam_app_id
+        layout = static_prop_layout(version, bsp.info.version, prop_size, app_id)
+        if layout is None:
+            logger.error(f'Cannot find handler for static prop of version {version} (size: {prop_size}, '
+                         f'app_id: {app_id})')
+            return
+        self.records = reader.read_record_array(prop_count, layout)
+        self.scaling = np.ones((prop_count, 3), np.float32)
+        for prop_id, scale in prop_scaling.items():
+            self.scaling[prop_id] = scale
+        self._static_props = None
+
+
+_LEAF_LAYOUT = StructLayout([("leaf", "H")])
+_LEAF_LAYOUT_V13 = StructLayout([("leaf", "I")])
@@ -0,0 +1,46 @@
+from functools import lru_cache
+
+import numpy as np
+
+
+def align_displacement_corners(face_vertices: np.ndarray, start_positions: np.ndarray) -> np.ndarray:
+    """Rotate the 4 corners of every displacement face so that corner 0 is the displacement start position.
+
+    ``face_vertices`` is (N, 4, 3), ``start_positions`` is (N, 3). Faces without a corner close to their start
+    position fall back to the corner with the smallest coordinate sum relative to it.
+    """
+    close = np.all(np.isclose(face_vertices, start_positions[:, None, :], 0.5e-2), axis=2)
+    fallback = np.argmin(np.sum(face_vertices - start_positions[:, None, :], axis=2), axis=1)
+    first = np.where(close.any(axis=1), np.argmax(close, axis=1), fallback)
+    order = (first[:, None] + np.arange(4)[None, :]) & 3
+    return np.take_along_axis(face_vertices, order[:, :, None], axis=1)
+
+
+def displacement_grids(corners: np.ndarray, power: int) -> np.ndarray:
+    """Undisplaced vertex grids of displacements sharing one power, (N, vertex_count, 3) in row major order."""
+    num_edge_vertices = (1 << power) + 1
+    steps = np.linspace(0.0, 1.0, num_edge_vertices, dtype=np.float32)
+    left = corners[:, None, 0] + (corners[:, None, 1] - corners[:, None, 0]) * steps[None, :, None]
+    right = corners[:, None, 3] + (corners[:, None, 2] - corners[:, None, 3]) * steps[None, :, None]
+    grid = left[:, :, None] + (right - left)[:, :, None] * steps[None, None, :, None]
+    return grid.reshape((len(corners), num_edge_vertices * num_edge_vertices, 3))
+
+
+@lru_cache(maxsize=8)
+def displacement_triangles(power: int) -> np.ndarray:
+    """Triangle indices of one displacement grid, the split diagonal alternates like in the engine."""
+    num_edge_vertices = (1 << power) + 1
+    rows, columns = np.meshgrid(np.arange(num_edge_vertices - 1), np.arange(num_edge_vertices - 1), indexing="ij")
+    index = (rows * num_edge_vertices + columns).ravel().astype(np.uint32)
+    right = index + 1
+    below = index + num_edge_vertices
+    below_right = below + 1
+    odd = (index & 1).astype(bool)
+    first = np.where(odd[:, None], np.column_stack((index, right, below)), np.column_stack((index, below_right, below)))
+    second = np.where(odd[:, None], np.column_stack((right, below_right, below)),
+                      np.column_stack((index, right, below_right)))
+    triangles = np.empty((len(index) * 2, 3), np.uint32)
+    triangles[0::2] = first
+    triangles[1::2] = second
+    triangles.flags.writeable = False
+    return triangles
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.bsp_file import BSPFile
+from SourceIO.library.source1.bsp.lumps.lightmap_lump import tex_light_to_linear
+
+_SAMPLE_SIZE = 4  # ColorRGBExp32
+
+
+@dataclass(slots=True)
+class LightmapAtlas:
+    """Baked lighting of every face packed into float RGBA pages, ``page_size`` wide and as tall as they are filled.
+
+    Per face arrays are indexed by face id: ``page`` is -1 for faces without lighting, ``offsets`` is the
+    (x, y) luxel position of the face's block inside its page.
+    """
+    pages: list[np.ndarray]
+    page: np.ndarray
+    offsets: np.ndarray
+
+    def uvs(self, face_ids: np.ndarray, luxels: np.ndarray) -> np.ndarray:
+        """Page UVs of points given in face luxel space (``lightmap_vecs`` projection minus the luxel mins)."""
+        page = self.page[face_ids]
+        sizes = np.array([(p.shape[1], p.shape[0]) for p in self.pages] or [(1, 1)], np.float32)
+        uvs = (self.offsets[face_ids] + luxels + 0.5) / sizes[np.maximum(page, 0)]
+        uvs[page < 0] = 0
+        return uvs.astype(np.float32)
+
+
+def pack_shelves(sizes: np.ndarray, page_size: int, padding: int = 1) -> tuple[np.ndarray, np.ndarray, list[int]]:
+    """Shelf-pack (width, height) blocks into ``page_size`` x ``page_size`` pages, tallest first.
+
+    Returns the page index and (x, y) offset of every block plus the used height of every page, pages are
+    meant to be trimmed to it.
+    """
+    pages = np.zeros(len(sizes), np.int32)
+    offsets = np.zeros((len(sizes), 2), np.int32)
+    page_heights = []
+    page, x, shelf_y, shelf_height = 0, 0, 0, 0
+    for index in np.lexsort((-sizes[:, 0], -sizes[:, 1])).tolist():
+        width, height = sizes[index].tolist()
+        if x + width > page_size:
+            x, shelf_y, shelf_height = 0, shelf_y + shelf_height + padding, 0
+        if shelf_y + height > page_size:
+            page_heights.append(shelf_y - padding)
+            page, x, shelf_y, shelf_height = page + 1, 0, 0, 0
+        pages[index] = page
+        offsets[index] = x, shelf_y
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+    if len(sizes):
+        page_heights.append(shelf_y + shelf_height)
+    return pages, offsets, page_heights
+
+
+def decode_rgbe(samples: np.ndarray) -> np.ndarray:
+    """Linear RGB of ColorRGBExp32 lightmap samples."""
+    rgb = np.column_stack((samples['r'][:, 0], samples['g'][:, 0], samples['b'][:, 0])).astype(np.float32)
+    return tex_light_to_linear(rgb, samples['e'].astype(np.float32)).astype(np.float32)
+
+
+def build_lightmap_atlas(faces: np.ndarray, samples: np.ndarray, page_size: int = 2048) -> LightmapAtlas:
+    """Decode the default light style of every face and pack the luxel blocks into atlas pages.
+
+    ``faces`` is a face record array, ``samples`` the matching LUMP_LIGHTING or LUMP_LIGHTING_HDR samples.
+    """
+    widths = faces["lightmap_width"].astype(np.int64) + 1
+    heights = faces["lightmap_height"].astype(np.int64) + 1
+    starts = faces["light_offset"].astype(np.int64) // _SAMPLE_SIZE
+    lit = ((faces["light_offset"] >= 0) & (faces["styles"][:, 0].astype(np.uint8) != 255)
+           & (starts + widths * heights <= len(samples)))
+    lit_ids = np.flatnonzero(lit)
+
+    sizes = np.column_stack((widths[lit_ids], heights[lit_ids]))
+    page_size = max(page_size, int(sizes.max(initial=0)))
+    lit_pages, lit_offsets, page_heights = pack_shelves(sizes, page_size)
+
+    page = np.full(len(faces), -1, np.int32)
+    offsets = np.zeros((len(faces), 2), np.int32)
+    page[lit_ids] = lit_pages
+    offsets[lit_ids] = lit_offsets
+
+    # One gather over all luxels of all lit faces: sample index and destination pixel of each luxel
+    areas = sizes[:, 0] * sizes[:, 1]
+    block = np.repeat(np.arange(len(lit_ids)), areas)
+    local = np.arange(areas.sum()) - np.repeat(np.cumsum(areas) - areas, areas)
+    colors = decode_rgbe(samples[starts[lit_ids][block] + local])
+    xs = lit_offsets[block, 0] + local % sizes[block, 0]
+    ys = lit_offsets[block, 1] + local // sizes[block, 0]
+
+    pages = []
+    for page_id, used_height in enumerate(page_heights):
+        pixels = np.zeros((max(used_height, 1), page_size, 4), np.float32)
+        pixels[..., 3] = 1
+        mask = lit_pages[block] == page_id
+        pixels[ys[mask], xs[mask], :3] = colors[mask]
+        pages.append(pixels)
+    return LightmapAtlas(pages, page, offsets)
+
+
+def load_lightmap_atlas(bsp: BSPFile, page_size: int = 2048) -> Optional[LightmapAtlas]:
+    """Atlas of the map's LDR lighting, or its HDR lighting for HDR-only maps. None if it has neither."""
+    faces_lump = bsp.get_lump('LUMP_FACES')
+    if faces_lump is None or not hasattr(faces_lump, "records"):
+        return None
+    for lump_name in ('LUMP_LIGHTING', 'LUMP_LIGHTING_HDR'):
+        lighting_lump = bsp.get_lump(lump_name)
+        if lighting_lump is not None and len(lighting_lump.lightmap_data):
+            return build_lightmap_atlas(faces_lump.records, lighting_lump.lightmap_data, page_size)
+    return None
@@ -1,7 +1,9 @@
 from __future__ import annotations
 import lzma
+import threading
 import typing
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Optional, Type, Union
 
@@ -25,6 +27,10 @@ class LumpTag:
     steam_id: Optional[SteamAppId] = field(default=None)
 
 
+# Every registered (lump class, tag) pair by lump name, in registration order
+LUMP_TAGS: dict[str, list[tuple[Type['Lump'], LumpTag]]] = {}
+
+
 def lump_tag(lump_id, lump_name,
              lump_version: Optional[int] = None,
              bsp_ident: Optional[str] = None,
@@ -37,7 +43,9 @@ def lump_tag(lump_id, lump_name,
             bsp_version_ = (bsp_version, 0)
         else:
             bsp_version_ = bsp_version
-        klass.tags.append(LumpTag(lump_id, lump_name, lump_version, bsp_ident, bsp_version_, steam_id))
+        tag = LumpTag(lump_id, lump_name, lump_version, bsp_ident, bsp_version_, steam_id)
+        klass.tags.append(tag)
+        LUMP_TAGS.setdefault(lump_name, []).append((klass, tag))
         return klass
 
     return loader
@@ -91,6 +99,8 @@ class ValveLumpInfo(AbstractLump):
 
 class Lump(ABC):
     tags: list[LumpTag]
+    # Parse straight from a read-only mapping of the map file instead of a copy of the lump, when possible
+    map_in_place: bool = False
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -141,3 +151,53 @@ class Lump(ABC):
         decompressed_buffer = b"".join(chunks)[:decompressed_size]
         assert decompressed_size == len(decompressed_buffer), 'Decompressed data does not match the expected size'
         return MemoryBuffer(decompressed_buffer)
+
+
+class LumpDecompressor:
+    """Decodes compressed lumps on worker threads, lzma releases the GIL while it works.
+
+    Results wait under their key until :meth:`pop` hands them out. ``max_bytes`` caps the decompressed size of
+    everything submitted and not yet popped, :meth:`submit` refuses lumps past that so they get decoded lazily.
+    """
+
+    def __init__(self, workers: int, max_bytes: int):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.reserved_bytes = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: dict[typing.Hashable, tuple[Future, int]] = {}
+
+    def submit(self, key: typing.Hashable, buffer: Buffer, decompressed_size: int) -> bool:
+        with self._lock:
+            if self.workers <= 0 or self.reserved_bytes + decompressed_size > self.max_bytes:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="SourceIOLump")
+            self.reserved_bytes += decompressed_size
+            self._pending[key] = self._executor.submit(Lump.decompress_lump, buffer), decompressed_size
+            return True
+
+    def pop(self, key: typing.Hashable) -> Optional[Buffer]:
+        """Decompressed buffer of ``key``, waits if it is still being decoded. None if it was never submitted."""
+        with self._lock:
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return None
+            future, size = pending
+            self.reserved_bytes -= size
+            if not self._pending and self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        return future.result()
+
+    def close(self):
+        """Drop every result not popped yet and shut the workers down, lumps still queued are never decoded."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            executor, self._executor = self._executor, None
+            self.reserved_bytes = 0
+        for future, _ in pending.values():
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -1,122 +1,89 @@
+from typing import Sequence
+
+import numpy as np
+
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp import Lump, ValveLumpInfo, lump_tag
-from SourceIO.library.source1.bsp.bsp_file import VBSPFile, IBSPFile
+from SourceIO.library.source1.bsp.bsp_file import VBSPFile
 from SourceIO.library.source1.bsp.datatypes.face import Face, VFace1, VFace2, RavenFace, VampireFace, Quake3Face
 from SourceIO.library.utils import Buffer
 
-@lump_tag(7, 'LUMP_FACES')
-class FaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(Face.from_buffer(buffer, self.version, bsp))
-        return self
+class _FaceArrayLump(Lump):
+    """Face records parsed in one pass.
 
+    :attr:`faces` keeps the list-like interface and builds dataclasses on access, :attr:`records` is the
+    same data as a numpy structured array so importers can work on whole columns.
+    """
+    face_class = Face
 
-@lump_tag(27, 'LUMP_ORIGINALFACES')
-class OriginalFaceLump(Lump):
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
-        self.faces: list[Face] = []
+        self.faces: Sequence[Face] = []
+
+    def record_class(self):
+        return self.face_class
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(Face.from_buffer(buffer, self.version, bsp))
+        face_class = self.record_class()
+        count = buffer.remaining() // face_class.LAYOUT.size
+        self.faces = buffer.read_structure_array(buffer.tell(), count, face_class)
         return self
 
+    @property
+    def records(self) -> np.ndarray:
+        if not self.faces:
+            return np.empty(0, self.record_class().LAYOUT.dtype)
+        return self.faces.records
 
-@lump_tag(7, 'LUMP_FACES', bsp_version=17, steam_id=SteamAppId.VAMPIRE_THE_MASQUERADE_BLOODLINES)
-class VampFaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: 'VBSPFile'):
-        while buffer:
-            self.faces.append(VampireFace.from_buffer(buffer, self.version, bsp))
-        return self
+@lump_tag(7, 'LUMP_FACES')
+class FaceLump(_FaceArrayLump):
+    def record_class(self):
+        return Face.record_class(self.version)
 
 
-@lump_tag(27, 'LUMP_ORIGINALFACES', bsp_version=17, steam_id=SteamAppId.VAMPIRE_THE_MASQUERADE_BLOODLINES)
-class VampOriginalFaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+@lump_tag(27, 'LUMP_ORIGINALFACES')
+class OriginalFaceLump(_FaceArrayLump):
+    def record_class(self):
+        return Face.record_class(self.version)
 
-    def parse(self, buffer: Buffer, bsp: 'VBSPFile'):
-        while buffer:
-            self.faces.append(VampireFace.from_buffer(buffer, self.version, bsp))
-        return self
 
+@lump_tag(7, 'LUMP_FACES', bsp_version=17, steam_id=SteamAppId.VAMPIRE_THE_MASQUERADE_BLOODLINES)
+class VampFaceLump(_FaceArrayLump):
+    face_class = VampireFace
 
-@lump_tag(7, 'LUMP_FACES', 1, steam_id=SteamAppId.VINDICTUS)
-class VFaceLump1(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(VFace1.from_buffer(buffer, self.version, bsp))
-        return self
+@lump_tag(27, 'LUMP_ORIGINALFACES', bsp_version=17, steam_id=SteamAppId.VAMPIRE_THE_MASQUERADE_BLOODLINES)
+class VampOriginalFaceLump(_FaceArrayLump):
+    face_class = VampireFace
 
 
-@lump_tag(7, 'LUMP_FACES', 2, steam_id=SteamAppId.VINDICTUS)
-class VFaceLump2(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+@lump_tag(7, 'LUMP_FACES', 1, steam_id=SteamAppId.VINDICTUS)
+class VFaceLump1(_FaceArrayLump):
+    face_class = VFace1
 
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(VFace2.from_buffer(buffer, self.version, bsp))
-        return self
 
+@lump_tag(7, 'LUMP_FACES', 2, steam_id=SteamAppId.VINDICTUS)
+class VFaceLump2(_FaceArrayLump):
+    face_class = VFace2
 
-@lump_tag(27, 'LUMP_ORIGINALFACES', 1, steam_id=SteamAppId.VINDICTUS)
-class VOriginalFaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
 
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(VFace1.from_buffer(buffer, self.version, bsp))
-        return self
+@lump_tag(27, 'LUMP_ORIGINALFACES', 1, steam_id=SteamAppId.VINDICTUS)
+class VOriginalFaceLump(_FaceArrayLump):
+    face_class = VFace1
 
 
 @lump_tag(27, 'LUMP_ORIGINALFACES', 2, steam_id=SteamAppId.VINDICTUS)
-class VOriginalFaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Face] = []
+class VOriginalFaceLump(_FaceArrayLump):
+    face_class = VFace2
 
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(VFace2.from_buffer(buffer, self.version, bsp))
-        return self
 
 @lump_tag(13, 'LUMP_FACES', bsp_ident="IBSP", bsp_version=(46, 0))
-class Quake3FaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[Quake3Face] = []
+class Quake3FaceLump(_FaceArrayLump):
+    face_class = Quake3Face
 
-    def parse(self, buffer: Buffer, bsp: IBSPFile):
-        while buffer:
-            self.faces.append(Quake3Face.from_buffer(buffer, self.version, bsp))
-        return self
 
 @lump_tag(13, 'LUMP_FACES', bsp_ident="RBSP", bsp_version=(1, 0))
-class RavenFaceLump(Lump):
-    def __init__(self, lump_info: ValveLumpInfo):
-        super().__init__(lump_info)
-        self.faces: list[RavenFace] = []
-
-    def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            self.faces.append(RavenFace.from_buffer(buffer, self.version, bsp))
-        return self
+class RavenFaceLump(_FaceArrayLump):
+    face_class = RavenFace
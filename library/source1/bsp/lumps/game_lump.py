@@ -6,6 +6,36 @@ from SourceIO.library.source1.bsp.datatypes.game_lump_header import (GameLumpHea
                                                                      DMGameLumpHeader)
 from SourceIO.library.source1.bsp.datatypes.static_prop_lump import StaticPropLump
 from SourceIO.library.utils import Buffer
+from SourceIO.logger import SourceLogMan
+
+log_manager = SourceLogMan()
+logger = log_manager.get_logger('GameLump')
+
+
+def _game_lump_buffers(headers: list[GameLumpHeader], buffer: Buffer, lump_info: ValveLumpInfo, bsp: VBSPFile):
+    """Yield every game lump with its data, compressed game lumps are decoded in parallel in eager mode."""
+    slices = []
+    for index, lump in enumerate(headers):
+        relative_offset = lump.offset - lump_info.offset
+        logger.debug(f'GLump "{lump.id}" offset: {relative_offset} size: {lump.size}')
+        with buffer.save_current_offset():
+            buffer.seek(relative_offset)
+            if lump.flags == 1:
+                if index + 1 != len(headers):
+                    next_offset = headers[index + 1].offset - lump_info.offset
+                else:
+                    next_offset = lump_info.size
+                compressed = buffer.slice(size=next_offset - relative_offset)
+                if bsp.decompressor is not None:
+                    bsp.decompressor.submit(("game", index), compressed, lump.size)
+                slices.append((lump, compressed, True))
+            else:
+                slices.append((lump, buffer.slice(size=lump.size), False))
+    for index, (lump, game_lump_buffer, compressed) in enumerate(slices):
+        if compressed:
+            decompressed = bsp.pop_decompressed(("game", index))
+            game_lump_buffer = Lump.decompress_lump(game_lump_buffer) if decompressed is None else decompressed
+        yield lump, game_lump_buffer
 
 
 @lump_tag(35, 'LUMP_GAME_LUMP')
@@ -23,23 +53,7 @@ class GameLump(Lump):
             if not lump.id:
                 continue
             self.game_lumps_info.append(lump)
-        for lump in self.game_lumps_info:
-            relative_offset = lump.offset - self._info.offset
-            print(f'GLump "{lump.id}" offset: {relative_offset} size: {lump.size} ')
-            with buffer.save_current_offset():
-                buffer.seek(relative_offset)
-                if lump.flags == 1:
-                    curr_index = self.game_lumps_info.index(lump)
-                    if curr_index + 1 != len(self.game_lumps_info):
-                        next_offset = self.game_lumps_info[curr_index + 1].offset - self._info.offset
-                    else:
-                        next_offset = self._info.size
-                    compressed_size = next_offset - relative_offset
-                    game_lump_buffer = Lump.decompress_lump(buffer.slice(size=compressed_size))
-                else:
-                    game_lump_buffer = buffer.slice(size=lump.size)
-
-                pass  # TODO
+        for lump, game_lump_buffer in _game_lump_buffers(self.game_lumps_info, buffer, self._info, bsp):
             if lump.id == 'sprp':
                 game_lump = StaticPropLump(lump)
                 game_lump.parse(game_lump_buffer, bsp)
@@ -72,23 +86,7 @@ class GameLump204(Lump):
             if not lump.id:
                 continue
             self.game_lumps_info.append(lump)
-        for lump in self.game_lumps_info:
-            relative_offset = lump.offset - self._info.offset
-            print(f'GLump "{lump.id}" offset: {relative_offset} size: {lump.size} ')
-            with buffer.save_current_offset():
-                buffer.seek(relative_offset)
-                if lump.flags == 1:
-                    curr_index = self.game_lumps_info.index(lump)
-                    if curr_index + 1 != len(self.game_lumps_info):
-                        next_offset = self.game_lumps_info[curr_index + 1].offset - self._info.offset
-                    else:
-                        next_offset = self._info.size
-                    compressed_size = next_offset - relative_offset
-                    game_lump_buffer = Lump.decompress_lump(buffer.slice(size=compressed_size))
-                else:
-                    game_lump_buffer = buffer.slice(size=lump.size)
-
-                pass  # TODO
+        for lump, game_lump_buffer in _game_lump_buffers(self.game_lumps_info, buffer, self._info, bsp):
             if lump.id == 'sprp':
                 game_lump = StaticPropLump(lump)
                 game_lump.parse(game_lump_buffer, bsp)
@@ -116,23 +114,7 @@ class VGameLump(Lump):
             if not lump.id:
                 continue
             self.game_lumps_info.append(lump)
-        for lump in self.game_lumps_info:
-            relative_offset = lump.offset - self._info.offset
-            print(f'GLump "{lump.id}" offset: {relative_offset} size: {lump.size} ')
-            with buffer.save_current_offset():
-                buffer.seek(relative_offset)
-                if lump.flags == 1:
-                    curr_index = self.game_lumps_info.index(lump)
-                    if curr_index + 1 != len(self.game_lumps_info):
-                        next_offset = self.game_lumps_info[curr_index + 1].offset - self._info.offset
-                    else:
-                        next_offset = self._info.size
-                    compressed_size = next_offset - relative_offset
-                    game_lump_buffer = Lump.decompress_lump(buffer.slice(size=compressed_size))
-                else:
-                    game_lump_buffer = buffer.slice(size=lump.size)
-
-                pass  # TODO
+        for lump, game_lump_buffer in _game_lump_buffers(self.game_lumps_info, buffer, self._info, bsp):
             if lump.id == 'sprp':
                 game_lump = StaticPropLump(lump)
                 game_lump.parse(game_lump_buffer, bsp)
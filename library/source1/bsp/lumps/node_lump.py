@@ -1,3 +1,5 @@
+from typing import Sequence
+
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.source1.bsp import Lump, ValveLumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile
@@ -10,12 +12,11 @@ class NodeLump(Lump):
 
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
-        self.nodes: list[Node] = []
+        self.nodes: Sequence[Node] = []
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            plane = Node.from_buffer(buffer, self.version, bsp)
-            self.nodes.append(plane)
+        layout = Node.layout(self.version)
+        self.nodes = buffer.read_structure_array(buffer.tell(), buffer.remaining() // layout.size, Node, layout)
         return self
 
 
@@ -24,10 +25,8 @@ class VNodeLump(Lump):
 
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
-        self.nodes: list[VNode] = []
+        self.nodes: Sequence[VNode] = []
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            plane = VNode.from_buffer(buffer, self.version, bsp)
-            self.nodes.append(plane)
+        self.nodes = buffer.read_structure_array(buffer.tell(), buffer.remaining() // VNode.LAYOUT.size, VNode)
         return self
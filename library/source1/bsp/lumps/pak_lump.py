@@ -1,28 +1,32 @@
-import zipfile
-from io import BytesIO
-
 from SourceIO.library.shared.app_id import SteamAppId
 from SourceIO.library.shared.content_manager.providers.zip_content_provider import ZIPContentProvider
 from SourceIO.library.source1.bsp import Lump, ValveLumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile
-from SourceIO.library.utils import Buffer
-from SourceIO.library.utils.tiny_path import TinyPath
+from SourceIO.library.utils import Buffer, MMapBuffer
 
 
 @lump_tag(40, 'LUMP_PAK')
 class PakLump(Lump, ZIPContentProvider):
+    map_in_place = True
 
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
         self.filepath = None
         self._steamapp_id = SteamAppId.UNKNOWN
         self._zip_file = None
+        self._view = None
+        self._mapping = None
+        self._mapped_region = None
         self._cache = {}
+        self._path_index = None
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
         self.filepath = bsp.filepath
         if self._zip_file is None:
-            zip_data = BytesIO(buffer.read())
-            self._zip_file = zipfile.ZipFile(zip_data)
-            self._cache = {TinyPath(a.lower()).as_posix(): a for a in self._zip_file.NameToInfo}
+            # The archive is read in place from the map file mapping, stored members (the usual case for
+            # pakfiles) are never copied.
+            if isinstance(buffer, MMapBuffer):
+                self._open_mapping(buffer)
+            else:
+                self._open_view(buffer.ro_view())
         return self
@@ -2,6 +2,7 @@ from SourceIO.library.source1.bsp import Lump, ValveLumpInfo, lump_tag
 from SourceIO.library.source1.bsp.bsp_file import VBSPFile, BSPFile
 from SourceIO.library.source1.bsp.datatypes.plane import ValvePlane, Quake3Plane
 from SourceIO.library.utils import Buffer
+from SourceIO.library.utils.struct_layout import StructArray
 
 
 @lump_tag(1, 'LUMP_PLANES')
@@ -9,12 +10,11 @@ class PlaneLump(Lump):
 
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
-        self.planes: list[ValvePlane] = []
+        self.planes: StructArray[ValvePlane] | list[ValvePlane] = []
 
     def parse(self, buffer: Buffer, bsp: VBSPFile):
-        while buffer:
-            plane = ValvePlane.from_buffer(buffer, self.version, bsp)
-            self.planes.append(plane)
+        count = buffer.remaining() // ValvePlane.LAYOUT.size
+        self.planes = buffer.read_structure_array(buffer.tell(), count, ValvePlane)
         return self
 
 
@@ -23,10 +23,9 @@ class PlaneLump(Lump):
 class Quake3PlaneLump(Lump):
     def __init__(self, lump_info: ValveLumpInfo):
         super().__init__(lump_info)
-        self.planes: list[Quake3Plane] = []
+        self.planes: StructArray[Quake3Plane] | list[Quake3Plane] = []
 
     def parse(self, buffer: Buffer, bsp: BSPFile):
-        while buffer:
-            plane = Quake3Plane.from_buffer(buffer, self.version, bsp)
-            self.planes.append(plane)
+        count = buffer.remaining() // Quake3Plane.LAYOUT.size
+        self.planes = buffer.read_structure_array(buffer.tell(), count, Quake3Plane)
         return self
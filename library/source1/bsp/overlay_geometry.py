@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.datatypes.overlay import Overlay
+
+# Same push away from the surface the engine uses against flickering, per render order step
+OVERLAY_SURFACE_OFFSET = 0.1
+
+
+@dataclass(slots=True)
+class OverlayGeometry:
+    """Overlay pieces clipped to the faces they were placed on.
+
+    Every polygon owns ``loop_totals[i]`` consecutive rows of ``positions`` and ``uvs``,
+    ``polygon_overlays`` is the index of the overlay it was cut from.
+    """
+    positions: np.ndarray
+    uvs: np.ndarray
+    loop_totals: np.ndarray
+    polygon_overlays: np.ndarray
+
+    @property
+    def polygon_starts(self) -> np.ndarray:
+        return np.cumsum(self.loop_totals) - self.loop_totals
+
+
+def overlay_arrays(overlays: Sequence[Overlay]) -> dict[str, np.ndarray]:
+    """Columns of the overlay lump, one row per overlay."""
+    face_count_and_render_order = np.array([o.face_count_and_render_order for o in overlays], np.int64)
+    return {
+        "tex_info": np.array([o.tex_info for o in overlays], np.int64),
+        "face_count": np.minimum(face_count_and_render_order & 0x3FFF, 64),
+        "render_order": face_count_and_render_order >> 14,
+        "faces": np.array([o.ofaces for o in overlays], np.int64).reshape((-1, 64)),
+        "u": np.array([o.u for o in overlays], np.float32).reshape((-1, 2)),
+        "v": np.array([o.v for o in overlays], np.float32).reshape((-1, 2)),
+        "uv_points": np.array([o.uv_points for o in overlays], np.float32).reshape((-1, 4, 3)),
+        "origin": np.array([o.origin for o in overlays], np.float32).reshape((-1, 3)),
+        "normal": np.array([o.normal for o in overlays], np.float32).reshape((-1, 3)),
+    }
+
+
+def clip_convex_polygons(points: np.ndarray, counts: np.ndarray,
+                         planes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sutherland-Hodgman clip of many 2D convex polygons, each against its own set of half-planes.
+
+    ``points`` is (K, M, 2) with ``counts`` valid points per polygon, M has to leave room for one extra point
+    per plane. ``planes`` is (K, E, 3) rows of (nx, ny, d) keeping points with n.p >= d, all zero rows keep
+    everything. Returns the clipped points and counts in the same layout.
+    """
+    polygon_count, slot_count = points.shape[:2]
+    slots = np.arange(slot_count)
+    rows = np.broadcast_to(np.arange(polygon_count)[:, None], (polygon_count, slot_count))
+    for plane in np.moveaxis(planes, 1, 0):
+        valid = slots[None, :] < counts[:, None]
+        following = np.where(slots[None, :] + 1 < counts[:, None], slots[None, :] + 1, 0)
+        distances = np.einsum("kmi,ki->km", points, plane[:, :2]) - plane[:, None, 2]
+        next_distances = np.take_along_axis(distances, following, axis=1)
+        inside = distances >= 0
+        keep = valid & inside
+        cross = valid & (inside != (next_distances >= 0))
+
+        t = np.where(cross, distances / np.where(cross, distances - next_distances, 1), 0)
+        next_points = np.take_along_axis(points, following[:, :, None], axis=1)
+        crossings = points + (next_points - points) * t[:, :, None]
+
+        emitted = keep.astype(np.int64) + cross
+        positions = np.cumsum(emitted, axis=1) - emitted
+        clipped = np.zeros_like(points)
+        clipped[rows[keep], positions[keep]] = points[keep]
+        clipped[rows[cross], (positions + keep)[cross]] = crossings[cross]
+        points, counts = clipped, emitted.sum(axis=1)
+    return points, counts
+
+
+def _barycentric(a: np.ndarray, b: np.ndarray, c: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """(N, 3) barycentric weights of 2D points in triangles a, b, c."""
+    v0, v1, v2 = b - a, c - a, points - a
+    denominator = v0[:, 0] * v1[:, 1] - v1[:, 0] * v0[:, 1]
+    denominator = np.where(np.abs(denominator) > 1e-12, denominator, 1)
+    wb = (v2[:, 0] * v1[:, 1] - v1[:, 0] * v2[:, 1]) / denominator
+    wc = (v0[:, 0] * v2[:, 1] - v2[:, 0] * v0[:, 1]) / denominator
+    return np.column_stack((1 - wb - wc, wb, wc))
+
+
+def build_overlay_geometry(overlays: dict[str, np.ndarray], faces: np.ndarray, planes: np.ndarray,
+                           vertices: np.ndarray, edges: np.ndarray, surf_edges: np.ndarray,
+                           offset: float = OVERLAY_SURFACE_OFFSET) -> OverlayGeometry:
+    """Project every overlay quad onto its faces and clip it to them, all overlay/face pairs at once.
+
+    ``overlays`` comes from :func:`overlay_arrays`, ``faces`` and ``planes`` are LUMP_FACES and LUMP_PLANES
+    records. Pieces are lifted off their face by ``offset`` per render order step to avoid z-fighting.
+    Overlays on displacement faces are skipped.
+    """
+    overlay_count = len(overlays["origin"])
+    origins = overlays["origin"]
+    normals = overlays["normal"]
+    uv_points = overlays["uv_points"]
+    # vbsp stores basis U in the z of the first three uv points and sets the z of the last one when
+    # basis V points against N x U
+    basis_u = uv_points[:, :3, 2]
+    v_flipped = uv_points[:, 3, 2] == 1
+    basis_v = np.cross(normals, basis_u)
+    basis_v[v_flipped] *= -1
+    # Quad corners in overlay plane space, x along basis U and y along basis V as the engine reads them,
+    # paired with the (u, v) corners of the texture
+    quads = uv_points[:, :, :2]
+    u, v = overlays["u"], overlays["v"]
+    quad_uvs = np.stack((np.column_stack((u[:, 0], v[:, 0])), np.column_stack((u[:, 0], v[:, 1])),
+                         np.column_stack((u[:, 1], v[:, 1])), np.column_stack((u[:, 1], v[:, 0]))), axis=1)
+
+    # One row per (overlay, face) pair
+    face_slots = np.arange(64)[None, :] < overlays["face_count"][:, None]
+    pair_overlays = np.repeat(np.arange(overlay_count), overlays["face_count"])
+    pair_faces = overlays["faces"][face_slots]
+    usable = (pair_faces >= 0) & (pair_faces < len(faces))
+    if "disp_info_id" in faces.dtype.names:
+        usable[usable] &= faces["disp_info_id"][pair_faces[usable]].astype(np.int32) == -1
+    pair_overlays, pair_faces = pair_overlays[usable], pair_faces[usable]
+    pair_records = faces[pair_faces]
+
+    # Face polygons in overlay plane space, padded to the longest face
+    edge_counts = pair_records["edge_count"].astype(np.int64)
+    max_edges = int(edge_counts.max(initial=0))
+    slots = np.arange(max_edges)[None, :]
+    in_face = slots < edge_counts[:, None]
+    corner_edges = np.where(in_face, pair_records["first_edge"].astype(np.int64)[:, None] + slots, 0)
+    used_surf_edges = surf_edges[corner_edges]
+    face_points = vertices[edges[np.abs(used_surf_edges), (used_surf_edges < 0).astype(np.intp)]]
+    relative = face_points - origins[pair_overlays, None, :]
+    face_2d = np.stack((np.einsum("kmi,ki->km", relative, basis_u[pair_overlays]),
+                        np.einsum("kmi,ki->km", relative, basis_v[pair_overlays])), axis=2)
+    following = np.where(slots + 1 < edge_counts[:, None], slots + 1, 0)
+    edge_vectors = np.take_along_axis(face_2d, following[:, :, None], axis=1) - face_2d
+    area = np.where(in_face, face_2d[:, :, 0] * edge_vectors[:, :, 1] - face_2d[:, :, 1] * edge_vectors[:, :, 0],
+                    0).sum(axis=1)
+    # Faces seen edge-on from the overlay can't receive it
+    facing = np.abs(area) > 1e-6
+    inward = np.sign(area)[:, None, None] * np.stack((-edge_vectors[:, :, 1], edge_vectors[:, :, 0]), axis=2)
+    inward *= in_face[:, :, None]
+    clip_planes = np.concatenate((inward, np.einsum("kmi,kmi->km", inward, face_2d)[:, :, None]), axis=2)
+
+    pieces = np.zeros((len(pair_faces), 4 + max_edges, 2), np.float32)
+    pieces[:, :4] = quads[pair_overlays]
+    pieces, piece_counts = clip_convex_polygons(pieces, np.where(facing, 4, 0), clip_planes)
+    piece_counts[piece_counts < 3] = 0
+
+    # Flatten the pieces, keeping their winding facing the overlay normal
+    quad_area = np.einsum("ni,ni->n", quads[:, :, 0], np.roll(quads[:, :, 1], -1, axis=1)) - \
+        np.einsum("ni,ni->n", quads[:, :, 1], np.roll(quads[:, :, 0], -1, axis=1))
+    # A flipped V axis mirrors the plane space, counter-clockwise there is clockwise around the normal
+    flipped = (quad_area < 0) != v_flipped
+    flipped = flipped[pair_overlays]
+    slot_order = np.arange(pieces.shape[1])[None, :]
+    slot_order = np.where(flipped[:, None], np.maximum(piece_counts[:, None] - 1 - slot_order, 0), slot_order)
+    pieces = np.take_along_axis(pieces, slot_order[:, :, None], axis=1)
+    in_piece = np.arange(pieces.shape[1])[None, :] < piece_counts[:, None]
+    points_2d = pieces[in_piece]
+    point_pairs = np.repeat(np.arange(len(piece_counts)), piece_counts)
+    point_overlays = pair_overlays[point_pairs]
+
+    # Texture coordinates from the quad triangle holding each point
+    quad = quads[point_overlays]
+    quad_uv = quad_uvs[point_overlays]
+    first = _barycentric(quad[:, 0], quad[:, 1], quad[:, 2], points_2d)
+    second = _barycentric(quad[:, 0], quad[:, 2], quad[:, 3], points_2d)
+    in_first = first.min(axis=1) >= -1e-4
+    uvs = np.where(in_first[:, None], np.einsum("nj,nji->ni", first, quad_uv[:, [0, 1, 2]]),
+                   np.einsum("nj,nji->ni", second, quad_uv[:, [0, 2, 3]])).astype(np.float32)
+
+    # Back to world space, pushed along the overlay normal onto the face plane
+    positions = (origins[point_overlays] + basis_u[point_overlays] * points_2d[:, :1]
+                 + basis_v[point_overlays] * points_2d[:, 1:])
+    point_faces = pair_records[point_pairs]
+    side = np.where(point_faces["side"].astype(bool), -1.0, 1.0).astype(np.float32)
+    face_normals = planes["normal"][point_faces["plane_index"]] * side[:, None]
+    face_distances = planes["dist"][point_faces["plane_index"]] * side
+    along = np.einsum("ni,ni->n", face_normals, normals[point_overlays])
+    along = np.where(np.abs(along) > 1e-6, along, 1)
+    t = (face_distances - np.einsum("ni,ni->n", face_normals, positions)) / along
+    lift = offset * (1 + overlays["render_order"][point_overlays])
+    positions += normals[point_overlays] * t[:, None] + face_normals * lift[:, None]
+
+    used = piece_counts > 0
+    return OverlayGeometry(positions.astype(np.float32), uvs, piece_counts[used], pair_overlays[used])
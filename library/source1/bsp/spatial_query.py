@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.bsp_file import BSPFile
+
+
+def box_planes(mins, maxs) -> np.ndarray:
+    """The six planes of an axis aligned box as (normal x, y, z, distance) rows, normals point out of the box."""
+    mins = np.asarray(mins, np.float32)
+    maxs = np.asarray(maxs, np.float32)
+    normals = np.vstack((np.eye(3, dtype=np.float32), -np.eye(3, dtype=np.float32)))
+    return np.column_stack((normals, np.concatenate((maxs, -mins)))).astype(np.float32)
+
+
+def frustum_planes(view_projection) -> np.ndarray:
+    """Outward planes of the frustum of a 4x4 (column vector convention) view projection matrix."""
+    m = np.asarray(view_projection, np.float64)
+    planes = np.array([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+    # Rows are a*x + b*y + c*z + d >= 0 inside, flip them to n.p <= distance
+    planes /= np.linalg.norm(planes[:, :3], axis=1)[:, None]
+    return np.column_stack((-planes[:, :3], planes[:, 3])).astype(np.float32)
+
+
+def points_inside(points: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """Mask of points on the inner side of every plane."""
+    points = np.asarray(points, np.float32).reshape((-1, 3))
+    return (points @ planes[:, :3].T <= planes[:, 3]).all(axis=1)
+
+
+def boxes_outside(mins: np.ndarray, maxs: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """Mask of boxes that are entirely on the outer side of at least one plane.
+
+    Conservative for convex regions, a box near a corner of the region may be reported as overlapping.
+    """
+    mins = np.asarray(mins, np.float32).reshape((-1, 3))
+    maxs = np.asarray(maxs, np.float32).reshape((-1, 3))
+    normals = planes[:, :3]
+    # Per box and plane, the corner furthest against the plane normal
+    nearest = np.where(normals[None, :, :] >= 0, mins[:, None, :], maxs[:, None, :])
+    return (np.einsum("bpi,pi->bp", nearest, normals) > planes[:, 3]).any(axis=1)
+
+
+class BSPSpatialIndex:
+    """Region queries over the node tree, faces and models of a map.
+
+    Nodes whose bounds miss the region are skipped with their whole subtree, only faces of the remaining
+    nodes get their bounds computed.
+    """
+
+    def __init__(self, nodes: np.ndarray, faces: np.ndarray, model_bounds: np.ndarray, model_nodes: np.ndarray,
+                 model_faces: np.ndarray, vertices: np.ndarray, edges: np.ndarray, surf_edges: np.ndarray):
+        self.node_children = nodes["childes_id"].astype(np.int64)
+        self.node_mins = nodes["min"].astype(np.float32)
+        self.node_maxs = nodes["max"].astype(np.float32)
+        self.node_first_face = nodes["first_face"].astype(np.int64)
+        self.node_face_count = nodes["face_count"].astype(np.int64)
+        self.faces = faces
+        self.model_bounds = model_bounds
+        self.model_nodes = model_nodes
+        self.model_faces = model_faces
+        self.vertices = vertices
+        self.edges = edges
+        self.surf_edges = surf_edges
+
+        # Faces not listed by any node (detail faces of some compilers) are always tested one by one
+        coverage = np.zeros(len(faces) + 1, np.int64)
+        np.add.at(coverage, np.minimum(self.node_first_face, len(faces)), 1)
+        np.add.at(coverage, np.minimum(self.node_first_face + self.node_face_count, len(faces)), -1)
+        self._free_faces = np.flatnonzero(np.cumsum(coverage)[:-1] == 0)
+
+    @classmethod
+    def from_bsp(cls, bsp: BSPFile) -> Optional['BSPSpatialIndex']:
+        """Index of a VBSP map, None if the map has no node tree or its faces are not record arrays."""
+        node_lump = bsp.get_lump('LUMP_NODES')
+        face_lump = bsp.get_lump('LUMP_FACES')
+        model_lump = bsp.get_lump('LUMP_MODELS')
+        if node_lump is None or not hasattr(node_lump.nodes, "records"):
+            return None
+        if face_lump is None or not hasattr(face_lump, "records") or model_lump is None:
+            return None
+        models = model_lump.models
+        if not models or not hasattr(models[0], "head_node"):
+            return None
+        model_bounds = np.array([(model.mins, model.maxs) for model in models], np.float32)
+        model_nodes = np.array([model.head_node for model in models], np.int64)
+        model_faces = np.array([(model.first_face, model.face_count) for model in models], np.int64)
+        return cls(node_lump.nodes.records, face_lump.records, model_bounds, model_nodes, model_faces,
+                   bsp.get_lump('LUMP_VERTICES').vertices, bsp.get_lump('LUMP_EDGES').edges,
+                   bsp.get_lump('LUMP_SURFEDGES').surf_edges)
+
+    def nodes_in(self, planes: np.ndarray, head_node: int = 0) -> np.ndarray:
+        """Ids of the nodes under ``head_node`` whose bounds overlap the region, one tree level at a time."""
+        found = []
+        frontier = np.array([head_node], np.int64)
+        while frontier.size:
+            frontier = frontier[~boxes_outside(self.node_mins[frontier], self.node_maxs[frontier], planes)]
+            found.append(frontier)
+            children = self.node_children[frontier].ravel()
+            # Negative children are leaves
+            frontier = children[children >= 0]
+        return np.concatenate(found)
+
+    def face_bounds(self, face_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        faces = self.faces[face_ids]
+        counts = faces["edge_count"].astype(np.int64)
+        mins = np.zeros((len(face_ids), 3), np.float32)
+        maxs = np.zeros((len(face_ids), 3), np.float32)
+        valid = counts > 0
+        if not valid.any():
+            return mins, maxs
+        counts = counts[valid]
+        starts = np.cumsum(counts) - counts
+        first_edges = faces["first_edge"][valid].astype(np.int64)
+        corner_edges = np.repeat(first_edges - starts, counts) + np.arange(counts.sum())
+        used_surf_edges = self.surf_edges[corner_edges]
+        points = self.vertices[self.edges[np.abs(used_surf_edges), (used_surf_edges < 0).astype(np.intp)]]
+        mins[valid] = np.minimum.reduceat(points, starts, axis=0)
+        maxs[valid] = np.maximum.reduceat(points, starts, axis=0)
+        return mins, maxs
+
+    def faces_in(self, planes: np.ndarray, model_id: int = 0) -> np.ndarray:
+        """Sorted ids of the faces of a model whose bounds overlap the region."""
+        first_face, face_count = self.model_faces[model_id].tolist()
+        nodes = self.nodes_in(planes, int(self.model_nodes[model_id]))
+        counts = self.node_face_count[nodes]
+        starts = np.cumsum(counts) - counts
+        face_ids = np.repeat(self.node_first_face[nodes] - starts, counts) + np.arange(counts.sum())
+        face_ids = np.union1d(face_ids, self._free_faces)
+        face_ids = face_ids[(face_ids >= first_face) & (face_ids < first_face + face_count)]
+        face_ids = face_ids[self.faces["edge_count"][face_ids] > 0]
+        mins, maxs = self.face_bounds(face_ids)
+        return face_ids[~boxes_outside(mins, maxs, planes)]
+
+
+@dataclass(slots=True)
+class BSPRegion:
+    """Convex part of a map to import, given as outward facing planes."""
+    index: BSPSpatialIndex
+    planes: np.ndarray
+
+    @classmethod
+    def from_box(cls, bsp: BSPFile, mins, maxs) -> Optional['BSPRegion']:
+        index = BSPSpatialIndex.from_bsp(bsp)
+        if index is None:
+            return None
+        return cls(index, box_planes(np.minimum(mins, maxs), np.maximum(mins, maxs)))
+
+    @classmethod
+    def from_frustum(cls, bsp: BSPFile, view_projection) -> Optional['BSPRegion']:
+        """Region seen by a camera, ``view_projection`` is its 4x4 matrix in map units."""
+        return cls.from_planes(bsp, frustum_planes(view_projection))
+
+    @classmethod
+    def from_planes(cls, bsp: BSPFile, planes: np.ndarray) -> Optional['BSPRegion']:
+        """Region bounded by (normal x, y, z, distance) rows with outward normals."""
+        index = BSPSpatialIndex.from_bsp(bsp)
+        if index is None:
+            return None
+        return cls(index, np.asarray(planes, np.float32).reshape((-1, 4)))
+
+    def face_ids(self, model_id: int = 0) -> np.ndarray:
+        return self.index.faces_in(self.planes, model_id)
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        return points_inside(points, self.planes)
+
+    def overlaps(self, mins: np.ndarray, maxs: np.ndarray) -> np.ndarray:
+        return ~boxes_outside(mins, maxs, self.planes)
+
+    def overlaps_model(self, model_id: int, origin=(0, 0, 0)) -> bool:
+        bounds = self.index.model_bounds[model_id]
+        return bool(self.overlaps(bounds[0] + origin, bounds[1] + origin)[0])
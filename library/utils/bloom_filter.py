@@ -0,0 +1,79 @@
+import math
+from hashlib import blake2b
+from typing import Iterable
+
+import numpy as np
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _key_hashes(key: str) -> tuple[int, int]:
+    digest = blake2b(key.encode("utf8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+
+class BloomFilter:
+    """Compact set membership filter over strings.
+
+    ``key in filter`` is False only when the key was certainly never added. Keeps counters of
+    queries, negative answers and reported false positives so the actual error rate can be checked.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.bit_count = max(64, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.queries = 0
+        self.negatives = 0
+        self.false_positives = 0
+
+    @classmethod
+    def from_keys(cls, keys: Iterable[str], error_rate: float = 0.01) -> 'BloomFilter':
+        keys = list(keys)
+        bloom = cls(len(keys), error_rate)
+        if not keys:
+            return bloom
+        digests = b"".join(blake2b(key.encode("utf8"), digest_size=16).digest() for key in keys)
+        hashes = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+        steps = np.arange(bloom.hash_count, dtype=np.uint64)
+        indices = (hashes[:, :1] + steps[None, :] * hashes[:, 1:]) % np.uint64(bloom.bit_count)
+        bits = np.zeros(len(bloom.bits) * 8, dtype=np.bool_)
+        bits[indices.ravel()] = True
+        bloom.bits = bytearray(np.packbits(bits, bitorder="little").tobytes())
+        return bloom
+
+    def add(self, key: str):
+        h1, h2 = _key_hashes(key)
+        for i in range(self.hash_count):
+            index = ((h1 + i * h2) & _MASK64) % self.bit_count
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: str) -> bool:
+        self.queries += 1
+        h1, h2 = _key_hashes(key)
+        bits = self.bits
+        for i in range(self.hash_count):
+            index = ((h1 + i * h2) & _MASK64) % self.bit_count
+            if not (bits[index >> 3] >> (index & 7)) & 1:
+                self.negatives += 1
+                return False
+        return True
+
+    def note_false_positive(self):
+        """Record that a key reported as present turned out to be missing."""
+        self.false_positives += 1
+
+    @property
+    def false_positive_rate(self) -> float:
+        actual_negatives = self.negatives + self.false_positives
+        return self.false_positives / actual_negatives if actual_negatives else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "bytes": len(self.bits),
+            "queries": self.queries,
+            "negatives": self.negatives,
+            "false_positives": self.false_positives,
+            "false_positive_rate": self.false_positive_rate,
+        }
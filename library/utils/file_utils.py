@@ -10,8 +10,13 @@ import array
 import typing
 from dataclasses import dataclass, field
 from pathlib import Path
+from functools import lru_cache
 from struct import calcsize, pack, unpack
-from typing import Optional, Protocol, Union, TypeVar, Type, Callable, Any
+from typing import Optional, Protocol, Union, TypeVar, Type, Callable, Any, Sequence
+
+import numpy as np
+
+from SourceIO.library.utils.struct_layout import StructArray, StructLayout
 
 try:
     from SourceIO.library.utils.tiny_path import TinyPath
@@ -124,16 +129,18 @@ class Buffer(abc.ABC, io.RawIOBase):
         pass
 
     def read_fmt(self, fmt):
-        return unpack(self._endian + fmt, self.read(calcsize(self._endian + fmt)))
+        s = _compiled_struct(self._endian + fmt)
+        return s.unpack(self.read(s.size))
 
     def _read(self, fmt):
-        return unpack(self._endian + fmt, self.read(calcsize(self._endian + fmt)))[0]
+        s = _compiled_struct(self._endian + fmt)
+        return s.unpack(self.read(s.size))[0]
 
     def read_relative_offset32(self):
         return self.tell() + self.read_uint32()
 
     def read_uint64(self):
-        return self._read
+        return self._read("Q")
 
     def read_int64(self):
         return self._read("q")
@@ -272,10 +279,27 @@ class Buffer(abc.ABC, io.RawIOBase):
     def slice(self, offset: Optional[int] = None, size: int = -1) -> 'Buffer':
         raise NotImplementedError
 
-    def read_structure_array(self, offset, count, data_class: Type[TReadable]) -> list[TReadable]:
+    def read_record_array(self, count: int, layout: StructLayout, offset: Optional[int] = None) -> np.ndarray:
+        """Read ``count`` records of ``layout`` as one numpy structured array."""
+        if offset is not None:
+            self.seek(offset)
+        layout = layout.with_endian(self._endian)
+        return layout.records(self.read(count * layout.size), count)
+
+    def read_structure_array(self, offset, count, data_class: Type[TReadable],
+                             layout: Optional[StructLayout] = None) -> Sequence[TReadable]:
+        """Read ``count`` consecutive ``data_class`` records.
+
+        Classes with a fixed :class:`StructLayout` (own ``LAYOUT`` or passed as ``layout``) are read in one go
+        and returned as a lazy :class:`StructArray`, everything else is parsed with ``data_class.from_buffer``.
+        """
         if count == 0:
             return []
         self.seek(offset)
+        layout = layout or getattr(data_class, "LAYOUT", None)
+        if layout is not None:
+            layout = layout.with_endian(self._endian)
+            return StructArray(data_class, layout, self.read(count * layout.size), count)
         object_list = []
         for _ in range(count):
             obj = data_class.from_buffer(self)
@@ -447,12 +471,21 @@ class MemoryBuffer(Buffer):
         self._buffer = None
 
     def read_nt_string(self, encoding="latin1"):
-        obj = self._buffer.obj
-        try:
+        view = self._buffer
+        buffer_size = len(view)
+        obj = view.obj
+        if hasattr(obj, "find") and len(obj) == view.nbytes:
             end = obj.find(b"\x00", self._offset)
-        except AttributeError:
-            end = self._buffer.tobytes().find(b"\x00", self._offset)  # rare fallback
-        buffer_size = len(self._buffer)
+        else:
+            # Sliced view (or mmap region): offsets in view.obj do not match ours, scan the view in small chunks
+            end = -1
+            pos = self._offset
+            while pos < buffer_size:
+                found = view[pos:pos + 256].tobytes().find(b"\x00")
+                if found != -1:
+                    end = pos + found
+                    break
+                pos += 256
         if end == -1:
             end = buffer_size
         s = bytes(self._buffer[self._offset:end]).decode(encoding, "replace")
@@ -601,18 +634,40 @@ class FileBuffer(io.FileIO, Buffer):
 
 
 class MMapBuffer(MemoryBuffer):
-    def __init__(self, path: str | Path):
+    """Read-only mapping of a file, or of ``size`` bytes of it starting at ``offset``."""
+
+    def __init__(self, path: str | Path, offset: int = 0, size: int = -1):
         import mmap, os
+        # Mappings have to start on an allocation granularity boundary, the view skips the padding
+        aligned = offset - offset % mmap.ALLOCATIONGRANULARITY
         fd = os.open(os.fspath(path), os.O_RDONLY)
-        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
-        os.close(fd)
-        super().__init__(typing.cast(memoryview,mm))
+        try:
+            length = 0 if size == -1 else size + offset - aligned
+            mm = mmap.mmap(fd, length, access=mmap.ACCESS_READ, offset=aligned)
+        finally:
+            os.close(fd)
+        view = memoryview(mm)[offset - aligned:]
+        super().__init__(view)
+        self._view = view
         self._mm = mm
+        self.path = path
+        self.offset = offset
 
     def close(self):
-        if self._mm is not None:
-            self._mm.close()
-            self._mm = None
+        if self._mm is None:
+            return
+        mm, self._mm = self._mm, None
+        self._buffer.release()
+        self._view.release()
+        try:
+            mm.close()
+        except BufferError:
+            # Slices of this buffer are still alive, the mapping is unmapped with the last of them
+            pass
+
+    @property
+    def closed(self):
+        return self._mm is None
 
 
 class MemorySlice(MemoryBuffer):
@@ -627,6 +682,11 @@ class MemorySlice(MemoryBuffer):
 T = TypeVar("T")
 
 
+@lru_cache(maxsize=512)
+def _compiled_struct(fmt: str) -> struct.Struct:
+    return struct.Struct(fmt)
+
+
 class Readable(Protocol):
     @classmethod
     def from_buffer(cls: Type[T], buffer: Buffer) -> T:
@@ -1,9 +1,183 @@
 import os
 import platform
-from typing import Optional
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
 
 from SourceIO.library.utils import TinyPath
 
+is_windows = platform.system() == "Windows"
+
+
+def _resolve_case(path: TinyPath, listing: Callable[[str], Optional[dict[str, str]]]) -> Optional[TinyPath]:
+    """Walk ``path`` one component at a time, replacing each with its on-disk spelling from ``listing``."""
+    parts = path.parts
+    if not parts:
+        return None
+    absolute = parts[0] == ""
+    current = "/" if absolute else ""
+    for component in parts[1:] if absolute else parts:
+        if component in ("", "."):
+            continue
+        if component == "..":
+            if current in ("", ".") or os.path.basename(current) == "..":
+                # Nothing left to pop from a relative path, keep walking up
+                current = os.path.join(current, "..") if current not in ("", ".") else ".."
+            elif current != "/":
+                current = os.path.dirname(current.rstrip("/")) or ("/" if absolute else "")
+            continue
+        entries = listing(current or ".")
+        real_name = entries.get(component.casefold()) if entries is not None else None
+        if real_name is None:
+            return None
+        if not current:
+            current = real_name
+        else:
+            current = current + real_name if current.endswith("/") else current + "/" + real_name
+    return TinyPath(current or ".")
+
+
+class DirectoryListingCache:
+    """Shared directory -> {casefolded name: real name} cache.
+
+    Each listing is validated against the directory mtime, so a lookup costs a single ``stat`` instead
+    of a full ``listdir``. Counters are kept to see how much the cache actually saves.
+    """
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        self._listings: OrderedDict[str, tuple[int, dict[str, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stat_calls = 0
+        self.listdir_calls = 0
+        self.entries_scanned = 0
+
+    def listing(self, directory: str) -> Optional[dict[str, str]]:
+        """Return case-folded listing of a directory, None if it cannot be listed."""
+        with self._lock:
+            self.stat_calls += 1
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is not None:
+                if cached[0] == mtime:
+                    self._listings.move_to_end(directory)
+                    self.hits += 1
+                    return cached[1]
+                self.invalidations += 1
+            self.listdir_calls += 1
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return None
+        listing = {}
+        for name in names:
+            listing.setdefault(name.casefold(), name)
+        with self._lock:
+            self.entries_scanned += len(names)
+            self.misses += 1
+            self._listings[directory] = (mtime, listing)
+            self._listings.move_to_end(directory)
+            while len(self._listings) > self.maxsize:
+                self._listings.popitem(last=False)
+        return listing
+
+    def lookup(self, directory: str, name: str) -> Optional[str]:
+        """Return the real name of a directory entry matched case-insensitively, None if missing."""
+        listing = self.listing(directory)
+        if listing is None:
+            return None
+        return listing.get(name.casefold())
+
+    def resolve(self, path: TinyPath) -> Optional[TinyPath]:
+        """Return path with every component in its on-disk case, None if it does not exist."""
+        return _resolve_case(path, self.listing)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "listings": len(self._listings),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stat_calls": self.stat_calls,
+            "listdir_calls": self.listdir_calls,
+            "listdir_saved": self.hits,
+            "entries_scanned": self.entries_scanned,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._listings.clear()
+
+
+DIRECTORY_CACHE = DirectoryListingCache()
+
+
+class ProbeCache:
+    """Memo of filesystem probes made during one game detection pass.
+
+    Unlike :class:`DirectoryListingCache` the listings are trusted without re-validating directory mtimes,
+    a pass is short enough for that, and whole :func:`backwalk_file_resolver` results are remembered too,
+    since every detector walks up the same ancestors looking for the same handful of names.
+    """
+
+    def __init__(self):
+        self._listings: dict[str, Optional[dict[str, str]]] = {}
+        self._backwalk: dict[tuple[str, str], Optional[TinyPath]] = {}
+        self.listing_calls = 0
+        self.backwalk_hits = 0
+
+    def listing(self, directory: str) -> Optional[dict[str, str]]:
+        listing = self._listings.get(directory, self)
+        if listing is self:
+            self.listing_calls += 1
+            listing = self._listings[directory] = DIRECTORY_CACHE.listing(directory)
+        return listing
+
+    def exists(self, path: TinyPath) -> bool:
+        directory, name = os.path.split(os.fspath(path))
+        if not name:
+            return os.path.exists(directory)
+        listing = self.listing(directory or ".")
+        if listing is None:
+            return False
+        real_name = listing.get(name.casefold())
+        return real_name is not None and (is_windows or real_name == name)
+
+    def resolve(self, path: TinyPath) -> Optional[TinyPath]:
+        """Same as :meth:`DirectoryListingCache.resolve`, served from this pass' listings."""
+        return _resolve_case(path, self.listing)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "listings": len(self._listings),
+            "listing_calls": self.listing_calls,
+            "backwalks": len(self._backwalk),
+            "backwalk_hits": self.backwalk_hits,
+        }
+
+
+_ACTIVE_PROBES: ContextVar[Optional[ProbeCache]] = ContextVar("active_probes", default=None)
+
+
+@contextmanager
+def probe_scope() -> Iterator[ProbeCache]:
+    """Share one :class:`ProbeCache` between every path probe made inside the block, in this context."""
+    probes = ProbeCache()
+    token = _ACTIVE_PROBES.set(probes)
+    try:
+        yield probes
+    finally:
+        _ACTIVE_PROBES.reset(token)
+
 
 def pop_path_back(path: TinyPath):
     if len(path.parts) > 1:
@@ -32,74 +206,77 @@ def find_vtx(mdl_path: TinyPath):
 
 def find_vtx_cm(mdl_path: TinyPath, content_manager):
     possible_vtx_version = [70, 80, 11, None, 12, 90]
+    candidates = []
     for vtx_version in possible_vtx_version[::-1]:
         if vtx_version is None:
-            path = content_manager.find_file(mdl_path.with_suffix(f'.vtx'))
+            candidates.append(mdl_path.with_suffix(f'.vtx'))
         else:
-            path = content_manager.find_file(mdl_path.with_suffix(f'.dx{vtx_version}.vtx'))
-        if path:
-            return path
+            candidates.append(mdl_path.with_suffix(f'.dx{vtx_version}.vtx'))
+    owners = content_manager.find_owners(candidates)
+    for path in candidates:
+        if owners[path] is not None:
+            return content_manager.find_file(path)
     return None
 
 
 def backwalk_file_resolver(current_path, file_to_find) -> Optional[TinyPath]:
     current_path = TinyPath(current_path).absolute()
     file_to_find = TinyPath(file_to_find)
+    probes = _ACTIVE_PROBES.get()
+    if probes is not None:
+        key = (os.fspath(current_path), os.fspath(file_to_find))
+        if key in probes._backwalk:
+            probes.backwalk_hits += 1
+            return probes._backwalk[key]
+        result = probes._backwalk[key] = _backwalk_probed(probes, current_path, file_to_find)
+        return result
 
     for _ in range(len(current_path.parts) - 1):
         second_part = file_to_find
         for _ in range(len(file_to_find.parts)):
-            new_path = corrected_path(current_path / second_part)
+            new_path = current_path / second_part
             if new_path.exists():
                 return new_path
+            if not is_windows and (new_path := DIRECTORY_CACHE.resolve(new_path)) is not None:
+                return new_path
 
             second_part = pop_path_back(second_part)
         current_path = pop_path_front(current_path)
     return None
 
 
-def corrected_path(path: TinyPath) -> TinyPath:
-    if platform.system() == "Windows" or path.exists():
-        return path
-
-    parts = path.parts
-    if not parts:
-        return path
-
-    current = TinyPath("/") if parts[0] == "" else TinyPath(parts[0])
-
-    for component in parts[1:]:
-        target = component.casefold()
+def _backwalk_probed(probes: ProbeCache, current_path: TinyPath, file_to_find: TinyPath) -> Optional[TinyPath]:
+    for _ in range(len(current_path.parts) - 1):
+        second_part = file_to_find
+        for _ in range(len(file_to_find.parts)):
+            new_path = current_path / second_part
+            if probes.exists(new_path):
+                return new_path
+            if not is_windows and (new_path := probes.resolve(new_path)) is not None:
+                return new_path
 
-        try:
-            match = next(
-                (
-                    entry
-                    for entry in current.iterdir()
-                    if entry.name.casefold() == target
-                ),
-                None,
-            )
-        except (FileNotFoundError, NotADirectoryError, PermissionError):
-            return path
+            second_part = pop_path_back(second_part)
+        current_path = pop_path_front(current_path)
+    return None
 
-        if match is None:
-            return path
-        current = match
 
-    return current
+def corrected_path(path: TinyPath) -> TinyPath:
+    if is_windows or path.exists():
+        return path
+    return DIRECTORY_CACHE.resolve(path) or path
 
 
 def get_mod_path(path: TinyPath) -> TinyPath:
     _path = path
     while len(path.parts) > 1:
-        if (path / 'maps').exists():
+        listing = DIRECTORY_CACHE.listing(path) or {}
+        if 'maps' in listing:
             return path
-        elif (path / 'materials').exists():
+        elif 'materials' in listing:
             return path
-        elif (path / 'elements').exists():
+        elif 'elements' in listing:
             return path
-        elif (path / 'models').exists() and path.parts[-1] != 'models' and \
+        elif 'models' in listing and path.parts[-1] != 'models' and \
                 path.parts[-2] != 'materials' and path.parts[-1] != 'materials':
             return path
         if len(path.parts) == 1:
@@ -114,23 +291,23 @@ def path_stem(path: str):
 
 def collect_full_material_names(material_names: list[str], material_search_paths: list[str],
                                 content_manager) -> dict[str, str]:
-    full_mat_names = {}
+    candidates: dict[str, list[tuple[TinyPath, str]]] = {}
     for material_name in material_names:
-        if material_name in full_mat_names: continue
-        real_material_path = content_manager.find_file('materials' / TinyPath((material_name + '.vmt')))
-        if real_material_path is not None:
-            full_mat_names[material_name] = material_name
-    for material_path in material_search_paths:
-        for material_name in material_names:
-            if material_name in full_mat_names:
-                continue
+        if material_name in candidates:
+            continue
+        options = candidates[material_name] = [('materials' / TinyPath((material_name + '.vmt')), material_name)]
+        for material_path in material_search_paths:
             material_path = TinyPath(material_path)
             if material_path.is_absolute():  # Absolute paths shouldn't even be here! This path is invalid
                 continue
-            real_material_path = content_manager.find_file("materials" / material_path / (material_name + ".vmt"))
-            if real_material_path is not None:
-                full_mat_names[material_name] = (material_path / material_name).as_posix().lstrip('/')
-    for material_name in material_names:
-        if material_name not in full_mat_names:
-            full_mat_names[material_name] = material_name
+            options.append(("materials" / material_path / (material_name + ".vmt"),
+                            (material_path / material_name).as_posix().lstrip('/')))
+    owners = content_manager.find_owners(path for options in candidates.values() for path, _ in options)
+    full_mat_names = {}
+    for material_name, options in candidates.items():
+        full_mat_names[material_name] = material_name
+        for path, full_name in options:
+            if owners[path] is not None:
+                full_mat_names[material_name] = full_name
+                break
     return full_mat_names
@@ -11,6 +11,8 @@ CAPTURING_ENABLED = os.environ.get("SOURCEIO_PERF_TRACE", "0").lower() in ("1",
 # CAPTURING_ENABLED = False # manual overrides
 # CAPTURING_ENABLED = True  # manual overrides
 FUNCTION_TIMES: dict[Callable, array] = defaultdict(lambda: array("f"))
+# Named callables returning counters (cache hit rates and such) reported alongside timings.
+STATS_SOURCES: dict[str, Callable[[], dict]] = {}
 
 
 def timed(function: Callable):
@@ -25,6 +27,10 @@ def timed(function: Callable):
     return wrapper if CAPTURING_ENABLED else function
 
 
+def register_stats_source(name: str, source: Callable[[], dict]):
+    STATS_SOURCES[name] = source
+
+
 def print_stats():
     if CAPTURING_ENABLED:
         info = sorted(FUNCTION_TIMES.items(), key=lambda v: sum(v[1]), reverse=True)
@@ -45,6 +51,10 @@ def print_stats():
                                                                          sum(times),
                                                                          sum(times) / len(times),
                                                                          max_w=longest_name + 3))
+        for name, source in STATS_SOURCES.items():
+            print(f"{name}:")
+            for key, value in source().items():
+                print(f"\t{key:<24}\t{value}")
 
 
 if __name__ == '__main__':
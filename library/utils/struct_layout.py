@@ -0,0 +1,175 @@
+import re
+import struct
+from collections.abc import Sequence
+from typing import Callable, Iterator, Optional, Type, TypeVar, overload
+
+import numpy as np
+
+T = TypeVar("T")
+
+_FIELD_FORMAT = re.compile(r"^(\d*)([xcbB?hHiIlLqQefds])$")
+_NUMPY_CODES = {
+    "c": "S1", "b": "i1", "B": "u1", "?": "?", "h": "i2", "H": "u2", "i": "i4", "I": "u4", "l": "i4", "L": "u4",
+    "q": "i8", "Q": "u8", "e": "f2", "f": "f4", "d": "f8",
+}
+
+
+class StructLayout:
+    """Binary layout of a fixed size record, compiled once into a :class:`struct.Struct` and a numpy dtype.
+
+    ``fields`` are ``(name, format)`` pairs, format being a single struct code with an optional repeat
+    count: ``("origin", "3f")`` reads a tuple of three floats, ``("name", "32s")`` reads 32 raw bytes.
+    A field named None is padding (``(None, "2x")``).
+    """
+
+    def __init__(self, fields: Sequence[tuple[Optional[str], str]], endian: str = "<"):
+        self.fields = tuple(fields)
+        self.endian = endian
+        self.names: list[str] = []
+        dtype_fields = []
+        slices: list[tuple[int, int]] = []
+        struct_format = endian
+        value_index = 0
+        for name, fmt in self.fields:
+            match = _FIELD_FORMAT.match(fmt)
+            if match is None:
+                raise ValueError(f"Unsupported field format {fmt!r}")
+            count = int(match.group(1) or 1)
+            code = match.group(2)
+            struct_format += fmt
+            if code == "x":
+                dtype_fields.append((f"_pad{len(dtype_fields)}", f"V{count}"))
+                continue
+            if name is None:
+                raise ValueError(f"Only padding can be unnamed, got {fmt!r}")
+            if code == "s":
+                dtype_fields.append((name, f"S{count}"))
+                count = 1
+            elif count == 1:
+                dtype_fields.append((name, endian + _NUMPY_CODES[code]))
+            else:
+                dtype_fields.append((name, endian + _NUMPY_CODES[code], (count,)))
+            self.names.append(name)
+            slices.append((value_index, count))
+            value_index += count
+        self.struct = struct.Struct(struct_format)
+        self.size = self.struct.size
+        self.dtype = np.dtype(dtype_fields)
+        assert self.dtype.itemsize == self.size, "numpy and struct layouts disagree"
+        self._group = self._make_grouper(slices, value_index)
+        self._swapped: Optional['StructLayout'] = None
+
+    @staticmethod
+    def _make_grouper(slices: list[tuple[int, int]], value_count: int) -> Callable[[tuple], tuple]:
+        if len(slices) == value_count:
+            return lambda values: values
+        getters = [(start, None) if count == 1 else (start, start + count) for start, count in slices]
+
+        def group(values: tuple) -> tuple:
+            return tuple(values[start] if end is None else values[start:end] for start, end in getters)
+
+        return group
+
+    def with_endian(self, endian: str) -> 'StructLayout':
+        if endian == self.endian:
+            return self
+        if self._swapped is None:
+            self._swapped = StructLayout(self.fields, endian)
+        return self._swapped
+
+    def unpack_from(self, data, offset: int = 0) -> tuple:
+        """Field values of one record, repeated fields grouped into tuples."""
+        return self._group(self.struct.unpack_from(data, offset))
+
+    def read_from(self, buffer) -> tuple:
+        """Read one record from the current position of a :class:`Buffer`, honoring its endianness."""
+        layout = self.with_endian(buffer._endian)
+        return layout.unpack_from(buffer.read(layout.size))
+
+    def iter_unpack(self, data) -> Iterator[tuple]:
+        group = self._group
+        for values in self.struct.iter_unpack(data):
+            yield group(values)
+
+    def records(self, data, count: int = -1) -> np.ndarray:
+        """Parse ``count`` records at once into a structured array, without copying ``data``."""
+        return np.frombuffer(data, self.dtype, count)
+
+
+class StructArray(Sequence[T]):
+    """Records read with a :class:`StructLayout`, kept as raw bytes until somebody asks for them.
+
+    :attr:`records` exposes all of them as a numpy structured array for vectorized code, indexing and
+    iteration build the dataclass instances on demand. Classes whose fields do not map one to one onto the
+    layout can define a ``from_values(values)`` classmethod that gets the unpacked record instead.
+    """
+
+    def __init__(self, data_class: Type[T], layout: StructLayout, data: memoryview | bytes, count: int):
+        self.data_class = data_class
+        self.layout = layout
+        self._data = data
+        self._count = count
+        self._records: Optional[np.ndarray] = None
+        self._make: Callable[[tuple], T] = _record_factory(data_class)
+
+    @property
+    def records(self) -> np.ndarray:
+        if self._records is None:
+            self._records = self.layout.records(self._data, self._count)
+        return self._records
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("StructArray index out of range")
+        return self._make(self.layout.unpack_from(self._data, index * self.layout.size))
+
+    def __iter__(self) -> Iterator[T]:
+        make = self._make
+        for values in self.layout.iter_unpack(self._data):
+            yield make(values)
+
+    def __repr__(self):
+        return f"<StructArray of {self._count} {self.data_class.__name__}>"
+
+
+def struct_layout(*fields: tuple[Optional[str], str], endian: str = "<"):
+    """Class decorator attaching a :class:`StructLayout` to a dataclass as ``LAYOUT``.
+
+    Named fields have to follow the dataclass field order. Classes without their own ``from_buffer``
+    get one reading a single record, extra arguments (like BSP ``version, bsp``) are accepted and ignored.
+    """
+    layout = StructLayout(fields, endian)
+
+    def decorator(cls: Type[T]) -> Type[T]:
+        cls.LAYOUT = layout
+        if "from_buffer" not in cls.__dict__:
+            cls.from_buffer = classmethod(_layout_from_buffer)
+        return cls
+
+    return decorator
+
+
+def _record_factory(data_class: Type[T]) -> Callable[[tuple], T]:
+    from_values = getattr(data_class, "from_values", None)
+    if from_values is not None:
+        return from_values
+    return lambda values: data_class(*values)
+
+
+def _layout_from_buffer(cls, buffer, *_):
+    return _record_factory(cls)(cls.LAYOUT.read_from(buffer))
@@ -0,0 +1,76 @@
+import struct
+
+from SourceIO.library.source1.bsp.bsp_scanner import scan_bsp, scan_bsp_directory, scan_cache_path
+from SourceIO.library.utils import TinyPath
+
+HEADER_SIZE = 8 + 64 * 16 + 4
+MODELS = ["models/props/crate01.mdl", "models/props/barrel01.mdl"]
+
+
+def _game_lump(offset: int, layout: str) -> bytes:
+    """Game lump holding only a sprp lump with a model dictionary, in the given header layout."""
+    prop_data = struct.pack("<i", len(MODELS)) + b"".join(name.encode("ascii").ljust(128, b"\0") for name in MODELS)
+    header_size = 16 if layout == "generic" else 20
+    prop_offset = offset + 4 + header_size
+    if layout == "generic":
+        header = struct.pack("<4sHHii", b"prps", 0, 10, prop_offset, len(prop_data))
+    elif layout == "dark_messiah":
+        header = struct.pack("<i4sHHii", 0, b"prps", 0, 10, prop_offset, len(prop_data))
+    else:
+        header = struct.pack("<4sIIii", b"prps", 0, 10, prop_offset, len(prop_data))
+    return struct.pack("<i", 1) + header + prop_data
+
+
+def _write_bsp(filepath, version: int = 20, game_lump_layout: str = "generic", entities: bytes = None,
+               compressed_entities: bool = False):
+    if entities is None:
+        entities = b'{\n"classname" "worldspawn"\n"skyname" "sky_day01"\n}\n{\n"classname" "light"\n}\n\0'
+    lumps = {0: entities, 43: b"BRICK/WALL01\0TOOLS/NODRAW\0"}
+    data = bytearray()
+    infos = {}
+    for lump_id in sorted((0, 35, 43)):
+        offset = HEADER_SIZE + len(data)
+        payload = _game_lump(offset, game_lump_layout) if lump_id == 35 else lumps[lump_id]
+        infos[lump_id] = (offset, len(payload), 123 if lump_id == 0 and compressed_entities else 0)
+        data += payload
+    header = bytearray(b"VBSP" + struct.pack("<i", version))
+    for lump_id in range(64):
+        offset, size, decompressed_size = infos.get(lump_id, (0, 0, 0))
+        header += struct.pack("<iiiI", offset, size, 0, decompressed_size)
+    header += struct.pack("<i", 7)
+    filepath.write_bytes(bytes(header) + bytes(data))
+    return TinyPath(filepath)
+
+
+def test_scan_bsp_reads_summary(tmp_path):
+    summary = scan_bsp(_write_bsp(tmp_path / "test.bsp"))
+    assert summary.version == (20, 0)
+    assert summary.revision == 7
+    assert summary.entity_classes == {"worldspawn": 1, "light": 1}
+    assert summary.worldspawn["skyname"] == "sky_day01"
+    assert summary.materials == ["BRICK/WALL01", "TOOLS/NODRAW"]
+    assert summary.static_prop_models == MODELS
+
+
+def test_scan_bsp_game_lump_layouts(tmp_path):
+    dark_messiah = _write_bsp(tmp_path / "dm.bsp", version=(4 << 16) | 20, game_lump_layout="dark_messiah")
+    assert scan_bsp(dark_messiah).static_prop_models == MODELS
+    vindictus = _write_bsp(tmp_path / "vindictus.bsp", game_lump_layout="vindictus")
+    assert scan_bsp(vindictus).static_prop_models == MODELS
+
+
+def test_scan_bsp_broken_lzma_lump(tmp_path):
+    broken = b"LZMA" + struct.pack("<II", 123, 16) + bytes(5) + b"\xFF" * 16
+    assert scan_bsp(_write_bsp(tmp_path / "broken.bsp", entities=broken, compressed_entities=True)) is None
+
+
+def test_scan_cache_in_user_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    maps = tmp_path / "maps"
+    maps.mkdir()
+    _write_bsp(maps / "test.bsp")
+    summaries = scan_bsp_directory(TinyPath(maps))
+    assert [summary.static_prop_models for summary in summaries] == [MODELS]
+    assert [path.name for path in maps.iterdir()] == ["test.bsp"]
+    assert scan_cache_path(TinyPath(maps)).exists()
+    assert scan_bsp_directory(TinyPath(maps))[0].materials == summaries[0].materials
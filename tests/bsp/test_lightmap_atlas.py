@@ -0,0 +1,62 @@
+import numpy as np
+
+from SourceIO.library.source1.bsp.datatypes.face import Face
+from SourceIO.library.source1.bsp.lightmap_atlas import build_lightmap_atlas, pack_shelves
+from SourceIO.library.source1.bsp.lumps.lightmap_lump import lightmap_dtype
+
+
+def _overlaps(pages, offsets, sizes) -> bool:
+    for i in range(len(sizes)):
+        for j in range(i + 1, len(sizes)):
+            if pages[i] != pages[j]:
+                continue
+            (ax, ay), (bx, by) = offsets[i], offsets[j]
+            (aw, ah), (bw, bh) = sizes[i], sizes[j]
+            if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                return True
+    return False
+
+
+def test_pack_shelves():
+    rng = np.random.default_rng(3)
+    sizes = rng.integers(1, 17, (200, 2))
+    pages, offsets, page_heights = pack_shelves(sizes, 64)
+    assert len(page_heights) == pages.max() + 1
+    assert (offsets >= 0).all()
+    assert (offsets + sizes <= 64).all()
+    for page, height in enumerate(page_heights):
+        on_page = pages == page
+        assert (offsets[on_page, 1] + sizes[on_page, 1]).max() == height
+    assert not _overlaps(pages, offsets, sizes)
+
+
+def test_pack_shelves_empty():
+    pages, offsets, page_heights = pack_shelves(np.zeros((0, 2), np.int64), 64)
+    assert len(pages) == 0 and page_heights == []
+
+
+def test_build_lightmap_atlas():
+    faces = np.zeros(3, Face.LAYOUT.dtype)
+    samples = np.zeros(2 * 3 + 4 * 1, lightmap_dtype)
+    # 2x3 luxels, then an unlit face, then 4x1 luxels
+    faces[0]["lightmap_width"], faces[0]["lightmap_height"], faces[0]["light_offset"] = 1, 2, 0
+    faces[1]["light_offset"] = -1
+    faces[2]["lightmap_width"], faces[2]["lightmap_height"], faces[2]["light_offset"] = 3, 0, 6 * 4
+    samples["r"][:, 0] = np.arange(len(samples)) * 10
+    samples["g"][:, 0] = 255
+    samples["e"][:, 0] = 0
+    atlas = build_lightmap_atlas(faces, samples, page_size=8)
+
+    assert atlas.page.tolist() == [0, -1, 0]
+    page = atlas.pages[0]
+    for face_id, (width, height, first) in ((0, (2, 3, 0)), (2, (4, 1, 6))):
+        x, y = atlas.offsets[face_id]
+        block = page[y:y + height, x:x + width]
+        expected_red = (first + np.arange(width * height)).reshape((height, width)) * 10 / 255
+        assert np.allclose(block[..., 0], expected_red)
+        assert np.allclose(block[..., 1], 1)
+        assert (block[..., 3] == 1).all()
+    # Luxel centers of the unlit face map to nothing
+    assert (atlas.uvs(np.array([1]), np.zeros((1, 2))) == 0).all()
+    uv = atlas.uvs(np.array([0]), np.array([[0.0, 0.0]]))[0]
+    assert np.allclose(uv, (atlas.offsets[0] + 0.5) / (page.shape[1], page.shape[0]))
@@ -0,0 +1,75 @@
+import lzma
+import struct
+
+from SourceIO.library.source1.bsp.lump import Lump, LumpDecompressor
+from SourceIO.library.utils import MemoryBuffer
+
+
+def _lzma_lump(data: bytes) -> MemoryBuffer:
+    filters = [{"id": lzma.FILTER_LZMA1, "dict_size": 1 << 16}]
+    compressed = lzma.compress(data, lzma.FORMAT_RAW, filters=filters)
+    # noinspection PyProtectedMember
+    properties = lzma._encode_filter_properties(filters[0])
+    return MemoryBuffer(b"LZMA" + struct.pack("<II", len(data), len(compressed)) + properties + compressed)
+
+
+def test_decompress_lump():
+    data = bytes(range(256)) * 64
+    assert Lump.decompress_lump(_lzma_lump(data)).data == data
+
+
+def test_decompressor_pops_submitted_lumps():
+    decompressor = LumpDecompressor(2, 1 << 20)
+    lumps = {lump_id: bytes([lump_id]) * (1000 + lump_id) for lump_id in range(6)}
+    for lump_id, data in lumps.items():
+        assert decompressor.submit(lump_id, _lzma_lump(data), len(data))
+    assert decompressor.pop(100) is None
+    for lump_id, data in lumps.items():
+        assert decompressor.pop(lump_id).data == data
+    assert decompressor.reserved_bytes == 0
+    assert decompressor._executor is None
+
+
+def test_decompressor_budget_and_close():
+    decompressor = LumpDecompressor(1, 3000)
+    data = b"a" * 2000
+    assert decompressor.submit(0, _lzma_lump(data), len(data))
+    assert not decompressor.submit(1, _lzma_lump(data), len(data))
+    decompressor.close()
+    assert decompressor.reserved_bytes == 0
+    assert decompressor.pop(0) is None
+    assert decompressor._executor is None
+
+
+def test_decompressor_disabled():
+    decompressor = LumpDecompressor(0, 1 << 20)
+    assert not decompressor.submit(0, _lzma_lump(b"a"), 1)
+
+
+def test_eager_mode_skips_lumps_without_a_class():
+    import SourceIO.library.source1.bsp.lumps  # noqa, registers lump classes
+    from SourceIO.library.global_config import Source1BSPConfig
+    from SourceIO.library.shared.app_id import SteamAppId
+    from SourceIO.library.source1.bsp.bsp_file import BSPInfo, VBSPFile
+    from SourceIO.library.source1.bsp.lump import ValveLumpInfo
+    from SourceIO.library.utils import TinyPath
+
+    data = bytes(20 * 8)
+    compressed = _lzma_lump(data).data
+    lumps = [ValveLumpInfo(lump_id, 0, 0, 0, 0) for lump_id in range(64)]
+    # LUMP_PLANES has a parser, LUMP_VISIBILITY does not
+    for lump_id in (1, 4):
+        lumps[lump_id] = ValveLumpInfo(lump_id, 0, len(compressed), 0, len(data))
+    config = Source1BSPConfig()
+    eager = config.eager_lump_decompression
+    config.eager_lump_decompression = True
+    try:
+        bsp = VBSPFile(BSPInfo("VBSP", (20, 0), lumps, 0, SteamAppId.UNKNOWN), TinyPath("/nonexistent/map.bsp"),
+                       MemoryBuffer(compressed), False)
+        bsp.start_decompression()
+    finally:
+        config.eager_lump_decompression = eager
+    assert set(bsp.decompressor._pending) == {1}
+    assert bsp.get_lump("LUMP_PLANES").planes[0].dist == 0
+    bsp.close()
+    assert bsp.decompressor is None
@@ -0,0 +1,104 @@
+import struct
+
+import numpy as np
+import pytest
+
+from SourceIO.library.source1.bsp.lump import ValveLumpInfo
+from SourceIO.library.source1.bsp.lumps.face_lump import FaceLump
+from SourceIO.library.source1.bsp.lumps.node_lump import NodeLump, VNodeLump
+from SourceIO.library.source1.bsp.lumps.plane_lump import PlaneLump, Quake3PlaneLump
+from SourceIO.library.utils import FileBuffer, MemoryBuffer
+
+# Size of the header of an external <map>_l_N.lmp file, lump data starts right after it
+LMP_HEADER = 20
+
+
+def _rows(fmt: str, count: int, seed: int) -> list[tuple]:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(count):
+        values = []
+        for code in fmt:
+            if code == "f":
+                values.append(float(np.float32(rng.uniform(-4096, 4096))))
+            elif code == "h":
+                values.append(int(rng.integers(-32768, 32768)))
+            elif code == "H":
+                values.append(int(rng.integers(0, 65536)))
+            elif code == "I":
+                values.append(int(rng.integers(0, 1 << 32)))
+            elif code == "b":
+                values.append(int(rng.integers(-128, 128)))
+            elif code == "B":
+                values.append(int(rng.integers(0, 256)))
+            elif code == "i":
+                values.append(int(rng.integers(-(1 << 31), 1 << 31)))
+        rows.append(tuple(values))
+    return rows
+
+
+def _lump_buffers(data: bytes, tmp_path):
+    """The same lump as a slice of the map and as an external .lmp file positioned after its header."""
+    yield MemoryBuffer(data)
+    lmp_path = tmp_path / "map_l_0.lmp"
+    lmp_path.write_bytes(b"\xAB" * LMP_HEADER + data)
+    buffer = FileBuffer(lmp_path)
+    buffer.seek(LMP_HEADER)
+    yield buffer
+
+
+def _parse(lump_class, version: int, buffer):
+    return lump_class(ValveLumpInfo(0, 0, buffer.size(), version, 0)).parse(buffer, None)
+
+
+@pytest.mark.parametrize("lump_class, fmt", [(PlaneLump, "ffffi"), (Quake3PlaneLump, "ffff")])
+def test_plane_lump_matches_struct(tmp_path, lump_class, fmt):
+    rows = _rows(fmt, 37, 1)
+    data = b"".join(struct.pack("<" + fmt, *row) for row in rows)
+    for buffer in _lump_buffers(data, tmp_path):
+        planes = _parse(lump_class, 0, buffer).planes
+        assert len(planes) == len(rows)
+        for plane, row in zip(planes, rows):
+            assert tuple(plane.normal) == row[:3]
+            assert plane.dist == row[3]
+            if fmt.endswith("i"):
+                assert plane.type == row[4]
+
+
+@pytest.mark.parametrize("lump_class, version, fmt", [
+    (NodeLump, 0, "iiihhhhhhHHh"),
+    (NodeLump, 1, "iiiffffffIIh"),
+    (VNodeLump, 0, "iiiiiiiiiiii"),
+])
+def test_node_lump_matches_struct(tmp_path, lump_class, version, fmt):
+    rows = _rows(fmt, 41, version)
+    pack_fmt = "<" + fmt + ("xx" if fmt[-1] == "h" and version == 0 else "")
+    data = b"".join(struct.pack(pack_fmt, *row) for row in rows)
+    for buffer in _lump_buffers(data, tmp_path):
+        nodes = _parse(lump_class, version, buffer).nodes
+        assert len(nodes) == len(rows)
+        for node, row in zip(nodes, rows):
+            assert node.plane_index == row[0]
+            assert tuple(node.childes_id) == row[1:3]
+            assert tuple(node.min) == row[3:6]
+            assert tuple(node.max) == row[6:9]
+            assert (node.first_face, node.face_count, node.area) == row[9:12]
+
+
+@pytest.mark.parametrize("version, fmt", [(0, "HBBIhhhhbbbbifiiiiiHHi"), (1, "HBBIhhhhbbbbifiiiiiHHi"),
+                                          (2, "IHHIIIiIBBBBifiiiiiIII")])
+def test_face_lump_matches_struct(tmp_path, version, fmt):
+    rows = _rows(fmt, 29, 10 + version)
+    data = b"".join(struct.pack("<" + fmt, *row) for row in rows)
+    for buffer in _lump_buffers(data, tmp_path):
+        faces = _parse(FaceLump, version, buffer).faces
+        assert len(faces) == len(rows)
+        for face, row in zip(faces, rows):
+            prim_count = (row[19] >> 1) & 0x7FFFFFFF if version == 2 else row[19]
+            assert (face.plane_index, face.side, face.on_node, face.first_edge, face.edge_count) == row[:5]
+            assert (face.tex_info_id, face.disp_info_id, face.surface_fog_volume_id) == row[5:8]
+            assert tuple(face.styles) == row[8:12]
+            assert (face.light_offset, face.area) == row[12:14]
+            assert tuple(face.lightmap_texture_mins_in_luxels) == row[14:16]
+            assert (face.lightmap_width, face.lightmap_height, face.orig_face) == row[16:19]
+            assert (face.prim_count, face.first_prim_id, face.smoothing_groups) == (prim_count, *row[20:22])
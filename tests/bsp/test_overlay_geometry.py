@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from SourceIO.library.source1.bsp.datatypes.face import Face
+from SourceIO.library.source1.bsp.datatypes.overlay import Overlay
+from SourceIO.library.source1.bsp.datatypes.plane import ValvePlane
+from SourceIO.library.source1.bsp.overlay_geometry import (OVERLAY_SURFACE_OFFSET, build_overlay_geometry,
+                                                           clip_convex_polygons, overlay_arrays)
+
+
+def _area(points: np.ndarray) -> float:
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def _square(size: float) -> np.ndarray:
+    return np.array([(0, 0), (size, 0), (size, size), (0, size)], np.float64)
+
+
+def test_clip_many_polygons():
+    slots = 8
+    points = np.zeros((3, slots, 2))
+    counts = np.array([4, 4, 3])
+    points[0, :4] = _square(2)
+    points[1, :4] = _square(2) + 10
+    points[2, :3] = ((0, 0), (4, 0), (0, 4))
+    planes = np.zeros((3, 2, 3))
+    # Polygon 0 keeps x >= 1 and y <= 1, polygon 1 is entirely outside, polygon 2 has nothing to clip
+    planes[0, 0] = (1, 0, 1)
+    planes[0, 1] = (0, -1, -1)
+    planes[1, 0] = (1, 0, 100)
+
+    clipped, clipped_counts = clip_convex_polygons(points, counts, planes)
+    assert clipped_counts.tolist() == [4, 0, 3]
+    corners = clipped[0, :4]
+    assert np.allclose(sorted(map(tuple, corners)), [(1, 0), (1, 1), (2, 0), (2, 1)])
+    assert np.isclose(_area(corners), 1)
+    assert np.allclose(clipped[2, :3], points[2, :3])
+
+
+def test_clip_adds_corner():
+    points = np.zeros((1, 6, 2))
+    points[0, :4] = _square(2)
+    planes = np.array([[(-1, -1, -3)]], np.float64)
+    # x + y <= 3 cuts one corner off, the square becomes a pentagon
+    clipped, counts = clip_convex_polygons(points, np.array([4]), planes)
+    assert counts.tolist() == [5]
+    assert np.isclose(_area(clipped[0, :5]), 4 - 0.5)
+
+
+def _one_quad_map(v_flipped: bool, render_order: int = 0):
+    """A 64x64 floor face at z=0 and one 16x8 overlay floating 5 units above its middle."""
+    faces = np.zeros(1, Face.LAYOUT.dtype)
+    faces[0]["edge_count"] = 4
+    faces[0]["disp_info_id"] = -1
+    planes = np.zeros(1, ValvePlane.LAYOUT.dtype)
+    planes[0]["normal"] = (0, 0, 1)
+    vertices = np.array([(0, 0, 0), (64, 0, 0), (64, 64, 0), (0, 64, 0)], np.float32)
+    edges = np.array([(0, 1), (1, 2), (2, 3), (3, 0)], np.int64)
+    surf_edges = np.arange(4, dtype=np.int64)
+
+    uv_points = np.zeros((4, 3), np.float32)
+    uv_points[:, :2] = ((-8, -4), (-8, 4), (8, 4), (8, -4))
+    uv_points[:3, 2] = (1, 0, 0)
+    uv_points[3, 2] = 1 if v_flipped else 0
+    overlay = Overlay(0, 0, 1 | (render_order << 14), (0,) + (-1,) * 63, (0, 1), (0, 1), uv_points,
+                      (32, 32, 5), (0, 0, 1))
+    return build_overlay_geometry(overlay_arrays([overlay]), faces, planes, vertices, edges, surf_edges)
+
+
+@pytest.mark.parametrize("v_flipped", [False, True])
+def test_build_overlay_geometry(v_flipped):
+    geometry = _one_quad_map(v_flipped)
+    assert geometry.loop_totals.tolist() == [4]
+    assert geometry.polygon_overlays.tolist() == [0]
+    # uv x runs along basis U (world +x), uv y along basis V, which is N x U = +y unless flagged flipped
+    v_sign = -1 if v_flipped else 1
+    expected = {(32 + x, 32 + v_sign * y): uv for (x, y), uv in zip(((-8, -4), (-8, 4), (8, 4), (8, -4)),
+                                                                    ((0, 0), (0, 1), (1, 1), (1, 0)))}
+    positions = geometry.positions
+    # Projected from z=5 down onto the face, then lifted off it to avoid z-fighting
+    assert np.allclose(positions[:, 2], OVERLAY_SURFACE_OFFSET)
+    for position, uv in zip(positions, geometry.uvs):
+        assert np.allclose(uv, expected[tuple(np.round(position[:2]).astype(int).tolist())])
+    # Wound counter-clockwise around the overlay normal
+    assert np.cross(positions[1] - positions[0], positions[2] - positions[1])[2] > 0
+
+
+def test_render_order_lift():
+    geometry = _one_quad_map(False, render_order=2)
+    assert np.allclose(geometry.positions[:, 2], 3 * OVERLAY_SURFACE_OFFSET)
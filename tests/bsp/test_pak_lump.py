@@ -0,0 +1,51 @@
+import io
+import struct
+import zipfile
+
+from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.source1.bsp.bsp_file import VBSPFile
+from SourceIO.library.utils import FileBuffer, MMapBuffer, TinyPath
+
+
+class _ContentManager:
+    @staticmethod
+    def get_steamid_from_asset(_):
+        return SteamAppId.UNKNOWN
+
+
+def _write_map(path, files: dict[str, bytes]):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_STORED) as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+    pak = archive.getvalue()
+    header_size = 8 + 64 * 16 + 4
+    # Put the pak past the first allocation granularity boundary, so the mapping has to be aligned
+    pak_offset = header_size + 70000
+    lumps = [(0, 0, 0, 0)] * 64
+    lumps[40] = (pak_offset, len(pak), 0, 0)
+    header = b"VBSP" + struct.pack("<i", 20) + b"".join(struct.pack("<iiiI", *lump) for lump in lumps)
+    header += struct.pack("<i", 1)
+    path.write_bytes(header + b"\0" * (pak_offset - len(header)) + pak)
+
+
+def test_pak_lump_is_mapped_in_place(tmp_path):
+    import SourceIO.library.source1.bsp.lumps  # noqa, registers lump classes
+    files = {"materials/test.vmt": b"LightmappedGeneric {}", "maps/test.txt": b"x" * 100}
+    map_path = tmp_path / "test.bsp"
+    _write_map(map_path, files)
+    with FileBuffer(map_path) as buffer:
+        bsp = VBSPFile.from_buffer(TinyPath(map_path), buffer, _ContentManager())
+        pak = bsp.get_lump("LUMP_PAK")
+    assert isinstance(pak._mapping, MMapBuffer)
+    for name, data in files.items():
+        assert pak.check(TinyPath(name.upper()))
+        assert bytes(pak.find_file(TinyPath(name)).data) == data
+
+    member = pak.find_file(TinyPath("maps/test.txt"))
+    pak.clean()
+    assert pak._mapping is None
+    # Buffers handed out before clean stay readable, later reads map the lump again
+    assert bytes(member.data) == files["maps/test.txt"]
+    assert bytes(pak.find_file(TinyPath("materials/test.vmt")).data) == files["materials/test.vmt"]
+    pak.clean()
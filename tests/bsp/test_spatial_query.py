@@ -0,0 +1,73 @@
+import struct
+
+import numpy as np
+
+from SourceIO.library.source1.bsp.datatypes.face import Face
+from SourceIO.library.source1.bsp.lump import ValveLumpInfo
+from SourceIO.library.source1.bsp.lumps.node_lump import NodeLump
+from SourceIO.library.source1.bsp.spatial_query import BSPRegion, BSPSpatialIndex, box_planes
+from SourceIO.library.utils import MemoryBuffer
+
+FACE_COUNT = 40010
+
+
+def _triangle_faces(corners: dict[int, tuple[float, float, float]]):
+    """Face records where only the listed faces are triangles, with the given minimum corner."""
+    faces = np.zeros(FACE_COUNT, Face.LAYOUT.dtype)
+    vertices, edges, surf_edges = [], [], []
+    for face_id, corner in corners.items():
+        base = len(vertices)
+        vertices.extend(np.asarray(corner, np.float32) + offset for offset in ((0, 0, 0), (1, 0, 0), (0, 1, 0)))
+        faces[face_id]["first_edge"] = len(surf_edges)
+        faces[face_id]["edge_count"] = 3
+        for i in range(3):
+            surf_edges.append(len(edges))
+            edges.append((base + i, base + (i + 1) % 3))
+    return (faces, np.array(vertices, np.float32), np.array(edges, np.int64).reshape((-1, 2)),
+            np.array(surf_edges, np.int64))
+
+
+def test_faces_past_int16_are_found():
+    # Version 0 nodes store first_face and face_count as unsigned shorts
+    data = struct.pack("<iiihhhhhhHHhxx", 0, 1, -1, -2048, -2048, -2048, 2048, 2048, 2048, 0, 40000, 0)
+    data += struct.pack("<iiihhhhhhHHhxx", 0, -1, -1, -2048, -2048, -2048, 2048, 2048, 2048, 40000, 10, 0)
+    nodes = NodeLump(ValveLumpInfo(0, 0, len(data), 0, 0)).parse(MemoryBuffer(data), None).nodes.records
+    assert nodes["face_count"].tolist() == [40000, 10]
+
+    faces, vertices, edges, surf_edges = _triangle_faces({5: (0, 0, 0), 39990: (1000, 1000, 0),
+                                                          40005: (10, 10, 0)})
+    index = BSPSpatialIndex(nodes, faces, np.array([[(-2048,) * 3, (2048,) * 3]], np.float32),
+                            np.array([0], np.int64), np.array([(0, FACE_COUNT)], np.int64),
+                            vertices, edges, surf_edges)
+    assert index.faces_in(box_planes((-16, -16, -16), (64, 64, 16))).tolist() == [5, 40005]
+    assert index.faces_in(box_planes((900, 900, -16), (1100, 1100, 16))).tolist() == [39990]
+
+
+def _perspective(fov_y: float, aspect: float, near: float, far: float) -> np.ndarray:
+    """OpenGL style projection, the camera looks down -z."""
+    f = 1 / np.tan(np.radians(fov_y) / 2)
+    return np.array([[f / aspect, 0, 0, 0],
+                     [0, f, 0, 0],
+                     [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+                     [0, 0, -1, 0]])
+
+
+def test_frustum_region(monkeypatch):
+    view = np.eye(4)
+    view[:3, 3] = (-100, 0, 0)  # camera at x=100
+    view_projection = _perspective(90, 2, 1, 1000) @ view
+    monkeypatch.setattr(BSPSpatialIndex, "from_bsp", classmethod(lambda cls, bsp: "index"))
+    region = BSPRegion.from_frustum(None, view_projection)
+    assert region.index == "index" and region.planes.shape == (6, 4)
+    points = np.array([(100, 0, -10),  # straight ahead
+                       (100, 0, -999),  # just before the far plane
+                       (100, 30, -40),  # inside the 90 degree vertical fov
+                       (100 + 70, 0, -40),  # inside the wider horizontal fov
+                       (100, 0, 10),  # behind the camera
+                       (100, 0, -0.5),  # before the near plane
+                       (100, 0, -1001),  # past the far plane
+                       (100, 50, -40),  # above the vertical fov
+                       (100 + 90, 0, -40)])  # right of the horizontal fov
+    assert region.contains(points).tolist() == [True] * 4 + [False] * 5
+    assert region.overlaps(np.array([(90, -5, -1100)]), np.array([(110, 5, -900)])).tolist() == [True]
+    assert region.overlaps(np.array([(90, -5, 5)]), np.array([(110, 5, 50)])).tolist() == [False]
@@ -0,0 +1,76 @@
+import struct
+from types import SimpleNamespace
+
+import pytest
+
+from SourceIO.library.shared.app_id import SteamAppId
+from SourceIO.library.source1.bsp.datatypes.game_lump_header import GameLumpHeader
+from SourceIO.library.source1.bsp.datatypes.static_prop_lump import (STATIC_PROP_LAYOUTS, StaticPropFlag,
+                                                                     StaticPropLump, static_prop_layout)
+from SourceIO.library.utils import MemoryBuffer
+
+# Record sizes of the per-version readers the layouts replaced
+RECORD_SIZES = {"v4": 56, "v5": 60, "v6": 64, "v6_dm": 136, "v7_l4d": 68, "v8": 68, "v9": 72, "v10": 72,
+                "v10_csgo": 76, "v11_lite": 76, "v11": 80, "v11_csgo": 80, "v12": 84, "v13_strata": 88}
+
+BASE = struct.pack("<3f3f3H2Bi2f3f", 1, 2, 3, 10, 20, 30, 1, 5, 2, 6, 0x3, 2, 100, 200, 4, 5, 6)
+
+
+@pytest.mark.parametrize("name, size", RECORD_SIZES.items())
+def test_layout_sizes(name, size):
+    assert STATIC_PROP_LAYOUTS[name].size == size
+
+
+@pytest.mark.parametrize("version, bsp_version, size, app_id, name", [
+    (6, (20, 4), 136, SteamAppId.UNKNOWN, "v6_dm"),
+    (7, (20, 0), 68, SteamAppId.LEFT_4_DEAD, "v7_l4d"),
+    (7, (20, 0), 72, SteamAppId.TEAM_FORTRESS_2, "v10"),
+    (10, (21, 0), 76, SteamAppId.COUNTER_STRIKE_GO, "v10_csgo"),
+    (11, (21, 0), 80, SteamAppId.COUNTER_STRIKE_GO, "v11_csgo"),
+    (11, (20, 0), 76, SteamAppId.BLACK_MESA, "v11_lite"),
+    (6, (20, 0), 60, SteamAppId.VINDICTUS, "v5"),
+    (7, (20, 0), 64, SteamAppId.VINDICTUS, "v6"),
+    (11, (20, 0), 80, SteamAppId.UNKNOWN, "v11"),
+    (13, (20, 0), 88, SteamAppId.UNKNOWN, "v13_strata"),
+])
+def test_layout_selection(version, bsp_version, size, app_id, name):
+    assert static_prop_layout(version, bsp_version, size, app_id) is STATIC_PROP_LAYOUTS[name]
+
+
+def test_unknown_version():
+    assert static_prop_layout(3, (20, 0), 40, SteamAppId.UNKNOWN) is None
+
+
+def _parse_sprp(version: int, records: bytes, count: int) -> StaticPropLump:
+    models = struct.pack("<i", 2) + b"models/a.mdl".ljust(128, b"\0") + b"models/b.mdl".ljust(128, b"\0")
+    leafs = struct.pack("<i3H", 3, 7, 8, 9)
+    data = models + leafs + struct.pack("<i", count) + records
+    bsp = SimpleNamespace(info=SimpleNamespace(steam_app_id=SteamAppId.UNKNOWN, version=(20, 0)))
+    lump = StaticPropLump(GameLumpHeader("sprp", 0, version, 0, len(data)))
+    lump.parse(MemoryBuffer(data), bsp)
+    return lump
+
+
+def test_parse_v5_records():
+    record = BASE + struct.pack("<f", 0.5)
+    lump = _parse_sprp(5, record * 2, 2)
+    assert lump.model_names == ["models/a.mdl", "models/b.mdl"]
+    assert lump.leafs.tolist() == [7, 8, 9]
+    assert lump.origins.tolist() == [[1, 2, 3]] * 2
+    assert lump.prop_types.tolist() == [1, 1]
+    prop = lump.static_props[1]
+    assert prop.rotation == (10, 20, 30)
+    assert (prop.first_leaf, prop.leaf_count, prop.solid, prop.skin) == (5, 2, 6, 2)
+    assert prop.flags == StaticPropFlag.FLAG_FADES | StaticPropFlag.USE_LIGHTING_ORIGIN
+    assert prop.forced_fade_scale == 0.5
+    assert lump.uniform_scales.tolist() == [1, 1]
+
+
+def test_parse_v10_flags_follow_dx_levels():
+    # The byte flags of the base fields are unused from v10 on, the uint32 after the DX levels wins
+    record = BASE + struct.pack("<f2HI2H", 1.0, 80, 95, StaticPropFlag.NO_SHADOW, 32, 32)
+    lump = _parse_sprp(10, record, 1)
+    prop = lump.static_props[0]
+    assert prop.flags == StaticPropFlag.NO_SHADOW
+    assert (prop.min_dx_level, prop.max_dx_level, prop.lightmap_resolution) == (80, 95, (32, 32))
+    assert lump.flags.tolist() == [StaticPropFlag.NO_SHADOW]
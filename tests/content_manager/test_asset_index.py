@@ -0,0 +1,66 @@
+import os
+
+from SourceIO.library.global_config import ContentManagerConfig
+from SourceIO.library.shared.content_manager import ContentManager
+from SourceIO.library.shared.content_manager.asset_index import AssetIndex, asset_key, index_file_path
+from SourceIO.library.shared.content_manager.providers.loose_files import LooseFilesContentProvider
+from SourceIO.library.utils import TinyPath
+
+
+def _game_folder(tmp_path) -> TinyPath:
+    root = tmp_path / "game"
+    (root / "materials" / "Brick").mkdir(parents=True)
+    (root / "materials" / "Brick" / "Wall01.VMT").write_text("LightmappedGeneric {}")
+    (root / "models").mkdir()
+    (root / "models" / "crate.mdl").write_bytes(b"IDST")
+    return TinyPath(root)
+
+
+def test_asset_key():
+    assert asset_key(TinyPath("Materials/Brick/Wall01.VMT")) == "materials/brick/wall01.vmt"
+    assert asset_key("\\materials\\brick\\wall01.vmt") == "materials/brick/wall01.vmt"
+
+
+def test_index_is_written_to_cache_folder(tmp_path):
+    config = ContentManagerConfig()
+    config.asset_index_dir = str(tmp_path / "cache")
+    try:
+        root = _game_folder(tmp_path)
+        before = sorted(os.listdir(root))
+        index_path = index_file_path(root)
+        assert index_path.parent == TinyPath(tmp_path / "cache")
+        assert index_file_path(TinyPath(tmp_path / "other" / "game")) != index_path
+
+        provider = LooseFilesContentProvider(root)
+        asset_index = AssetIndex.load(index_path)
+        asset_index.providers[str(root)] = provider.build_index()
+        asset_index.dirty = True
+        asset_index.save()
+        assert sorted(os.listdir(root)) == before
+        loaded = AssetIndex.load(index_path).get(provider)
+        assert set(loaded.files) == {"materials/Brick/Wall01.VMT", "models/crate.mdl"}
+    finally:
+        config.asset_index_dir = None
+
+
+def test_index_lookups_are_case_insensitive_and_lazy(tmp_path):
+    config = ContentManagerConfig()
+    config.asset_index_dir = str(tmp_path / "cache")
+    content_manager = ContentManager()
+    try:
+        root = _game_folder(tmp_path)
+        provider = LooseFilesContentProvider(root)
+        content_manager.add_child(provider)
+        content_manager._load_asset_index([provider])
+        # Nothing is pushed through the LRU up front
+        assert len(content_manager._owner_cache) == 0
+        assert content_manager._cached_owner(TinyPath("MATERIALS/brick/wall01.vmt")) is provider
+        assert content_manager.check(TinyPath("models/crate.mdl"))
+        # Answered by the exists cache, whatever case the caller used
+        assert content_manager.check(TinyPath("Models/Crate.MDL"))
+        assert not content_manager.check(TinyPath("materials/missing.vmt"))
+        assert not content_manager.check(TinyPath("Materials/Missing.VMT"))
+        assert not list(root.glob(".sourceio_index_*"))
+    finally:
+        content_manager.clean()
+        config.asset_index_dir = None
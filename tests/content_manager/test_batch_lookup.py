@@ -0,0 +1,45 @@
+import types
+
+from SourceIO.library.shared.content_manager import ContentManager
+from SourceIO.library.shared.content_manager.providers.loose_files import LooseFilesContentProvider
+from SourceIO.library.utils import TinyPath
+
+
+def test_batch_lookups(tmp_path):
+    root = tmp_path / "game"
+    (root / "materials" / "brick").mkdir(parents=True)
+    for name in ("wall01.vmt", "wall02.vmt"):
+        (root / "materials" / "brick" / name).write_text(name)
+    content_manager = ContentManager()
+    try:
+        provider = LooseFilesContentProvider(TinyPath(root))
+        content_manager.add_child(provider)
+        paths = [TinyPath(f"materials/brick/{name}.vmt") for name in ("wall01", "wall02", "missing")]
+
+        owners = content_manager.find_owners(paths)
+        assert owners == {paths[0]: provider, paths[1]: provider, paths[2]: None}
+        # Same contract as ContentProvider.check_many
+        assert content_manager.check_many(paths) == {paths[0], paths[1]}
+
+        files = content_manager.find_files(paths, do_not_cache=True)
+        assert isinstance(files, types.GeneratorType)
+        for (path, buffer), expected in zip(files, ("wall01.vmt", "wall02.vmt", None)):
+            if expected is None:
+                assert buffer is None
+            else:
+                with buffer:
+                    assert buffer.read().decode() == expected
+    finally:
+        content_manager.clean()
+
+
+def test_loose_check_many_matches_check(tmp_path):
+    root = tmp_path / "game"
+    (root / "materials" / "brick" / "subfolder.vmt").mkdir(parents=True)
+    (root / "materials" / "brick" / "Wall01.vmt").write_text("wall")
+    provider = LooseFilesContentProvider(TinyPath(root))
+    paths = [TinyPath(f"materials/brick/{name}") for name in ("Wall01.vmt", "wall01.vmt", "subfolder.vmt",
+                                                              "missing.vmt")]
+    expected = {path for path in paths if provider.check(path) and (root / path).is_file()}
+    assert provider.check_many(paths) == expected
+    assert TinyPath("materials/brick/subfolder.vmt") not in expected
@@ -0,0 +1,69 @@
+from SourceIO.library.shared.content_manager.manager import _BufferCache, _LRU
+from SourceIO.library.utils import FileBuffer, MemoryBuffer, TinyPath
+
+
+def _file_buffer(tmp_path, name: str, size: int) -> FileBuffer:
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return FileBuffer(path)
+
+
+def test_evicts_by_bytes():
+    cache = _BufferCache(100, 16)
+    for i in range(5):
+        cache.set(TinyPath(f"{i}.vmt"), MemoryBuffer(b"x" * 30))
+    assert cache.used_bytes == 90
+    assert TinyPath("0.vmt") not in cache and TinyPath("1.vmt") not in cache
+    assert cache.get(TinyPath("4.vmt")) is not None
+    cache.set(TinyPath("big.vtf"), MemoryBuffer(b"x" * 101))
+    assert TinyPath("big.vtf") not in cache
+    assert cache.rejected == 1
+
+
+def test_caps_open_files_and_closes_unused(tmp_path):
+    cache = _BufferCache(1 << 20, 2)
+    held = _file_buffer(tmp_path, "held.vmt", 10)
+    cache.set(TinyPath("held.vmt"), held)
+    prefetched = [_file_buffer(tmp_path, f"{i}.vmt", 10) for i in range(3)]
+    for i, buffer in enumerate(prefetched):
+        cache.set(TinyPath(f"{i}.vmt"), buffer, handed_out=False)
+    cache.set(TinyPath("memory.vmt"), MemoryBuffer(b"x"))
+    assert cache.open_files == 2
+    assert TinyPath("memory.vmt") in cache
+    # Handed out to a caller, eviction leaves it to them
+    assert TinyPath("held.vmt") not in cache and not held.closed
+    # Never seen by anybody, closed right away
+    assert TinyPath("0.vmt") not in cache and prefetched[0].closed
+    assert cache.closed == 1
+    # Once a lookup returned it, a prefetched buffer is the caller's too
+    assert cache.get(TinyPath("1.vmt")) is prefetched[1]
+    cache.clear()
+    assert not prefetched[1].closed and prefetched[2].closed
+    held.close()
+    prefetched[1].close()
+
+
+def test_pins_survive_budget_and_clear():
+    cache = _BufferCache(50, 16)
+    pinned = TinyPath("shared.vtf")
+    cache.pin(pinned)
+    cache.set(pinned, MemoryBuffer(b"x" * 40))
+    cache.set(TinyPath("other.vtf"), MemoryBuffer(b"x" * 40))
+    assert pinned in cache
+    cache.clear()
+    assert cache.used_bytes == 0 and pinned not in cache
+    cache.set(pinned, MemoryBuffer(b"x" * 60))
+    assert pinned in cache
+    assert cache.stats()["pinned"] == 1
+
+
+def test_meta_lru_removal_under_lock():
+    lru = _LRU(2)
+    for i in range(3):
+        lru.set(i, i)
+    assert list(lru) == [1, 2]
+    assert lru.pop(1) == 1 and lru.pop(1, None) is None
+    del lru[2]
+    lru.set(3, 3)
+    lru.clear()
+    assert lru.get(3) is None and len(lru) == 0
@@ -0,0 +1,53 @@
+import gc
+import threading
+
+from SourceIO.library.shared.content_manager.providers.vpk_provider import _MappedChunk
+from SourceIO.library.utils import TinyPath
+
+
+def _chunk(tmp_path) -> _MappedChunk:
+    path = tmp_path / "pak01_000.vpk"
+    path.write_bytes(bytes(range(256)) * 16)
+    return _MappedChunk(TinyPath(path))
+
+
+def test_closed_after_last_buffer(tmp_path):
+    chunk = _chunk(tmp_path)
+    buffer = chunk.buffer(16, 32)
+    chunk.release()
+    assert chunk._mm is not None
+    assert buffer.read(4) == bytes((16, 17, 18, 19))
+    del buffer
+    gc.collect()
+    assert chunk.refs == 0
+    assert chunk._mm is None
+
+
+def test_outliving_slice_keeps_data_readable(tmp_path):
+    chunk = _chunk(tmp_path)
+    buffer = chunk.buffer(0, 64)
+    data = buffer.data[8:12]
+    chunk.release()
+    del buffer
+    gc.collect()
+    # The chunk let go of the mapping, the slice still reads valid memory until it is collected
+    assert chunk._mm is None
+    assert bytes(data) == bytes((8, 9, 10, 11))
+
+
+def test_refs_from_many_threads(tmp_path):
+    chunk = _chunk(tmp_path)
+
+    def worker():
+        for i in range(500):
+            chunk.buffer(i % 128, 16)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    gc.collect()
+    assert chunk.refs == 0
+    chunk.release()
+    assert chunk._mm is None
@@ -0,0 +1,59 @@
+from pathlib import PurePosixPath
+
+from SourceIO.library.global_config import ContentManagerConfig
+from SourceIO.library.shared.content_manager.path_index import PathIndex
+from SourceIO.library.shared.content_manager.providers.loose_files import LooseFilesContentProvider
+from SourceIO.library.utils import TinyPath
+
+PATHS = ["scripts/shaders/base.shader", "scripts/Sky.shader", "top.shader", "materials/Brick/wall01.vmt",
+         "materials/brick/old/wall01.vmt", "materials/tools/nodraw.vmt", "models/crate.mdl"]
+
+
+def _rglob_reference(pattern: str) -> list[str]:
+    return sorted(path for path in PATHS if any(PurePosixPath(*PurePosixPath(path).parts[i:]).match(pattern)
+                                                for i in range(len(PurePosixPath(path).parts))))
+
+
+def test_prefix_and_glob():
+    index = PathIndex(PATHS)
+    assert len(index) == len(PATHS)
+    assert sorted(index.prefix("Materials/brick/")) == ["materials/Brick/wall01.vmt",
+                                                        "materials/brick/old/wall01.vmt"]
+    # fnmatch semantics, "*" crosses folders and matching is case-insensitive
+    assert sorted(index.glob("materials/*.VMT")) == sorted(path for path in PATHS if path.endswith(".vmt"))
+    assert list(index.glob("models/crate.mdl")) == ["models/crate.mdl"]
+
+
+def test_rglob_matches_pathlib():
+    index = PathIndex(PATHS)
+    for pattern in ("*.shader", "shaders/*.shader", "brick/*.vmt", "Brick/*.vmt", "wall0?.vmt", "*.mdl",
+                    "materials/*.vmt", "[st]*.shader", "missing/*"):
+        assert sorted(index.rglob(pattern)) == _rglob_reference(pattern), pattern
+    assert sorted(index.rglob("materials/**/*.vmt")) == sorted(path for path in PATHS if path.endswith(".vmt"))
+    assert sorted(index.rglob("brick/*.vmt", case_sensitive=False)) == ["materials/Brick/wall01.vmt"]
+
+
+def test_loose_glob_keeps_rglob_semantics(tmp_path):
+    for path in PATHS:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(path)
+    provider = LooseFilesContentProvider(TinyPath(tmp_path))
+    for pattern in ("*.shader", "brick/*.vmt", "materials/*.vmt"):
+        expected = sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob(pattern))
+        found = []
+        for path, buffer in provider.glob(pattern):
+            buffer.close()
+            found.append(path.as_posix())
+        assert sorted(found) == expected, pattern
+        assert sorted(path.as_posix() for path in provider.glob_paths(pattern)) == expected, pattern
+
+
+def test_loose_listing_rechecked_after_interval(tmp_path, monkeypatch):
+    (tmp_path / "a.txt").write_text("a")
+    provider = LooseFilesContentProvider(TinyPath(tmp_path))
+    assert [path.as_posix() for path in provider.glob_paths("*.txt")] == ["a.txt"]
+    (tmp_path / "b.txt").write_text("b")
+    # Within one import the listing is trusted
+    assert [path.as_posix() for path in provider.glob_paths("*.txt")] == ["a.txt"]
+    monkeypatch.setattr(ContentManagerConfig(), "loose_index_recheck_seconds", 0.0)
+    assert sorted(path.as_posix() for path in provider.glob_paths("*.txt")) == ["a.txt", "b.txt"]
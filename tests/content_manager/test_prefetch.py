@@ -0,0 +1,88 @@
+import threading
+import time
+
+from SourceIO.library.shared.content_manager.prefetch import Prefetcher
+from SourceIO.library.utils import MemoryBuffer, TinyPath
+
+
+class _Cache(dict):
+    def store(self, path, buffer):
+        self[path] = buffer
+        return True
+
+
+def _prefetcher(cache: _Cache, read, max_inflight_bytes: int, **kwargs) -> Prefetcher:
+    return Prefetcher(read, cache.store, cache.__contains__, 1, max_inflight_bytes, **kwargs)
+
+
+def test_prefetch_fills_cache():
+    cache = _Cache()
+    prefetcher = _prefetcher(cache, lambda path: MemoryBuffer(str(path).encode()), 1 << 20)
+    paths = [TinyPath(f"materials/{i}.vmt") for i in range(8)]
+    request = prefetcher.submit(paths)
+    assert request.wait(5)
+    assert set(cache) == set(paths)
+    assert prefetcher.inflight_bytes == sum(len(str(path)) for path in paths)
+    prefetcher.note_consumed(paths[0])
+    assert prefetcher.consumed == 1
+    prefetcher.shutdown()
+
+
+def test_throttle_stalls_workers_until_consumed():
+    cache = _Cache()
+    prefetcher = _prefetcher(cache, lambda path: MemoryBuffer(b"x" * 100), 100)
+    first, second = TinyPath("a.vtf"), TinyPath("b.vtf")
+    request = prefetcher.submit([first, second])
+    assert not request.wait(0.3)
+    assert first in cache and second not in cache
+    assert prefetcher.throttled == 1
+    prefetcher.note_consumed(first)
+    assert request.wait(5)
+    assert second in cache
+    prefetcher.shutdown()
+
+
+def test_wait_for_throttled_path_does_not_deadlock():
+    cache = _Cache()
+    prefetcher = _prefetcher(cache, lambda path: MemoryBuffer(b"x" * 100), 100, wait_timeout=10)
+    first, second = TinyPath("a.vtf"), TinyPath("b.vtf")
+    prefetcher.submit([first, second])
+    deadline = time.monotonic() + 5
+    while prefetcher.throttled == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Nothing frees bytes while the caller waits, the wanted path has to bypass the throttle
+    started = time.monotonic()
+    assert prefetcher.wait_for(second)
+    assert time.monotonic() - started < 5
+    assert second in cache
+    prefetcher.shutdown()
+
+
+def test_wait_for_gives_up_after_timeout():
+    cache = _Cache()
+    release = threading.Event()
+
+    def slow_read(path):
+        release.wait(5)
+        return MemoryBuffer(b"x")
+
+    prefetcher = _prefetcher(cache, slow_read, 1 << 20, wait_timeout=0.1)
+    path = TinyPath("slow.vtf")
+    prefetcher.submit([path])
+    time.sleep(0.05)
+    assert not prefetcher.wait_for(path)
+    assert prefetcher.wait_timeouts == 1
+    release.set()
+    prefetcher.shutdown()
+
+
+def test_cancel_releases_unconsumed_bytes():
+    cache = _Cache()
+    prefetcher = _prefetcher(cache, lambda path: MemoryBuffer(b"x" * 10), 1 << 20)
+    request = prefetcher.submit([TinyPath("a.vmt"), TinyPath("b.vmt")])
+    assert request.wait(5)
+    assert prefetcher.inflight_bytes == 20
+    request.cancel()
+    assert prefetcher.inflight_bytes == 0
+    assert request.cancelled
+    prefetcher.shutdown()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from SourceIO.library.goldsrc.wad import decode_miptex
+
+WIDTH, HEIGHT = 16, 8
+HEADER_SIZE = 40
+
+
+def _miptex(palette: np.ndarray) -> tuple[bytes, tuple[int, ...], list[np.ndarray]]:
+    """Miptex data from its header on, with four mip levels of increasing indices."""
+    data = bytearray(HEADER_SIZE)
+    offsets = []
+    levels = []
+    for mip in range(4):
+        width, height = WIDTH >> mip, HEIGHT >> mip
+        indices = (np.arange(width * height) + mip) % 256
+        offsets.append(len(data))
+        levels.append(indices.reshape((height, width)))
+        data += indices.astype(np.uint8).tobytes()
+    data += b"\x00\x01" + palette.astype(np.uint8).tobytes() + b"\x00\x00"
+    return bytes(data), tuple(offsets), levels
+
+
+def test_decode_every_mip():
+    palette = np.column_stack((np.arange(256), 255 - np.arange(256), np.full(256, 7)))
+    data, offsets, levels = _miptex(palette)
+    for mip, indices in enumerate(levels):
+        pixels = decode_miptex(memoryview(data), WIDTH, HEIGHT, offsets, mip)
+        assert pixels.shape == (HEIGHT >> mip, WIDTH >> mip, 4)
+        assert pixels.dtype == np.uint8
+        # Rows are stored top first, decoded bottom first
+        expected = palette[np.flip(indices, 0)]
+        assert (pixels[..., :3] == expected).all()
+        assert (pixels[..., 3] == 255).all()
+
+
+def test_decode_alpha_key():
+    palette = np.zeros((256, 3))
+    palette[-1] = (0, 0, 255)
+    palette[3] = (0, 0, 255)
+    data, offsets, levels = _miptex(palette)
+    pixels = decode_miptex(memoryview(data), WIDTH, HEIGHT, offsets, 0, use_alpha=True)
+    transparent = np.isin(np.flip(levels[0], 0), (3, 255))
+    assert (pixels[transparent] == 0).all()
+    assert (pixels[~transparent, 3] == 255).all()
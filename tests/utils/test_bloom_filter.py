@@ -0,0 +1,32 @@
+from SourceIO.library.utils.bloom_filter import BloomFilter
+
+KEYS = [f"materials/brick/wall{i:04d}.vmt" for i in range(2000)]
+
+
+def test_no_false_negatives():
+    built = BloomFilter.from_keys(KEYS)
+    added = BloomFilter(len(KEYS))
+    for key in KEYS:
+        added.add(key)
+    # Both ways of filling the filter set the same bits
+    assert built.bits == added.bits
+    assert all(key in built for key in KEYS)
+
+
+def test_error_rate_and_counters():
+    bloom = BloomFilter.from_keys(KEYS, 0.01)
+    misses = [f"models/props/crate{i:04d}.mdl" for i in range(5000)]
+    positives = sum(key in bloom for key in misses)
+    assert positives < len(misses) * 0.03
+    for _ in range(positives):
+        bloom.note_false_positive()
+    stats = bloom.stats()
+    assert stats["queries"] == len(misses)
+    assert stats["negatives"] == len(misses) - positives
+    assert stats["false_positive_rate"] == positives / len(misses)
+
+
+def test_empty_filter():
+    bloom = BloomFilter.from_keys([])
+    assert "anything" not in bloom
+    assert bloom.false_positive_rate == 0.0
@@ -0,0 +1,51 @@
+import os
+import threading
+
+from SourceIO.library.utils import TinyPath
+from SourceIO.library.utils.path_utilities import DirectoryListingCache, ProbeCache
+
+
+def _make_tree(root):
+    (root / "Materials" / "Brick").mkdir(parents=True)
+    (root / "Materials" / "Brick" / "Wall01.VMT").write_text("wall")
+
+
+def test_resolve_fixes_case(tmp_path):
+    _make_tree(tmp_path)
+    expected = TinyPath((tmp_path / "Materials" / "Brick" / "Wall01.VMT").as_posix())
+    query = TinyPath((tmp_path / "materials" / "brick" / "wall01.vmt").as_posix())
+    assert DirectoryListingCache().resolve(query) == expected
+    assert ProbeCache().resolve(query) == expected
+    assert DirectoryListingCache().resolve(TinyPath((tmp_path / "materials" / "missing.vmt").as_posix())) is None
+
+
+def test_resolve_relative_parent(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    for cache in (DirectoryListingCache(), ProbeCache()):
+        # "a/.." pops back to the working directory, not to the filesystem root
+        assert cache.resolve(TinyPath("materials/../materials/brick/wall01.vmt")) == "Materials/Brick/Wall01.VMT"
+        assert cache.resolve(TinyPath("materials/brick/../../materials/brick")) == "Materials/Brick"
+    monkeypatch.chdir(tmp_path / "Materials")
+    assert DirectoryListingCache().resolve(TinyPath("brick/../../materials/brick")) == "../Materials/Brick"
+
+
+def test_counters_are_consistent_across_threads(tmp_path):
+    for i in range(8):
+        (tmp_path / f"dir{i}").mkdir()
+    cache = DirectoryListingCache()
+    directories = [os.fspath(tmp_path / f"dir{i}") for i in range(8)]
+
+    def worker():
+        for _ in range(200):
+            for directory in directories:
+                cache.listing(directory)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["stat_calls"] == 4 * 200 * 8
+    assert stats["hits"] + stats["listdir_calls"] == stats["stat_calls"]